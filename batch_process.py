@@ -0,0 +1,42 @@
+import argparse
+
+from hand_tracker.batch import run_batch
+
+# 离线批量处理: 无需摄像头和显示器，把录好的视频或图片目录分块交给多个进程处理，
+# 输出每只手的关键点、左右手、置信度和手势标签 (列式 .npz 文件)。
+#
+# 示例:
+#   python batch_process.py session1.mp4 session2.mp4 frames_dir/ -o landmarks.npz --workers 4
+#
+# 读取结果:
+#   data = np.load("landmarks.npz")
+#   data["landmarks"]  # (N, 21, 3)
+#   data["gestures"]   # (N, G)，列名为 data["gesture_names"]
+
+def main():
+    parser = argparse.ArgumentParser(description="离线批量手部追踪")
+    parser.add_argument("inputs", nargs="+", help="视频文件、图片文件或图片目录")
+    parser.add_argument("-o", "--output", default="landmarks.npz", help="输出 .npz 文件")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数 (默认CPU核心数)")
+    parser.add_argument("--chunk-size", type=int, default=300, help="每个任务块的帧数")
+    parser.add_argument("--max-hands", type=int, default=2, help="最多检测几只手")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1], help="地标模型复杂度")
+    parser.add_argument("--detection-con", type=float, default=0.5, help="最小检测置信度")
+    parser.add_argument("--tracking-con", type=float, default=0.5, help="最小跟踪置信度")
+    args = parser.parse_args()
+
+    stats = run_batch(
+        args.inputs, args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        max_num_hands=args.max_hands,
+        model_complexity=args.model_complexity,
+        min_detection_confidence=args.detection_con,
+        min_tracking_confidence=args.tracking_con,
+    )
+    print(f"完成: {stats['frames']} 帧, {stats['hands']} 只手, 用时 {stats['seconds']:.1f} 秒")
+    print(f"吞吐量: {stats['fps']:.1f} 帧/秒 (总计), {stats['fps_per_worker']:.1f} 帧/秒/核 ({stats['workers']} 个进程)")
+    print(f"结果已写入 {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+import os
+import json
+import itertools
+import random
+import socket
+import argparse
+import tempfile
+import time
+
+# 基准测试不需要显示器: 没有指定显示驱动时使用 SDL 的空驱动
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+from hand_tracker.batch import list_sources, _iter_frames
+from hand_tracker.bench import compare, environment, measure
+from hand_tracker.core import NUM_LANDMARKS, HandFrame, HandTracker
+from hand_tracker.display import FramePresenter
+from hand_tracker.events import GestureEventTracker
+from hand_tracker.gestures import GestureClassifier, hand_center, hand_rotation
+from hand_tracker.kinematics import KinematicsTracker
+from hand_tracker.protocol import DeltaEncoder, PacketEncoder
+from hand_tracker.recording import LandmarkRecorder, LandmarkReplay
+from hand_tracker.sharedmem import SharedLandmarkReader, SharedLandmarkWriter
+from hand_tracker.streaming import StreamServer, WebSocketClient
+
+# 可重复的基准测试: 不需要摄像头和显示器，用图片/视频帧或录制文件作为输入，
+# 逐项计时检测器、关键点提取、手势判断、数据编码、辉光渲染、画面显示和小球碰撞，
+# 输出每项的 p50/p95/p99 延迟 (JSON)，可以保存下来与其他提交的结果对比。
+#
+# 示例:
+#   python benchmark.py --frames session.mp4 -o bench_before.json
+#   python benchmark.py --frames session.mp4 -o bench_after.json --compare bench_before.json
+#   python benchmark.py --replay session.htrc --skip-detector
+
+CAM_W, CAM_H = 640, 480
+
+
+def load_frames(path, count):
+    """
+    读取测试帧 (BGR, 640x480)。
+    单张图片会通过平移生成 count 帧不同的画面；没有输入时使用随机噪声 (只测到手掌检测的耗时)。
+    """
+    frames = []
+    if path and os.path.exists(path):
+        for source, kind, images in list_sources([path]):
+            for _, img in _iter_frames(kind, images if kind == "images" else source, 0, None):
+                frames.append(cv2.resize(img, (CAM_W, CAM_H)))
+                if len(frames) >= count:
+                    break
+    if len(frames) == 1:
+        base = frames[0]
+        frames = [np.roll(base, (i % 10) * 3, axis=1) for i in range(count)]
+    if not frames:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (CAM_H, CAM_W, 3), np.uint8) for _ in range(count)]
+    return frames
+
+
+def synthetic_hands(count, rng):
+    """在没有检测结果时生成随机的单手关键点。"""
+    center = rng.uniform(0.3, 0.7, (count, 1, 3))
+    landmarks = center + rng.normal(0, 0.08, (count, NUM_LANDMARKS, 3))
+    landmarks[..., 2] *= 0.1
+    return [HandFrame(lm[None].astype(np.float32), [rng.choice(["Left", "Right"])], np.ones(1, np.float32),
+                      (CAM_W, CAM_H)) for lm in landmarks]
+
+
+def bench_detector(frames, complexities, repeat, inference_width, results):
+    """
+    按模型复杂度计时 HandTracker.process，再计时最后一个复杂度在裁剪 (roi) 模式下的耗时。
+    收集有手的帧供后续测试使用。
+    """
+    hand_frames, mp_results = [], []
+    configs = [(f"detector.complexity{c}", c, {}) for c in complexities]
+    configs.append(("detector.roi", complexities[-1], {"roi": True, "inference_width": inference_width}))
+    rgb_frames = [cv2.cvtColor(img, cv2.COLOR_BGR2RGB) for img in frames]
+    for name, complexity, options in configs:
+        found = [0]
+        tracker = HandTracker(max_num_hands=2, model_complexity=complexity, **options)
+
+        def process(img_rgb):
+            frame = tracker.process(img_rgb)
+            found[0] += bool(frame)
+            if frame and name == configs[-2][0]:
+                hand_frames.append(frame.copy())
+                mp_results.append(tracker.results)
+
+        results[name] = stats = measure(process, rgb_frames)
+        stats["frames_with_hands"] = found[0]
+        if options:
+            stats["cropped_frames"] = tracker.region.cropped_frames
+        elif name == configs[-2][0] and mp_results:
+            # 关键点提取: 把 MediaPipe 的结果写入复用的缓冲区
+            results["extraction"] = measure(lambda r: tracker.extract(r, (CAM_W, CAM_H)), mp_results, repeat)
+        tracker.close()
+    return hand_frames
+
+
+def write_recording(path, hand_frames):
+    with LandmarkRecorder(path, max_hands=2, image_size=(CAM_W, CAM_H)) as recorder:
+        for i, frame in enumerate(hand_frames):
+            recorder.write(frame, timestamp=i / 30)
+
+
+def bench_gestures_and_encoding(recording, hand_frames, repeat, results):
+    """计时 HandGestureToUE5 的 is_* 手势判断和各数据格式的编码。"""
+    from hand_tracking_ue5 import HandGestureToUE5, SourceOptions
+
+    sender = HandGestureToUE5(source=SourceOptions(replay=recording, replay_realtime=False))
+    hands = [lm for frame in hand_frames for lm in frame.landmarks]
+    checks = [sender.is_thumb_up, sender.is_fist, sender.is_open_hand, sender.is_pointing, sender.is_peace_sign]
+
+    def is_all(landmarks):
+        for check in checks:
+            check(landmarks)
+
+    results["gestures.is_all"] = measure(is_all, hands, repeat)
+    results["gestures.classify_frame"] = measure(lambda f: sender.classifier.classify(f.landmarks), hand_frames,
+                                                 repeat)
+
+    def encode_json(frame):
+        gestures = sender.classifier.classify(frame.landmarks)
+        data = {"timestamp": 0.0, "hands": []}
+        for i, landmarks in enumerate(frame.landmarks):
+            gesture_data = sender.calculate_gesture_data(landmarks, gestures[i])
+            gesture_data["handedness"] = frame.handedness[i]
+            data["hands"].append(gesture_data)
+        return json.dumps(data).encode()
+
+    results["encode.json"] = measure(encode_json, hand_frames, repeat)
+
+    kinematics = KinematicsTracker()
+    timestamps = itertools.count()
+    results["kinematics.update"] = measure(lambda f: kinematics.update(f, next(timestamps) / 30), hand_frames, repeat)
+
+    gesture_events = GestureEventTracker(sender.classifier.names)
+    classified = [(frame, sender.classifier.classify(frame.landmarks)) for frame in hand_frames]
+    results["gesture_events.update"] = measure(
+        lambda item: gesture_events.update(*item, next(timestamps) / 30), classified, repeat)
+
+    encoders = {
+        "binary": PacketEncoder(),
+        "binary16": PacketEncoder(quantize=True),
+        "delta": DeltaEncoder(),
+    }
+    for name, encoder in encoders.items():
+        def encode(frame, encoder=encoder):
+            gestures = sender.classifier.classify(frame.landmarks)
+            return encoder.encode(frame.landmarks, frame.handedness, gestures, hand_rotation(frame.landmarks),
+                                  hand_center(frame.landmarks), frame.scores, 0.0)
+        results[f"encode.{name}"] = measure(encode, hand_frames, repeat)
+
+    results["packet_bytes"] = {"json": len(encode_json(hand_frames[0]))}
+    for name, encoder in encoders.items():
+        frame = hand_frames[0]
+        results["packet_bytes"][name] = len(encoder.encode(
+            frame.landmarks, frame.handedness, sender.classifier.classify(frame.landmarks),
+            hand_rotation(frame.landmarks), hand_center(frame.landmarks), frame.scores, 0.0))
+    sender.server.stop()
+
+
+def bench_streaming(hand_frames, repeat, subscriber_counts, results):
+    """
+    计时本机回环上的数据流服务: publish() 在追踪线程中的开销，
+    以及从 publish() 到 N 个 UDP 订阅者 (full) 和一个 WebSocket 订阅者 (gestures) 都收到数据的时间。
+    """
+    classifier = GestureClassifier()
+
+    def frame_data(frame):
+        gestures = classifier.classify(frame.landmarks)
+        hands = []
+        for i, landmarks in enumerate(frame.landmarks):
+            hand = {"landmarks": landmarks.tolist(), "handedness": frame.handedness[i]}
+            hand.update(zip(classifier.names, gestures[i].tolist()))
+            hands.append(hand)
+        return {"timestamp": 0.0, "hands": hands}
+
+    data = [frame_data(frame) for frame in hand_frames]
+    for count in subscriber_counts:
+        server = StreamServer(ws_port=0)
+        clients = []
+        for _ in range(count):
+            client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            client.bind(("127.0.0.1", 0))
+            client.settimeout(1.0)
+            server.add_udp_target(client.getsockname(), "full")
+            clients.append(client)
+        server.start()
+
+        def roundtrip(item):
+            server.publish(item)
+            for client in clients:
+                client.recv(65536)
+
+        results[f"stream.udp.{count}"] = measure(roundtrip, data, repeat)
+        server.stop()
+        for client in clients:
+            client.close()
+
+    server = StreamServer(ws_port=0).start()
+    ws = WebSocketClient(f"ws://127.0.0.1:{server.ws_port}/?payload=gestures")
+    while not server.clients:
+        time.sleep(0.01)
+
+    def ws_roundtrip(item):
+        server.publish(item)
+        ws.recv()
+
+    results["stream.websocket"] = measure(ws_roundtrip, data, repeat)
+    results["stream.publish"] = measure(server.publish, data, repeat)
+    ws.close()
+    server.stop()
+
+    # 共享内存环形缓冲区: 写入一帧，以及读取端取最新一帧 (拷贝 / 零拷贝视图)
+    gestures = [classifier.classify(frame.landmarks) for frame in hand_frames]
+    with SharedLandmarkWriter(f"hand_tracker_bench_{os.getpid()}", gesture_names=classifier.names) as writer:
+        results["shm.write"] = measure(lambda item: writer.write(*item), list(zip(hand_frames, gestures)), repeat)
+        with SharedLandmarkReader(writer.name) as reader:
+            results["shm.read"] = measure(lambda _: reader.read_latest(), [None], repeat)
+            results["shm.read_view"] = measure(lambda _: reader.read_latest(copy=False), [None], repeat)
+
+
+def bench_glow(hand_frames, repeat, results):
+    """计时 hand_tracking_3d 的辉光骨架绘制，包括把辉光层叠加到屏幕大小的表面上。"""
+    from hand_tracking_3d import GlowHandRenderer, draw_glowing_hand
+    from hand_tracker.core import TIP_IDS
+
+    glow_surface = pygame.Surface((CAM_W, CAM_H), pygame.SRCALPHA)
+    target = pygame.Surface((CAM_W, CAM_H))
+    lm_lists = []
+    for frame in hand_frames:
+        pixels = frame.scaled((CAM_W, CAM_H, CAM_W), 0)
+        lm_lists.append([[i, x, y, z] for i, (x, y, z) in enumerate(pixels.tolist())])
+
+    def draw(lmList):
+        glow_surface.fill((0, 0, 0, 0))
+        draw_glowing_hand(glow_surface, lmList, (110, 169, 255), (248, 63, 23), (147, 31, 255), TIP_IDS)
+        target.blit(glow_surface, (0, 0))
+
+    results["render.glow"] = measure(draw, lm_lists, repeat)
+
+    # 缓存精灵 + 脏矩形
+    renderer = GlowHandRenderer((CAM_W, CAM_H), (110, 169, 255), (248, 63, 23), (147, 31, 255), TIP_IDS)
+
+    def draw_cached(lmList):
+        renderer.draw(lmList)
+        renderer.blit_to(target)
+
+    results["render.glow_cached"] = measure(draw_cached, lm_lists, repeat)
+
+
+def bench_present(repeat, results, rng):
+    """计时摄像头画面写入预分配的 Surface 并 blit 到屏幕大小的表面。"""
+    images = [rng.integers(0, 256, (CAM_H, CAM_W, 3), np.uint8) for _ in range(8)]
+    target = pygame.Surface((CAM_W, CAM_H))
+    presenter = FramePresenter("BGR")
+    results["render.present"] = measure(lambda img: target.blit(presenter.update(img), (0, 0)), images, repeat)
+
+
+def bench_game(recording, repeat, ball_counts, results):
+    """
+    按球数计时抛接球游戏的每帧开销:
+    - game.interaction.N: check_ball_hand_interaction，N 个球都在手附近 (都通过粗检测，最坏情况)；
+    - game.interaction.N.spread: 同上，N 个球分布在整个游戏空间 (大部分被包围盒粗检测排除)；
+    - game.step.N / game.draw.N: BallWorld 的物理步进和绘制。
+    """
+    from hand_ball_game import HandBallGame
+
+    game = HandBallGame(replay=recording, replay_realtime=False, max_balls=max(ball_counts))
+    world = game.world
+    hands = []
+    for _ in range(len(game.cap)):
+        game.update_hand_tracking()
+        if game.hand_landmarks_3d is not None:
+            hands.append((game.hand_landmarks_3d.copy(), game.is_pinching, game.pinch_point))
+    low = np.array([0, 0, 0], np.float64)
+    high = np.array([game.screen_width, game.screen_height, 400], np.float64)
+    surface = pygame.Surface((game.screen_width, game.screen_height))
+
+    for balls in ball_counts:
+        rng = np.random.default_rng(0)
+        world.clear()
+        for x, y, z in rng.uniform(low, high, (balls, 3)).tolist():
+            world.spawn(x, y, z)
+        velocity = world.velocity[world.active].copy()
+
+        def setup(state):
+            # 直接改写数组中的位置和速度，不重新生成球
+            landmarks, pinching, pinch_point, positions = state
+            game.hand_landmarks_3d = landmarks
+            game.is_pinching = pinching
+            game.pinch_point = pinch_point
+            game.grabbed_ball = None
+            # 手以 600 单位/秒 (每步 10 个单位) 向右移动
+            game.kinematics.reset()
+            game.kinematics.update(landmarks - (10, 0, 0), 0.0)
+            game.kinematics.update(landmarks, 1 / 60)
+            world.position[world.active] = positions
+            world.velocity[world.active] = velocity
+
+        near, spread = [], []
+        for landmarks, pinching, pinch_point in hands:
+            center = landmarks.mean(axis=0)
+            near.append((landmarks, pinching, pinch_point, center + rng.uniform(-80, 80, (balls, 3))))
+            spread.append((landmarks, pinching, pinch_point, rng.uniform(low, high, (balls, 3))))
+        interact = lambda state: game.check_ball_hand_interaction()
+        results[f"game.interaction.{balls}"] = measure(interact, near, repeat, setup=setup)
+        results[f"game.interaction.{balls}.spread"] = measure(interact, spread, repeat, setup=setup)
+
+        setup(spread[0])
+        for _ in range(world.trail_length):
+            world.step(game.tick, game.screen_width, game.screen_height)
+        results[f"game.step.{balls}"] = measure(
+            lambda _: world.step(game.tick, game.screen_width, game.screen_height), [None], repeat)
+        results[f"game.draw.{balls}"] = measure(lambda _: world.draw(surface), [None], repeat,
+                                                setup=lambda _: surface.fill((0, 0, 0)))
+
+
+def print_results(results):
+    print(f"{'项目':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'n':>8}")
+    for name, stats in results.items():
+        if "p50_ms" in stats:
+            print(f"{name:<28}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['n']:>8}")
+    if "packet_bytes" in results:
+        print("数据包大小 (字节):", results["packet_bytes"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="手部追踪各阶段基准测试")
+    parser.add_argument("--frames", help="测试帧: 图片、图片目录或视频 (默认使用随机噪声)")
+    parser.add_argument("--count", type=int, default=100, help="检测器测试的帧数")
+    parser.add_argument("--complexity", type=int, nargs="+", default=[0, 1], choices=[0, 1], help="测试的模型复杂度")
+    parser.add_argument("--inference-width", type=int, default=None, help="roi 测试中送入模型的最大图像宽度")
+    parser.add_argument("--replay", help="使用录制文件中的关键点 (代替检测器结果)")
+    parser.add_argument("--skip-detector", action="store_true", help="跳过检测器测试 (需配合 --replay)")
+    parser.add_argument("--repeat", type=int, default=1000, help="其余各项的计时次数")
+    parser.add_argument("--balls", type=int, nargs="+", default=[8, 64, 256, 1024], help="碰撞测试中的小球数量 (可以给多个，观察随球数的变化)")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 8], help="数据流测试中的 UDP 订阅者数量")
+    parser.add_argument("-o", "--output", help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比 (p50)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    results = {}
+
+    hand_frames = []
+    if not args.skip_detector:
+        frames = load_frames(args.frames, args.count)
+        print(f"检测器测试: {len(frames)} 帧, 模型复杂度 {args.complexity}")
+        hand_frames = bench_detector(frames, args.complexity, args.repeat, args.inference_width, results)
+    if args.replay:
+        replay = LandmarkReplay(args.replay, realtime=False)
+        hand_frames = [replay[i].copy() for i in range(len(replay)) if replay[i]]
+    if not hand_frames:
+        print("没有检测到手，使用随机生成的关键点")
+        hand_frames = synthetic_hands(100, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recording = os.path.join(tmp, "bench.htrc")
+        write_recording(recording, hand_frames)
+        bench_gestures_and_encoding(recording, hand_frames, args.repeat, results)
+        bench_streaming(hand_frames, args.repeat, args.subscribers, results)
+        bench_glow(hand_frames, args.repeat, results)
+        bench_present(args.repeat, results, rng)
+        bench_game(recording, args.repeat, args.balls, results)
+    pygame.quit()
+
+    print_results(results)
+    report = {"environment": environment(), "config": vars(args), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"结果已写入 {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"与 {args.compare} ({baseline['environment'].get('commit')}) 对比:")
+        for name, before, after, ratio, status in compare(baseline["results"], results):
+            print(f"  {name:<26}{before:>10.3f} -> {after:>10.3f} ms  x{ratio:.2f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
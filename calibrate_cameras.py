@@ -0,0 +1,102 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from hand_tracker.multicam import open_source
+from hand_tracker.triangulation import Calibration, CameraCalibration, HAND_LENGTH_CM
+
+# 摄像头标定: 对着所有摄像头展示同一块棋盘格标定板，自动采集若干组图像，
+# 求出每个摄像头的内参和畸变，并求出其余摄像头相对于 0 号摄像头的位姿，写入 JSON 文件。
+# 平移量的单位与 --square 相同 (默认厘米)，三角测量的结果因此也以厘米为单位。
+# 画面与追踪脚本一样做水平翻转，标定结果可以直接用于翻转后的关键点。
+#
+# 示例:
+#   python calibrate_cameras.py 0 1 --board 9x6 --square 2.5 -o calibration.json
+#   python calibrate_cameras.py 0 -o calibration.json   # 单摄像头: 只标定内参，用于距离估算
+#   python hand_tracking_3d.py --calibration calibration.json
+#   python hand_tracking_ue5.py --cameras 0 1 --calibration calibration.json
+
+def collect(caps, board, count, interval, preview):
+    """采集所有视图中都能找到完整棋盘格的图像，返回每个视图的角点列表和图像尺寸。"""
+    corners = [[] for _ in caps]
+    image_size = [None] * len(caps)
+    last = 0
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 1e-3)
+    while len(corners[0]) < count:
+        # 先 grab 所有摄像头再 retrieve，尽量让各视图的曝光时刻接近
+        if not all(cap.grab() for cap in caps):
+            break
+        images = [cv2.flip(cap.retrieve()[1], 1) for cap in caps]
+        found = []
+        for i, img in enumerate(images):
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            image_size[i] = gray.shape[::-1]
+            ok, points = cv2.findChessboardCorners(gray, board, flags=cv2.CALIB_CB_FAST_CHECK)
+            if ok:
+                points = cv2.cornerSubPix(gray, points, (11, 11), (-1, -1), criteria)
+            found.append(points if ok else None)
+            if preview:
+                cv2.drawChessboardCorners(img, board, points, ok)
+                cv2.putText(img, f"{len(corners[0])}/{count}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                cv2.imshow(f"Camera {i}", img)
+        if all(points is not None for points in found) and time.time() - last >= interval:
+            last = time.time()
+            for i, points in enumerate(found):
+                corners[i].append(points)
+            print(f"采集 {len(corners[0])}/{count}")
+        if preview and cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+    return corners, image_size
+
+def main():
+    parser = argparse.ArgumentParser(description="多摄像头棋盘格标定")
+    parser.add_argument("sources", nargs="+", help="摄像头索引或视频文件，第一个为参考摄像头")
+    parser.add_argument("-o", "--output", default="calibration.json", help="输出的标定文件")
+    parser.add_argument("--board", default="9x6", help="棋盘格内角点数 (列x行)")
+    parser.add_argument("--square", type=float, default=2.5, help="棋盘格方格边长 (厘米)")
+    parser.add_argument("--count", type=int, default=20, help="采集的图像组数")
+    parser.add_argument("--interval", type=float, default=1.0, help="两次采集的最小间隔 (秒)，视频文件可设为 0")
+    parser.add_argument("--hand-length", type=float, default=HAND_LENGTH_CM, help="手腕到中指掌指关节的长度 (厘米)")
+    parser.add_argument("--no-preview", action="store_true", help="不显示预览窗口")
+    args = parser.parse_args()
+
+    board = tuple(int(n) for n in args.board.lower().split("x"))
+    caps = [open_source(source)[0] for source in args.sources]
+    for source, cap in zip(args.sources, caps):
+        if not cap.isOpened():
+            raise SystemExit(f"无法打开输入源 {source}")
+    corners, image_size = collect(caps, board, args.count, args.interval, not args.no_preview)
+    for cap in caps:
+        cap.release()
+    cv2.destroyAllWindows()
+    if len(corners[0]) < 3:
+        raise SystemExit("采集到的图像太少，无法标定")
+
+    # 标定板坐标系中的角点 (z=0 平面)
+    grid = np.zeros((board[0] * board[1], 3), np.float32)
+    grid[:, :2] = np.mgrid[0:board[0], 0:board[1]].T.reshape(-1, 2) * args.square
+    object_points = [grid] * len(corners[0])
+
+    intrinsics = []
+    for i, points in enumerate(corners):
+        rms, matrix, dist, _, _ = cv2.calibrateCamera(object_points, points, image_size[i], None, None)
+        intrinsics.append((matrix, dist))
+        print(f"摄像头 {args.sources[i]}: 内参重投影误差 {rms:.3f} 像素")
+
+    cameras = [CameraCalibration(intrinsics[0][0], intrinsics[0][1], image_size=image_size[0],
+                                 source=args.sources[0])]
+    for i in range(1, len(corners)):
+        rms, _, _, _, _, rotation, translation, _, _ = cv2.stereoCalibrate(
+            object_points, corners[0], corners[i], intrinsics[0][0], intrinsics[0][1],
+            intrinsics[i][0], intrinsics[i][1], image_size[0], flags=cv2.CALIB_FIX_INTRINSIC)
+        print(f"摄像头 {args.sources[i]}: 双目重投影误差 {rms:.3f} 像素, 基线 {np.linalg.norm(translation):.1f} cm")
+        cameras.append(CameraCalibration(intrinsics[i][0], intrinsics[i][1], rotation, translation,
+                                         image_size[i], args.sources[i]))
+
+    Calibration(cameras, args.hand_length).save(args.output)
+    print(f"标定结果已写入 {args.output}")
+
+if __name__ == "__main__":
+    main()
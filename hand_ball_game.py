@@ -1,161 +1,269 @@
 import cv2
-import mediapipe as mp
 import pygame
 import numpy as np
 import random
-import math
 import sys
-
-# 定义手部骨骼连接
-HAND_CONNECTIONS = [
-    (0, 1), (1, 2), (2, 3), (3, 4),  # 拇指
-    (0, 5), (5, 6), (6, 7), (7, 8),  # 食指
-    (5, 9), (9, 10), (10, 11), (11, 12), # 中指
-    (9, 13), (13, 14), (14, 15), (15, 16), # 无名指
-    (13, 17), (17, 18), (18, 19), (19, 20), # 小指
-    (0, 17) # 手掌连接
-]
+import time
+import argparse
+
+from hand_tracker.collision import SegmentCollider, first_within
+from hand_tracker.core import HandTracker, HAND_CONNECTIONS, TIP_IDS
+from hand_tracker.display import FramePresenter
+from hand_tracker.recording import LandmarkReplay
+from hand_tracker.filters import FilteredTracker, make_filter
+from hand_tracker.kinematics import HandKinematics, sample_time
+from hand_tracker.pipeline import StageStats
+from hand_tracker.scheduler import InferenceScheduler
+from hand_tracker.startup import fast_start
 
 class HandDetector:
     """手部检测器类，专门为游戏优化"""
-    def __init__(self, detectionCon=0.8, trackCon=0.7):
-        self.mpHands = mp.solutions.hands # type: ignore
-        self.hands = self.mpHands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=detectionCon,
-            min_tracking_confidence=trackCon
-        )
-        self.mpDraw = mp.solutions.drawing_utils # type: ignore
+    def __init__(self, detectionCon=0.8, trackCon=0.7, roi=False, inference_width=None, tracker=None):
+        # tracker: 使用已有的追踪器 (例如回放时的 LandmarkReplay)，None 表示创建 MediaPipe 的 HandTracker
+        if tracker is None:
+            tracker = HandTracker(
+                static_image_mode=False,
+                max_num_hands=1,
+                min_detection_confidence=detectionCon,
+                min_tracking_confidence=trackCon,
+                roi=roi,
+                inference_width=inference_width
+            )
+        self.tracker = tracker
 
     def find_hands(self, img):
-        """检测手部并返回3D关键点和左右手信息"""
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
-        
-        hand_info = []
-        if self.results.multi_hand_landmarks and self.results.multi_handedness:
-            for hand_idx, handLms in enumerate(self.results.multi_hand_landmarks):
-                handedness = self.results.multi_handedness[hand_idx].classification[0].label
-                lmList = []
-                for id, lm in enumerate(handLms.landmark):
-                    # 返回归一化的坐标
-                    lmList.append((lm.x, lm.y, lm.z))
-                hand_info.append({"landmarks": lmList, "handedness": handedness})
-        return hand_info
-
-class Ball:
-    """3D物理小球类"""
-    def __init__(self, x, y, z=0, radius=20):
-        self.x = float(x)
-        self.y = float(y)
-        self.z = float(z)
-        self.radius = radius
-        self.vx = random.uniform(-3, 3)
-        self.vy = random.uniform(-8, -4)
-        self.vz = random.uniform(-2, 2)
-        self.gravity = 0.3
-        self.bounce = 0.8
-        self.friction = 0.99
-        self.color = (255, 100, 100)
-        self.trail = []
-        self.focal_length = 500  # 虚拟摄像机焦距
-
-    def update(self, screen_width, screen_height, depth_far=800, depth_near_scale=0.8):
-        """更新球的物理状态"""
-        self.trail.append((self.x, self.y, self.z))
-        if len(self.trail) > 15:
-            self.trail.pop(0)
-
-        self.vy += self.gravity
-        self.vx *= self.friction
-        self.vy *= self.friction
-        self.vz *= self.friction
-
-        self.x += self.vx
-        self.y += self.vy
-        self.z += self.vz
-
-        if self.x - self.radius <= 0 or self.x + self.radius >= screen_width:
-            self.vx = -self.vx * self.bounce
-            self.x = np.clip(self.x, self.radius, screen_width - self.radius)
-        if self.y - self.radius <= 0:
-            self.vy = -self.vy * self.bounce
-            self.y = self.radius
-        if self.y + self.radius >= screen_height:
-            self.vy = -self.vy * self.bounce
-            self.y = screen_height - self.radius
-            self.vx *= 0.9
-
-        depth_near = -self.focal_length * depth_near_scale
-        if self.z < depth_near or self.z > depth_far:
-            self.vz = -self.vz * self.bounce
-            self.z = np.clip(self.z, depth_near, depth_far)
-
-    def get_projection(self, screen_width, screen_height):
-        """计算3D到2D的投影"""
-        scale = self.focal_length / (self.focal_length + self.z)
-        if scale <= 0:
-            return None, None, None
-        
-        screen_x = int((self.x - screen_width / 2) * scale + screen_width / 2)
-        screen_y = int((self.y - screen_height / 2) * scale + screen_height / 2)
-        screen_radius = int(self.radius * scale)
-        return screen_x, screen_y, screen_radius
-
-    def draw(self, screen):
-        """绘制球和轨迹"""
-        screen_width, screen_height = screen.get_size()
-        projection = self.get_projection(screen_width, screen_height)
-
-        # 检查投影结果是否有效，如果无效则不进行任何绘制
-        if projection[0] is None:
+        """检测手部并返回 HandFrame (归一化的3D关键点和左右手信息)"""
+        return self.tracker.process_bgr(img)
+
+    def warm_up(self, image_size=(640, 480)):
+        """预热模型，避免第一帧的初始化延迟"""
+        self.tracker.warm_up(image_size)
+
+BALL_COLOR = (255, 100, 100)      # 默认颜色
+GRABBED_COLOR = (255, 255, 0)     # 黄色代表被抓住
+HIT_COLOR = (100, 255, 100)       # 被手击中
+
+class BallWorld:
+    """
+    所有3D物理小球，按结构数组 (SoA) 存储: 位置、速度、半径、颜色和轨迹都是连续的 NumPy 数组，
+    重力、摩擦、边界反弹和透视投影对所有球一次向量化计算。
+    - 槽位: 数组容量固定为最大球数，生成时从空闲槽位栈取一个，移除时把槽位放回，不移动其他球的数据；
+      场上已满时回收最早生成的球。
+    - 轨迹: (容量, 轨迹长度, 3) 的环形缓冲区，所有球每步写入同一列，不做 pop(0)。
+    - 单位: 速度为 单位/秒，step(dt) 按给定的时间步长积分，上一步的位置保留下来用于插值绘制。
+    """
+    def __init__(self, capacity=8, radius=20, gravity=1080.0, bounce=0.8, friction=0.99 ** 60,
+                 focal_length=500, trail_length=15):
+        """
+        :param capacity: 最多的球数。
+        :param radius: 默认半径。
+        :param gravity: 重力加速度 (单位/秒²)。
+        :param bounce: 反弹时保留的速度比例。
+        :param friction: 每秒保留的速度比例。
+        :param focal_length: 虚拟摄像机焦距。
+        :param trail_length: 轨迹保留的步数。
+        """
+        self.capacity = capacity
+        self.default_radius = radius
+        self.gravity = gravity
+        self.bounce = bounce
+        self.friction = friction
+        self.focal_length = focal_length
+        self.trail_length = trail_length
+
+        self.position = np.zeros((capacity, 3))
+        self.previous_position = np.zeros((capacity, 3))   # 上一步的位置，用于插值绘制
+        self.velocity = np.zeros((capacity, 3))
+        self.radius = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), np.uint8)
+        self.trail = np.zeros((capacity, trail_length, 3))
+        self.trail_count = np.zeros(capacity, np.int64)   # 每个球已有的轨迹点数
+        self.trail_head = 0                               # 下一步写入的列
+        self.alive = np.zeros(capacity, bool)
+        self.serial = np.zeros(capacity, np.int64)        # 生成序号，越小越早
+        self.active = np.zeros(0, np.int64)               # 场上的槽位，按生成顺序排列
+        self._next_serial = 0
+        self._free = list(range(capacity - 1, -1, -1))    # 空闲槽位栈，先用小下标
+
+    def __len__(self):
+        return len(self.active)
+
+    def spawn(self, x, y, z=0, velocity=None, radius=None, color=BALL_COLOR):
+        """
+        生成一个球。场上已满时先移除最早生成的球，新球使用它的槽位。
+        :param velocity: 初速度 (单位/秒)，None 时随机向上抛出。
+        :param radius: 半径，None 时使用默认半径。
+        :return: 新球的槽位。
+        """
+        if not self._free:
+            self.remove(self.active[:1])
+        slot = self._free.pop()
+        if velocity is None:
+            velocity = (random.uniform(-180, 180), random.uniform(-480, -240), random.uniform(-120, 120))
+        self.position[slot] = x, y, z
+        self.previous_position[slot] = x, y, z
+        self.velocity[slot] = velocity
+        self.radius[slot] = self.default_radius if radius is None else radius
+        self.color[slot] = color
+        self.trail_count[slot] = 0
+        self.alive[slot] = True
+        self.serial[slot] = self._next_serial
+        self._next_serial += 1
+        self.active = np.append(self.active, slot)
+        return slot
+
+    def remove(self, slots):
+        """移除一组槽位上的球，槽位放回空闲栈。"""
+        slots = np.asarray(slots, np.int64)
+        if not len(slots):
             return
-        
-        screen_x, screen_y, screen_radius = projection
-
-        if screen_radius < 1:
+        self.alive[slots] = False
+        self._free.extend(slots.tolist())
+        self.active = self.active[self.alive[self.active]]
+
+    def clear(self):
+        self.remove(self.active)
+
+    def step(self, dt, screen_width, screen_height, depth_far=800, depth_near_scale=0.8):
+        """
+        所有球前进一步: 记录轨迹，施加重力和摩擦，移动，并在屏幕边界和深度范围处反弹。
+        :param dt: 时间步长 (秒)，使用固定步长时物理结果与帧率无关。
+        """
+        active = self.active
+        if not len(active):
             return
+        self.previous_position[active] = self.position[active]
+        self.trail[active, self.trail_head] = self.position[active]
+        self.trail_count[active] = np.minimum(self.trail_count[active] + 1, self.trail_length)
+        self.trail_head = (self.trail_head + 1) % self.trail_length
+
+        position = self.position[active]
+        velocity = self.velocity[active]
+        radius = self.radius[active]
+        velocity[:, 1] += self.gravity * dt
+        velocity *= self.friction ** dt
+        position += velocity * dt
+        x, y, z = position.T
+        vx, vy, vz = velocity.T
+
+        hit = (x - radius <= 0) | (x + radius >= screen_width)
+        vx[hit] *= -self.bounce
+        x[hit] = np.clip(x[hit], radius[hit], screen_width - radius[hit])
+        hit = y - radius <= 0
+        vy[hit] *= -self.bounce
+        y[hit] = radius[hit]
+        hit = y + radius >= screen_height
+        vy[hit] *= -self.bounce
+        y[hit] = screen_height - radius[hit]
+        vx[hit] *= 0.9
 
-        for i in range(len(self.trail) - 1):
-            p1_x, p1_y, p1_z = self.trail[i]
-            p2_x, p2_y, p2_z = self.trail[i+1]
-
-            scale1 = self.focal_length / (self.focal_length + p1_z)
-            scale2 = self.focal_length / (self.focal_length + p2_z)
-
-            if scale1 > 0 and scale2 > 0:
-                s1_x = int((p1_x - screen_width / 2) * scale1 + screen_width / 2)
-                s1_y = int((p1_y - screen_height / 2) * scale1 + screen_height / 2)
-                s2_x = int((p2_x - screen_width / 2) * scale2 + screen_width / 2)
-                s2_y = int((p2_y - screen_height / 2) * scale2 + screen_height / 2)
-                
-                alpha = (i / len(self.trail)) * 0.8
-                color = (int(self.color[0] * alpha), int(self.color[1] * alpha), int(self.color[2] * alpha))
-                pygame.draw.line(screen, color, (s1_x, s1_y), (s2_x, s2_y), max(1, int(screen_radius * alpha * 0.5)))
-        
-        brightness = max(0, min(255, int(255 * (1 - self.z / (self.focal_length * 2)))))
-        draw_color = tuple(np.clip([c * brightness / 255 for c in self.color], 0, 255))
-
-        pygame.draw.circle(screen, draw_color, (screen_x, screen_y), screen_radius)
-        pygame.draw.circle(screen, (255, 255, 255), (screen_x, screen_y), screen_radius, 2)
-
-    def distance_to(self, x, y, z):
-        """计算到指定点的3D距离"""
-        return math.sqrt((self.x - x)**2 + (self.y - y)**2 + (self.z - z)**2)
+        depth_near = -self.focal_length * depth_near_scale
+        hit = (z < depth_near) | (z > depth_far)
+        vz[hit] *= -self.bounce
+        z[hit] = np.clip(z[hit], depth_near, depth_far)
+
+        self.position[active] = position
+        self.velocity[active] = velocity
+
+    def out_of_bounds(self, screen_width, screen_height, margin=200):
+        """返回飞出屏幕 (超出 margin) 的球的槽位。"""
+        x, y = self.position[self.active, 0], self.position[self.active, 1]
+        return self.active[(y > screen_height + margin) | (x < -margin) | (x > screen_width + margin)]
+
+    def project(self, points, screen_width, screen_height):
+        """
+        3D到2D的透视投影。
+        :param points: (..., 3) 坐标。
+        :return: (屏幕坐标 (..., 2) int64, 缩放系数 (...))，缩放系数 <= 0 的点在摄像机后方，投影无效。
+        """
+        with np.errstate(divide="ignore"):
+            scale = self.focal_length / (self.focal_length + points[..., 2])
+        center = np.array([screen_width / 2, screen_height / 2])
+        screen = np.where(scale[..., None] > 0, (points[..., :2] - center) * scale[..., None] + center, 0)
+        return screen.astype(np.int64), scale
+
+    def interpolated(self, alpha):
+        """场上各球在上一步和当前步之间按 alpha (0~1) 插值的位置，按 active 的顺序。"""
+        previous = self.previous_position[self.active]
+        return previous + (self.position[self.active] - previous) * alpha
+
+    def draw(self, screen, alpha=1.0):
+        """
+        绘制所有球和轨迹: 投影、颜色和线宽一次算出，之后只剩 pygame 的绘制调用。
+        :param alpha: 插值系数，球画在上一步和当前步位置之间 (1 表示当前步)。
+        """
+        active = self.active
+        if not len(active):
+            return
+        screen_width, screen_height = screen.get_size()
+        position = self.interpolated(alpha)
+        centers, scale = self.project(position, screen_width, screen_height)
+        radii = np.where(scale > 0, self.radius[active] * scale, 0).astype(np.int64)
+        visible = (scale > 0) & (radii >= 1)
+
+        # 轨迹: 按时间顺序取出环形缓冲区中的点，第 k 段连接第 k 和 k+1 个点
+        count = self.trail_count[active]
+        columns = (self.trail_head - count[:, None] + np.arange(self.trail_length)) % self.trail_length
+        trail_points, trail_scale = self.project(self.trail[active[:, None], columns], screen_width, screen_height)
+        k = np.arange(self.trail_length - 1)
+        segments = ((k < count[:, None] - 1) & (trail_scale[:, :-1] > 0) & (trail_scale[:, 1:] > 0)
+                    & visible[:, None])
+        ball_index, k = np.nonzero(segments)
+        alpha = k / count[ball_index] * 0.8
+        colors = self.color[active]
+        trail_colors = (colors[ball_index] * alpha[:, None]).astype(np.int64).tolist()
+        trail_widths = np.maximum(1, (radii[ball_index] * alpha * 0.5).astype(np.int64)).tolist()
+        starts = trail_points[ball_index, k].tolist()
+        ends = trail_points[ball_index, k + 1].tolist()
+        bounds = np.searchsorted(ball_index, np.arange(len(active) + 1)).tolist()
+
+        brightness = np.clip(np.trunc(255 * (1 - position[:, 2] / (self.focal_length * 2))), 0, 255)
+        draw_colors = np.clip(colors * brightness[:, None] / 255, 0, 255).astype(np.int64).tolist()
+        centers, radii = centers.tolist(), radii.tolist()
+
+        for i in np.flatnonzero(visible).tolist():
+            for j in range(bounds[i], bounds[i + 1]):
+                pygame.draw.line(screen, trail_colors[j], starts[j], ends[j], trail_widths[j])
+            pygame.draw.circle(screen, draw_colors[i], centers[i], radii[i])
+            pygame.draw.circle(screen, (255, 255, 255), centers[i], radii[i], 2)
 
 class HandBallGame:
     """手势控制3D抛接球AR游戏"""
-    def __init__(self):
+    def __init__(self, record=None, replay=None, replay_realtime=True, roi=False, inference_width=None,
+                 infer_every=1, infer_cpu=None, landmark_filter=None, max_balls=8,
+                 spawn_interval=180, physics_hz=60):
+        """
+        :param record: 录制文件路径，设置后把每帧的追踪结果追加写入该文件。
+        :param replay: 回放的录制文件路径，设置后用录制的数据代替摄像头 (循环播放)。
+        :param replay_realtime: 回放时是否按录制时的节奏，False 表示尽可能快。
+        :param roi: 是否只对上一帧手部附近的区域做推理。
+        :param inference_width: 送入模型的最大图像宽度，None 表示不缩放。
+        :param infer_every: 每隔多少帧运行一次推理，其余帧外推关键点。
+        :param infer_cpu: 推理最多占用的时间比例 (0~1)，设置后按推理耗时自适应跳帧，优先于 infer_every。
+        :param landmark_filter: 关键点滤波器名称 ("ema" / "one_euro" / "kalman")，None 或 "none" 表示不滤波。
+        :param max_balls: 场上最多的球数，超出时移除最早生成的球。
+        :param spawn_interval: 每隔多少个物理步生成一个新球。
+        :param physics_hz: 物理模拟的固定步频 (步/秒)，与追踪和渲染的帧率无关。
+        """
         pygame.init()
         self.screen_width = 640
         self.screen_height = 480
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption("3D手势抛接球 (AR) - 按ESC退出")
         self.clock = pygame.time.Clock()
+        # 摄像头画面的显示表面，跨帧复用
+        self.presenter = FramePresenter("BGR")
 
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
+        if replay:
+            # 回放: 录制文件同时代替摄像头和追踪器，不加载模型
+            self.cap = LandmarkReplay(replay, realtime=replay_realtime, loop=True)
+            self.hand_detector = HandDetector(tracker=self.cap)
+        else:
+            # 摄像头 (优先使用上次缓存的配置) 和 MediaPipe 并行初始化，并预热模型
+            self.cap, self.hand_detector, _ = fast_start(
+                lambda: HandDetector(roi=roi, inference_width=inference_width),
+                width=self.screen_width, height=self.screen_height)
+        if self.cap is None or not self.cap.isOpened():
             print("错误：无法打开摄像头")
             sys.exit(1)
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.screen_width)
@@ -164,34 +272,56 @@ class HandBallGame:
         self.cam_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         print(f"请求摄像头分辨率: {self.screen_width}x{self.screen_height}, 实际: {self.cam_width}x{self.cam_height}")
 
-        self.hand_detector = HandDetector()
+        if record and not replay:
+            self.hand_detector.tracker.start_recording(record, (self.cam_width, self.cam_height))
+        landmark_filter = make_filter(landmark_filter)
+        if landmark_filter is not None:
+            # 滤波后再判断捏合，避免抖动造成误抓、误放
+            self.hand_detector.tracker = FilteredTracker(self.hand_detector.tracker, landmark_filter)
+        if infer_every > 1 or infer_cpu:
+            # 推理按自己的节奏运行，游戏每帧 (60Hz) 都能拿到外推的关键点
+            self.hand_detector.tracker = InferenceScheduler(self.hand_detector.tracker, infer_every, infer_cpu)
         
-        self.balls = []
+        self.world = BallWorld(max_balls)
+        self.collider = SegmentCollider(HAND_CONNECTIONS)
         self.score = 0
         self.font = pygame.font.Font(None, 50)
         self.small_font = pygame.font.Font(None, 30)
         
-        self.hand_landmarks_3d = []
+        self.hand_landmarks_3d = None
+        self.hand_id = None
         self.hand_pos = None
-        self.prev_hand_pos = None
-        self.hand_velocity = (0, 0, 0)
+        self.hand_velocity = (0, 0, 0) # 手掌速度 (单位/秒)
+        # 所有关键点和骨骼的速度、加速度 (游戏3D空间，按样本时间戳换算为每秒)
+        self.kinematics = HandKinematics(connections=HAND_CONNECTIONS)
         
         # 优化抓取和投掷机制
-        self.raw_landmarks = []
+        self.raw_landmarks = None
         self.handedness = None
         self.is_pinching = False
         self.pinch_point = None
-        self.prev_pinch_point = None
-        self.pinch_velocity = np.array([0, 0, 0])
-        self.grabbed_ball = None
-        self.tipIds = [4, 8, 12, 16, 20] # 重新加入手指指尖ID
+        self.pinch_velocity = np.array([0, 0, 0]) # 捏合点速度 (单位/秒)，已乘投掷力度
+        self.grabbed_ball = None # 被抓着的球的槽位
+        self.tipIds = TIP_IDS # 重新加入手指指尖ID
         self.PINCH_THRESHOLD = 35 # 捏合手势的距离阈值 (3D空间单位)
 
+        # 归一化坐标 -> 游戏3D空间 / 像素坐标的缩放系数 (z 按画面宽度的 0.8 倍缩放)，以及跨帧复用的缓冲区
+        self.game_scale = np.array([self.cam_width, self.cam_height, self.cam_width * 0.8], np.float32)
+        self._hand_buffer = np.zeros((21, 3), np.int32)
+        self._pixel_buffer = np.zeros((21, 3), np.int32)
+        self.hand_pixels = None
+
         self.catch_distance = 50 # 抓球/碰撞的有效距离
         self.throw_power_multiplier = 1.2 # 增强投掷力度
         
         self.ball_spawn_timer = 0
-        self.ball_spawn_interval = 180
+        self.ball_spawn_interval = spawn_interval
+
+        # 固定步长的物理模拟: 真实时间进入累加器，按整步消耗，剩余部分用于渲染插值
+        self.tick = 1.0 / physics_hz
+        self.accumulator = 0.0
+        self.max_frame_time = 0.25 # 单帧最多补算的时间，避免卡顿后连续补算过多步
+        self.tick_stats = StageStats("physics")
         
     def spawn_ball(self, x=None, y=None, z=None):
         """生成新球"""
@@ -201,66 +331,62 @@ class HandBallGame:
             y = random.randint(100, 200)
         if z is None:
             z = random.randint(0, 200)
-        self.balls.append(Ball(x, y, z))
-        
-    def map_hand_to_screen(self, hx, hy, hz):
-        """将手部归一化坐标映射到游戏3D空间坐标"""
-        screen_x = int(hx * self.cam_width)
-        screen_y = int(hy * self.cam_height)
-        # 将z坐标缩放，使其在游戏世界中有意义
-        screen_z = int(hz * self.cam_width * 0.8) 
-        return screen_x, screen_y, screen_z
+        slot = self.world.spawn(x, y, z)
+        if slot == self.grabbed_ball:
+            # 场上已满，回收的正是被抓着的球
+            self.grabbed_ball = None
         
     def update_hand_tracking(self):
         """更新手部跟踪和手势状态"""
         ret, frame = self.cap.read()
         if not ret:
             return None
-            
+        timestamp = sample_time(self.cap)
+
         frame = cv2.flip(frame, 1)
-        all_hands_info = self.hand_detector.find_hands(frame)
-        
-        self.prev_hand_pos = self.hand_pos
-        self.hand_landmarks_3d = []
+        hand_frame = self.hand_detector.find_hands(frame)
         
-        # 更新捏合状态
-        self.prev_pinch_point = self.pinch_point
-
-        if all_hands_info:
-            hand_info = all_hands_info[0] # 只处理第一只手
-            self.raw_landmarks = hand_info['landmarks']
-            self.handedness = hand_info['handedness']
+        self.hand_landmarks_3d = None
+
+        if hand_frame and hand_frame.handedness:
+            # 只处理第一只手
+            self.raw_landmarks = hand_frame.landmarks[0]
+            self.handedness = hand_frame.handedness[0]
+            hand_id = hand_frame.ids[0] if hand_frame.ids is not None else None
+            if hand_id != self.hand_id:
+                # 换了一只手: 释放抓着的球，不用上一只手的位置计算速度
+                self.hand_id = hand_id
+                self.grabbed_ball = None
+                self.kinematics.reset()
 
-            # 将归一化坐标转换为3D游戏世界坐标
-            for hx, hy, hz in self.raw_landmarks:
-                sx, sy, sz = self.map_hand_to_screen(hx, hy, hz)
-                self.hand_landmarks_3d.append((sx, sy, sz))
+            # 将归一化坐标转换为3D游戏世界坐标 (一次向量化运算，写入复用的缓冲区)
+            self.hand_landmarks_3d = hand_frame.scaled(self.game_scale, 0, out=self._hand_buffer)
+            self.hand_pixels = hand_frame.pixels(0, out=self._pixel_buffer)
 
-            palm_center_3d = self.hand_landmarks_3d[9]
+            palm_center_3d = tuple(self.hand_landmarks_3d[9].tolist())
             self.hand_pos = palm_center_3d
-            
-            if self.prev_hand_pos:
-                self.hand_velocity = (
-                    (self.hand_pos[0] - self.prev_hand_pos[0]),
-                    (self.hand_pos[1] - self.prev_hand_pos[1]),
-                    (self.hand_pos[2] - self.prev_hand_pos[2])
-                )
+
+            # 所有关键点的速度一次估计 (按样本时间戳换算为 单位/秒)
+            velocity = self.kinematics.update(self.hand_landmarks_3d, timestamp).velocity
+            self.hand_velocity = tuple(velocity[9].tolist())
             
             # 更新捏合手势状态
-            thumb_tip = np.array(self.hand_landmarks_3d[4])
-            index_tip = np.array(self.hand_landmarks_3d[8])
+            thumb_tip = self.hand_landmarks_3d[4].astype(float)
+            index_tip = self.hand_landmarks_3d[8].astype(float)
             self.pinch_point = (thumb_tip + index_tip) / 2
             distance = np.linalg.norm(thumb_tip - index_tip)
             self.is_pinching = distance < self.PINCH_THRESHOLD
 
-            # 计算捏合点的速度，用于投掷
-            if self.prev_pinch_point is not None:
-                self.pinch_velocity = (self.pinch_point - self.prev_pinch_point) * self.throw_power_multiplier
+            # 捏合点 (拇指尖和食指尖的中点) 的速度，用于投掷
+            self.pinch_velocity = (velocity[4] + velocity[8]) / 2 * self.throw_power_multiplier
 
         else:
             self.hand_pos = None
+            self.hand_id = None
             self.hand_velocity = (0, 0, 0)
-            self.raw_landmarks = []
+            self.kinematics.reset()
+            self.raw_landmarks = None
+            self.hand_pixels = None
             self.handedness = None
             self.is_pinching = False
             self.pinch_point = None
@@ -270,7 +396,7 @@ class HandBallGame:
 
     def fingersUp(self):
         """根据 self.raw_landmarks 判断手指是否伸出"""
-        if not self.raw_landmarks or not self.handedness:
+        if self.raw_landmarks is None or not self.handedness:
             return []
         
         fingers = []
@@ -294,152 +420,120 @@ class HandBallGame:
                 fingers.append(0)
         return fingers
 
-    def get_bone_velocity(self, bone_id):
-        """获取单根骨骼的平均速度"""
-        # (此功能在更复杂的实现中会用到，暂时返回手掌的整体速度)
-        return self.hand_velocity
-
     def check_ball_hand_interaction(self):
         """检查球与手的交互（抓取、投掷、碰撞）"""
         # 哨兵：如果手部数据不存在，则不进行任何交互检测
-        if not self.hand_landmarks_3d:
+        if self.hand_landmarks_3d is None:
             # 如果手消失时正抓着球，则释放球
-            if self.grabbed_ball:
-                self.grabbed_ball = None
+            self.grabbed_ball = None
             return
 
+        world = self.world
         # 1. 如果已经抓着球，处理持有或投掷
-        if self.grabbed_ball:
+        if self.grabbed_ball is not None:
             if self.is_pinching and self.pinch_point is not None:
                 # 让球跟随捏合点
-                self.grabbed_ball.x, self.grabbed_ball.y, self.grabbed_ball.z = self.pinch_point
-                self.grabbed_ball.vx, self.grabbed_ball.vy, self.grabbed_ball.vz = 0, 0, 0
-                self.grabbed_ball.color = (255, 255, 0) # 黄色代表被抓住
+                world.position[self.grabbed_ball] = self.pinch_point
+                world.velocity[self.grabbed_ball] = 0
+                world.color[self.grabbed_ball] = GRABBED_COLOR
             else:
                 # 手势变为非捏合，即为“投掷”，赋予小球捏合点的速度
-                self.grabbed_ball.vx = self.pinch_velocity[0]
-                self.grabbed_ball.vy = self.pinch_velocity[1]
-                self.grabbed_ball.vz = self.pinch_velocity[2]
+                world.velocity[self.grabbed_ball] = self.pinch_velocity
                 self.grabbed_ball = None
             return # 只要处理了抓球/投掷，本帧就不再进行其他交互
 
         # 2. 如果没有抓球，则检测新的抓取或碰撞
-        # 2a. 检测新的抓取
+        # 2a. 检测新的抓取 (按生成顺序取第一个足够近的球)
+        active = world.active
+        positions = world.position[active]
         if self.is_pinching and self.pinch_point is not None:
-            for ball in self.balls:
-                dist_to_pinch = ball.distance_to(*self.pinch_point)
-                if dist_to_pinch < self.catch_distance:
-                    self.grabbed_ball = ball
-                    self.score += 5
-                    return # 抓到球后，立即返回，避免同一帧内还进行碰撞检测
-
-        # 2b. 如果没有发生抓取，则进行碰撞检测
-        for ball in self.balls:
-            min_dist = float('inf')
-            collided_with_bone = None
-            closest_point_on_bone = None
-            ball_pos = np.array([ball.x, ball.y, ball.z])
-            
-            # 遍历所有骨骼，找到最近的碰撞点
-            for p1_id, p2_id in HAND_CONNECTIONS:
-                p1 = np.array(self.hand_landmarks_3d[p1_id])
-                p2 = np.array(self.hand_landmarks_3d[p2_id])
-                
-                line_vec = p2 - p1
-                point_vec = ball_pos - p1
-                line_len_sq = np.dot(line_vec, line_vec)
-
-                t = 0
-                if line_len_sq > 0:
-                    t = max(0, min(1, np.dot(point_vec, line_vec) / line_len_sq))
-                
-                closest_point_tmp = p1 + t * line_vec
-                dist = np.linalg.norm(ball_pos - closest_point_tmp)
-
-                if dist < min_dist:
-                    min_dist = dist
-                    collided_with_bone = (p1_id, p2_id)
-                    closest_point_on_bone = closest_point_tmp
-
-            # 3. 根据距离和手势决定行为
-            if collided_with_bone and min_dist < ball.radius + self.catch_distance / 2:
-                # A. 如果是抓取手势，则抓球
-                # (由于抓取逻辑已前置，此处均为张开的手)
-                bone_velocity = np.array(self.get_bone_velocity(collided_with_bone)) * self.throw_power_multiplier
-                velocity_magnitude = np.linalg.norm(bone_velocity)
-                
-                if velocity_magnitude > 5:
-                    normal = ball_pos - closest_point_on_bone
-                    if np.linalg.norm(normal) > 0:
-                        normal /= np.linalg.norm(normal)
-
-                    impact_speed = np.dot(bone_velocity, normal)
-                    
-                    ball.vx = bone_velocity[0] + normal[0] * abs(impact_speed) * 0.8
-                    ball.vy = bone_velocity[1] + normal[1] * abs(impact_speed) * 0.8
-                    ball.vz = bone_velocity[2] + normal[2] * abs(impact_speed) * 0.8
-
-                    ball.x += ball.vx
-                    ball.y += ball.vy
-                    ball.z += ball.vz
-
-                    ball.color = (100, 255, 100)
-                    self.score += 10
-                else:
-                    # 低速接触时轻微弹开，避免粘滞
-                    ball.vx *= -0.3
-                    ball.vy *= -0.3
-                    ball.vz *= -0.3
-            
+            index = first_within(positions, self.pinch_point, self.catch_distance)
+            if index is not None:
+                self.grabbed_ball = int(active[index])
+                self.score += 5
+                return # 抓到球后，立即返回，避免同一帧内还进行碰撞检测
+
+        # 2b. 如果没有发生抓取，则进行碰撞检测:
+        # 包围盒粗检测后，候选球到所有骨骼的最近距离一次广播算出，只有接触的球进入下面的响应
+        hits, _, bones, closest_points = self.collider.query(
+            positions, self.hand_landmarks_3d, world.radius[active] + self.catch_distance / 2)
+        if not len(hits):
+            return
+
+        # 3. 根据骨骼速度决定行为 (由于抓取逻辑已前置，此处均为张开的手)，响应同样整体计算
+        # 每个球使用它所碰到的骨骼自己的速度 (碰撞检测和运动学使用同一组 HAND_CONNECTIONS)
+        bone_velocity = self.kinematics.bone_velocity[bones] * self.throw_power_multiplier
+        fast = np.linalg.norm(bone_velocity, axis=1) > 300
+
+        normal = positions[hits] - closest_points
+        length = np.linalg.norm(normal, axis=1, keepdims=True)
+        normal = np.divide(normal, length, out=normal, where=length > 0)
+        impact_speed = np.abs(np.einsum("bk,bk->b", bone_velocity, normal))
+        hit_velocity = bone_velocity + normal * impact_speed[:, None] * 0.8
+
+        slots = active[hits]
+        world.velocity[slots[fast]] = hit_velocity[fast]
+        world.position[slots[fast]] += hit_velocity[fast] * self.tick
+        world.color[slots[fast]] = HIT_COLOR
+        self.score += 10 * int(fast.sum())
+        # 低速接触时轻微弹开，避免粘滞
+        world.velocity[slots[~fast]] *= -0.3
+
     def update_game(self):
-        """更新游戏逻辑"""
-        for ball in self.balls[:]:
-            ball.update(self.screen_width, self.screen_height)
-            if (ball.y > self.screen_height + 200 or 
-                ball.x < -200 or ball.x > self.screen_width + 200):
-                self.balls.remove(ball)
-                
+        """推进一个固定的物理步 (self.tick 秒)"""
+        self.world.step(self.tick, self.screen_width, self.screen_height)
+        self.world.remove(self.world.out_of_bounds(self.screen_width, self.screen_height))
+        if self.grabbed_ball is not None and not self.world.alive[self.grabbed_ball]:
+            self.grabbed_ball = None
+
         self.check_ball_hand_interaction()
         
         self.ball_spawn_timer += 1
         if self.ball_spawn_timer >= self.ball_spawn_interval:
             self.spawn_ball()
             self.ball_spawn_timer = 0
-            
-        if len(self.balls) > 8:
-            self.balls.pop(0)
-            
-    def draw_game(self, frame):
-        """绘制游戏画面 (AR)"""
+
+    def advance(self, elapsed):
+        """
+        按固定步长推进物理: 经过的真实时间加入累加器，每满 self.tick 秒运行一步，不足一步的部分留到下一帧。
+        物理速度因此与追踪和渲染的帧率无关，掉帧时会在下一帧补算。
+        :param elapsed: 距上一次调用的真实时间 (秒)，超过 max_frame_time 的部分丢弃。
+        :return: 渲染插值系数 (0~1)，即累加器中剩余时间占一步的比例。
+        """
+        self.accumulator += min(elapsed, self.max_frame_time)
+        while self.accumulator >= self.tick:
+            with self.tick_stats.timer():
+                self.update_game()
+            self.accumulator -= self.tick
+        return self.accumulator / self.tick
+
+    def draw_game(self, frame, alpha=1.0):
+        """
+        绘制游戏画面 (AR)
+        :param alpha: 物理状态的插值系数，见 advance()。
+        """
         # 1. 绘制手部骨骼（直接在摄像头画面上绘制，确保对齐）
-        if frame is not None and self.raw_landmarks:
+        if frame is not None and self.hand_pixels is not None:
+            points = [tuple(p) for p in self.hand_pixels[:, :2].tolist()]
             for p1_id, p2_id in HAND_CONNECTIONS:
-                p1 = self.raw_landmarks[p1_id]
-                p2 = self.raw_landmarks[p2_id]
-                p1_px = (int(p1[0] * self.cam_width), int(p1[1] * self.cam_height))
-                p2_px = (int(p2[0] * self.cam_width), int(p2[1] * self.cam_height))
-                cv2.line(frame, p1_px, p2_px, (0, 255, 255), 2)
-            for lm in self.raw_landmarks:
-                p_px = (int(lm[0] * self.cam_width), int(lm[1] * self.cam_height))
+                cv2.line(frame, points[p1_id], points[p2_id], (0, 255, 255), 2)
+            for p_px in points:
                 cv2.circle(frame, p_px, 3, (0, 255, 0), cv2.FILLED)
 
-        # 2. 将摄像头画面转为Pygame表面并显示
+        # 2. 将摄像头画面写入预分配的Pygame表面并显示 (BGR 直接写入，无需颜色转换)
         if frame is not None:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_surface = pygame.surfarray.make_surface(np.transpose(frame_rgb, (1, 0, 2)))
-            self.screen.blit(frame_surface, (0, 0))
+            self.screen.blit(self.presenter.update(frame), (0, 0))
         else:
             self.screen.fill((30, 30, 50))
 
         # 3. 绘制3D球体
-        for ball in self.balls:
-            ball.draw(self.screen)
+        self.world.draw(self.screen, alpha)
             
         # 4. 绘制UI
         score_text = self.font.render(f"分数: {self.score}", True, (255, 255, 255))
         self.screen.blit(score_text, (20, 20))
         
-        balls_text = self.small_font.render(f"球数: {len(self.balls)}", True, (255, 255, 255))
+        balls_text = self.small_font.render(f"球数: {len(self.world)}", True, (255, 255, 255))
         self.screen.blit(balls_text, (20, 80))
         
         # 显示抓取状态
@@ -447,6 +541,9 @@ class HandBallGame:
         grab_text_color = (255, 255, 0) if self.is_pinching else (255, 255, 255)
         grab_text = self.small_font.render(grab_text_str, True, grab_text_color)
         self.screen.blit(grab_text, (20, 110))
+
+        physics_text = self.small_font.render(f"物理: {self.tick_stats.mean_ms:.2f}ms/步", True, (200, 200, 200))
+        self.screen.blit(physics_text, (20, 140))
         
         instruction_text = self.small_font.render("捏合手指抓球, 松开投掷!", True, (200, 200, 200))
         text_rect = instruction_text.get_rect(centerx=self.screen_width/2, y=self.screen_height - 70)
@@ -468,6 +565,7 @@ class HandBallGame:
             self.spawn_ball()
             
         running = True
+        previous = time.perf_counter()
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
@@ -476,8 +574,10 @@ class HandBallGame:
                     self.spawn_ball()
                         
             frame = self.update_hand_tracking()
-            self.update_game()
-            self.draw_game(frame)
+            now = time.perf_counter()
+            alpha = self.advance(now - previous)
+            previous = now
+            self.draw_game(frame, alpha)
             
             # cv2.imshow已经被AR视图取代
             # if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -490,14 +590,36 @@ class HandBallGame:
     def cleanup(self):
         """清理资源"""
         print(f"游戏结束！最终分数: {self.score}")
+        print(f"物理步进 {self.tick_stats.count} 步 ({1 / self.tick:.0f}Hz), {self.tick_stats.mean_ms:.2f}ms/步 "
+              f"(最大 {self.tick_stats.max_ms:.2f}ms)")
+        tracker = self.hand_detector.tracker
+        if isinstance(tracker, InferenceScheduler):
+            print(f"推理 {tracker.inferences} 帧 ({tracker.stats.mean_ms:.1f}ms/帧), 外推 {tracker.predictions} 帧")
         self.cap.release()
         cv2.destroyAllWindows()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="3D手势抛接球 (AR)")
+    parser.add_argument("--record", help="把追踪结果录制到文件")
+    parser.add_argument("--replay", help="回放录制文件代替摄像头")
+    parser.add_argument("--replay-fast", action="store_true", help="尽可能快地回放，不按录制时的节奏")
+    parser.add_argument("--roi", action="store_true", help="只对手部附近的区域做推理")
+    parser.add_argument("--inference-width", type=int, default=None, help="送入模型的最大图像宽度 (像素)")
+    parser.add_argument("--infer-every", type=int, default=1, help="每隔多少帧运行一次推理，其余帧外推关键点")
+    parser.add_argument("--infer-cpu", type=float, default=None, help="推理最多占用的时间比例 (0~1)，按耗时自适应跳帧")
+    parser.add_argument("--filter", default="none", choices=["none", "ema", "one_euro", "kalman"], help="关键点时域滤波器")
+    parser.add_argument("--max-balls", type=int, default=8, help="场上最多的球数")
+    parser.add_argument("--spawn-interval", type=int, default=180, help="每隔多少个物理步生成一个新球")
+    parser.add_argument("--physics-hz", type=float, default=60, help="物理模拟的固定步频 (步/秒)")
+    args = parser.parse_args()
     try:
-        game = HandBallGame()
+        game = HandBallGame(record=args.record, replay=args.replay, replay_realtime=not args.replay_fast,
+                            roi=args.roi, inference_width=args.inference_width,
+                            infer_every=args.infer_every, infer_cpu=args.infer_cpu,
+                            landmark_filter=args.filter, max_balls=args.max_balls,
+                            spawn_interval=args.spawn_interval, physics_hz=args.physics_hz)
         game.run()
     except (KeyboardInterrupt, SystemExit):
         print("\n游戏被用户关闭")
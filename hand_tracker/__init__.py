@@ -0,0 +1,23 @@
+from .batch import run_batch
+from .collision import SegmentCollider, first_within
+from .core import (
+    HAND_CONNECTIONS, NUM_LANDMARKS, PIP_IDS, TIP_IDS,
+    HandFrame, HandTracker, draw_landmarks, find_camera,
+)
+from .events import GestureEventTracker
+from .filters import ExponentialFilter, FilteredTracker, KalmanFilter, OneEuroFilter, make_filter
+from .gestures import FEATURES, GESTURE_RULES, GestureClassifier, finger_features, hand_center, hand_rotation
+from .identity import HandIdentityTracker
+from .kinematics import HandKinematics, KinematicsTracker, sample_time
+from .multicam import MultiCameraManager, SourceStats
+from .pipeline import LatestQueue, StageStats, PipelineStage, ThreadedPipeline
+from .protocol import (
+    MAX_GESTURES, PROTOCOL_VERSION, DeltaDecoder, DeltaEncoder, PacketEncoder, decode, is_binary_packet, seq_gap,
+)
+from .recording import LandmarkRecorder, LandmarkReplay
+from .roi import RegionOfInterest
+from .scheduler import InferenceScheduler
+from .sharedmem import SharedLandmarkReader, SharedLandmarkWriter
+from .startup import CAMERA_CACHE, fast_start, open_camera
+from .streaming import PAYLOADS, StreamServer, Subscriber, WebSocketClient, gesture_command
+from .triangulation import HAND_LENGTH_CM, Calibration, CameraCalibration, hand_distance, triangulate_dlt
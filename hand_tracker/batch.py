@@ -0,0 +1,214 @@
+import multiprocessing
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .core import NUM_LANDMARKS, HandTracker
+from .gestures import GestureClassifier
+from .protocol import HANDEDNESS_CODES, HANDEDNESS_LABELS
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+# 每个工作进程各自持有自己的 HandTracker (MediaPipe 图不能跨进程共享)
+_worker_trackers = {}
+_worker_classifier = None
+_worker_options = None
+
+
+def list_sources(paths):
+    """
+    展开输入路径: 目录展开为其中的图片 (按文件名排序)，其余文件视为视频或单张图片。
+    :return: [(路径, 类型, 图片列表)]，类型为 "video" 或 "images"，视频的图片列表为 None。
+    """
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            images = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+            if images:
+                sources.append((path, "images", images))
+        elif path.lower().endswith(IMAGE_EXTENSIONS):
+            sources.append((path, "images", [path]))
+        else:
+            sources.append((path, "video", None))
+    return sources
+
+
+def make_tasks(sources, chunk_size):
+    """
+    把所有输入切分为任务块。视频按连续的帧区间切分 (块内可以使用跟踪模式)，图片按文件列表切分。
+    :return: ([(source_id, 类型, 输入, 起始帧, 结束帧, fps)], 输入路径列表)。
+             输入对视频为文件路径，对图片为该块的图片列表；结束帧为 None 表示读到结尾。
+    """
+    tasks = []
+    for source_id, (path, kind, images) in enumerate(sources):
+        if kind == "images":
+            for start in range(0, len(images), chunk_size):
+                tasks.append((source_id, kind, images[start:start + chunk_size], start, None, float("nan")))
+            continue
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            print(f"警告: 无法打开视频 {path}，已跳过")
+            continue
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or float("nan")
+        cap.release()
+        if frame_count <= 0:
+            # 帧数未知时由一个任务读到结尾
+            tasks.append((source_id, kind, path, 0, None, fps))
+            continue
+        for start in range(0, frame_count, chunk_size):
+            end = start + chunk_size if start + chunk_size < frame_count else None
+            tasks.append((source_id, kind, path, start, end, fps))
+    return tasks, [path for path, _, _ in sources]
+
+
+def _init_worker(options):
+    global _worker_classifier, _worker_options
+    _worker_options = options
+    _worker_classifier = GestureClassifier()
+
+
+def _get_tracker(kind):
+    """按需创建本进程的追踪器: 视频块内帧是连续的，使用跟踪模式；图片彼此独立，使用静态图像模式。"""
+    if kind not in _worker_trackers:
+        _worker_trackers[kind] = HandTracker(static_image_mode=(kind == "images"), **_worker_options)
+    return _worker_trackers[kind]
+
+
+def _iter_frames(kind, source, start, end):
+    """按顺序产生 (帧号, BGR图像)。"""
+    if kind == "images":
+        for offset, image_path in enumerate(source):
+            img = cv2.imread(image_path)
+            if img is not None:
+                yield start + offset, img
+        return
+
+    cap = cv2.VideoCapture(source)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    while end is None or index < end:
+        success, img = cap.read()
+        if not success:
+            break
+        yield index, img
+        index += 1
+    cap.release()
+
+
+def process_chunk(task):
+    """
+    在工作进程中处理一个任务块。
+    :return: (列数据 dict, 处理的帧数, 耗时秒数)。
+    """
+    source_id, kind, source, start, end, fps = task
+    tracker = _get_tracker(kind)
+    tracker.reset()
+
+    rows = {"frame": [], "hand": [], "landmarks": [], "handedness": [], "score": []}
+    frames, frame_hands = [], []
+    t0 = time.perf_counter()
+    for index, img in _iter_frames(kind, source, start, end):
+        frame = tracker.process_bgr(img)
+        frames.append(index)
+        frame_hands.append(frame.num_hands)
+        for hand in range(frame.num_hands):
+            rows["frame"].append(index)
+            rows["hand"].append(hand)
+            rows["handedness"].append(HANDEDNESS_CODES.get(frame.handedness[hand], 0))
+        rows["landmarks"].append(frame.landmarks.copy())
+        rows["score"].append(frame.scores.copy())
+    elapsed = time.perf_counter() - t0
+
+    landmarks = (np.concatenate(rows["landmarks"]) if rows["landmarks"]
+                 else np.zeros((0, NUM_LANDMARKS, 3), np.float32))
+    frame_index = np.asarray(rows["frame"], np.int32)
+    columns = {
+        "source": np.full(len(frame_index), source_id, np.int32),
+        "frame": frame_index,
+        "timestamp": frame_index / fps,
+        "hand": np.asarray(rows["hand"], np.int8),
+        "landmarks": landmarks,
+        "handedness": np.asarray(rows["handedness"], np.uint8),
+        "score": (np.concatenate(rows["score"]) if rows["score"] else np.zeros(0, np.float32)),
+        "gestures": _worker_classifier.classify(landmarks),
+        "frames_source": np.full(len(frames), source_id, np.int32),
+        "frames_index": np.asarray(frames, np.int32),
+        "frames_num_hands": np.asarray(frame_hands, np.int8),
+    }
+    return columns, len(frames), elapsed
+
+
+def merge_columns(chunks):
+    """合并所有任务块的列数据，并按 (source, frame, hand) 排序。"""
+    merged = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    order = np.lexsort((merged["hand"], merged["frame"], merged["source"]))
+    for key in ("source", "frame", "timestamp", "hand", "landmarks", "handedness", "score", "gestures"):
+        merged[key] = merged[key][order]
+    frame_order = np.lexsort((merged["frames_index"], merged["frames_source"]))
+    for key in ("frames_source", "frames_index", "frames_num_hands"):
+        merged[key] = merged[key][frame_order]
+    return merged
+
+
+def run_batch(paths, output, workers=None, chunk_size=300, max_num_hands=2, model_complexity=1,
+              min_detection_confidence=0.5, min_tracking_confidence=0.5, verbose=True):
+    """
+    离线批量处理视频文件或图片目录，结果写入列式的 .npz 文件。
+
+    输出文件的每一列是一个数组，每行一只检测到的手:
+    source, frame, timestamp, hand, landmarks (N, 21, 3), handedness (0=Left, 1=Right), score,
+    gestures (N, G)；以及每帧一行的 frames_source, frames_index, frames_num_hands，
+    和元数据 sources, gesture_names, handedness_labels。
+
+    :param paths: 视频文件、图片文件或图片目录的列表。
+    :param output: 输出 .npz 文件路径。
+    :param workers: 工作进程数，默认为CPU核心数。
+    :param chunk_size: 每个任务块的帧数。
+    :return: 统计信息 dict (frames, hands, seconds, fps, fps_per_worker)。
+    """
+    workers = workers or os.cpu_count() or 1
+    sources = list_sources(paths)
+    tasks, source_paths = make_tasks(sources, chunk_size)
+    if not tasks:
+        raise ValueError("没有可处理的输入")
+
+    options = dict(max_num_hands=max_num_hands, model_complexity=model_complexity,
+                   min_detection_confidence=min_detection_confidence,
+                   min_tracking_confidence=min_tracking_confidence)
+
+    t0 = time.perf_counter()
+    chunks, total_frames, busy = [], 0, 0.0
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(options,)) as pool:
+        for columns, num_frames, elapsed in pool.imap_unordered(process_chunk, tasks):
+            chunks.append(columns)
+            total_frames += num_frames
+            busy += elapsed
+            if verbose:
+                print(f"已处理 {total_frames} 帧 ({len(chunks)}/{len(tasks)} 块)")
+    wall = time.perf_counter() - t0
+
+    merged = merge_columns(chunks)
+    np.savez_compressed(
+        output,
+        sources=np.asarray(source_paths),
+        gesture_names=np.asarray(GestureClassifier().names),
+        handedness_labels=np.asarray(HANDEDNESS_LABELS),
+        **merged
+    )
+
+    stats = {
+        "frames": total_frames,
+        "hands": len(merged["frame"]),
+        "seconds": wall,
+        "workers": workers,
+        "fps": total_frames / wall if wall > 0 else 0.0,
+        # 每个核心的吞吐量: 按工作进程实际处理时间计算
+        "fps_per_worker": total_frames / busy if busy > 0 else 0.0,
+    }
+    return stats
@@ -0,0 +1,96 @@
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(samples):
+    """
+    把一组耗时 (秒) 汇总为毫秒统计。
+    :return: dict (n, mean_ms, min_ms, p50_ms, p95_ms, p99_ms, max_ms)。
+    """
+    ms = np.asarray(samples, np.float64) * 1000
+    stats = {"n": int(ms.size)}
+    if not ms.size:
+        return stats
+    stats["mean_ms"] = float(ms.mean())
+    stats["min_ms"] = float(ms.min())
+    for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES).tolist()):
+        stats[f"p{p}_ms"] = value
+    stats["max_ms"] = float(ms.max())
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in stats.items()}
+
+
+def measure(func, inputs, repeat=None, warmup=5, setup=None):
+    """
+    逐次计时 func(item)，inputs 循环使用。
+    :param func: 被测函数，参数为 inputs 中的一项。
+    :param inputs: 输入列表。
+    :param repeat: 计时次数，默认为 len(inputs)。
+    :param warmup: 开始计时前的预热次数。
+    :param setup: 每次调用前执行的 setup(item)，不计入耗时，用于重置被测对象的状态。
+    :return: summarize() 的结果。
+    """
+    if not inputs:
+        return {"n": 0}
+    repeat = len(inputs) if repeat is None else repeat
+    samples = []
+    for i in range(warmup + repeat):
+        item = inputs[i % len(inputs)]
+        if setup is not None:
+            setup(item)
+        t0 = time.perf_counter()
+        func(item)
+        elapsed = time.perf_counter() - t0
+        if i >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def environment():
+    """运行环境信息，随结果一起保存，便于对比不同提交或机器的结果。"""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    for module in ("cv2", "mediapipe", "pygame"):
+        if module in sys.modules:
+            info[module] = getattr(sys.modules[module], "__version__", "unknown")
+    try:
+        info["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                        text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info["commit"] = None
+    return info
+
+
+def compare(baseline, current, key="p50_ms", threshold=0.1):
+    """
+    对比两次基准测试的结果。
+    :param baseline: 基准结果 (results dict: 名称 -> 统计)。
+    :param current: 当前结果。
+    :param key: 对比的统计量。
+    :param threshold: 相对变化超过该比例时标记为变快或变慢。
+    :return: [(名称, 基准值, 当前值, 比值, 状态)]，状态为 "faster" / "slower" / "same"。
+    """
+    rows = []
+    for name, stats in current.items():
+        if name not in baseline or key not in baseline[name] or key not in stats:
+            continue
+        before, after = baseline[name][key], stats[key]
+        ratio = after / before if before > 0 else float("inf")
+        if ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "same"
+        rows.append((name, before, after, ratio, status))
+    return rows
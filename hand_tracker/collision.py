@@ -0,0 +1,74 @@
+import numpy as np
+
+from .core import HAND_CONNECTIONS
+
+
+class SegmentCollider:
+    """
+    球 (球心 + 作用距离) 与一组线段 (手部骨骼) 的碰撞检测，全部为 NumPy 广播运算:
+    - 粗检测: 手部关键点的包围盒按每个球的作用距离外扩，只保留球心落在包围盒内的球；
+    - 细检测: 候选球到所有骨骼的最近距离一次算出 ((候选数, 骨骼数) 的广播)，取最近的骨骼。
+    每帧的开销与球的总数近似线性 (粗检测)，Python 层面没有逐球、逐骨骼的循环。
+    """
+    def __init__(self, connections=HAND_CONNECTIONS):
+        """
+        :param connections: 骨骼连接 [(起点编号, 终点编号)]。
+        """
+        self.connections = list(connections)
+        self.starts = np.array([start for start, _ in self.connections])
+        self.ends = np.array([end for _, end in self.connections])
+        self.candidates = 0   # 上一次 query() 中通过粗检测的球数
+
+    def closest_points(self, positions, landmarks):
+        """
+        计算每个点到所有骨骼的最近距离。
+        :param positions: (B, 3) 球心坐标。
+        :param landmarks: (21, 3) 关键点坐标。
+        :return: (距离 (B,), 最近的骨骼在 connections 中的下标 (B,), 骨骼上的最近点 (B, 3))。
+        """
+        start = landmarks[self.starts]                   # (S, 3)
+        direction = landmarks[self.ends] - start         # (S, 3)
+        length_sq = np.einsum("sk,sk->s", direction, direction)
+        relative = positions[:, None, :] - start         # (B, S, 3)
+        # 投影参数 t 限制在 [0, 1]，长度为零的骨骼退化为端点 (t = 0)
+        t = np.einsum("bsk,sk->bs", relative, direction) / np.where(length_sq > 0, length_sq, 1.0)
+        np.clip(t, 0.0, 1.0, out=t)
+        offset = relative - t[..., None] * direction     # 球心 - 骨骼上的最近点
+        dist_sq = np.einsum("bsk,bsk->bs", offset, offset)
+        bone = dist_sq.argmin(axis=1)
+        rows = np.arange(len(positions))
+        closest = positions - offset[rows, bone]
+        return np.sqrt(dist_sq[rows, bone]), bone, closest
+
+    def query(self, positions, landmarks, reach):
+        """
+        找出与手接触的球。
+        :param positions: (B, 3) 球心坐标。
+        :param landmarks: (21, 3) 关键点坐标。
+        :param reach: 作用距离，标量或 (B,) 数组: 球心到最近骨骼的距离小于该值时判定为接触。
+        :return: (接触的球的下标, 距离, 骨骼下标, 骨骼上的最近点)，按球的下标升序。
+        """
+        positions = np.asarray(positions, np.float64).reshape(-1, 3)
+        landmarks = np.asarray(landmarks, np.float64)
+        reach = np.broadcast_to(np.asarray(reach, np.float64), len(positions))[:, None]
+        inside = ((positions >= landmarks.min(axis=0) - reach) & (positions <= landmarks.max(axis=0) + reach)).all(axis=1)
+        index = np.flatnonzero(inside)
+        self.candidates = len(index)
+        if not len(index):
+            return index, np.zeros(0), np.zeros(0, int), np.zeros((0, 3))
+        dist, bone, closest = self.closest_points(positions[index], landmarks)
+        hit = dist < reach[index, 0]
+        return index[hit], dist[hit], bone[hit], closest[hit]
+
+
+def first_within(positions, point, radius):
+    """
+    返回第一个 (按下标顺序) 与 point 的距离小于 radius 的点的下标，没有时返回 None。
+    :param positions: (B, 3) 坐标。
+    :param point: (3,) 坐标。
+    :param radius: 距离阈值。
+    """
+    positions = np.asarray(positions, np.float64).reshape(-1, 3)
+    offset = positions - np.asarray(point, np.float64)
+    hits = np.flatnonzero(np.einsum("bk,bk->b", offset, offset) < radius * radius)
+    return int(hits[0]) if len(hits) else None
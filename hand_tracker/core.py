@@ -0,0 +1,279 @@
+import itertools
+import operator
+
+import cv2
+import numpy as np
+
+from .identity import HandIdentityTracker
+from .roi import IDENTITY, RegionOfInterest
+
+NUM_LANDMARKS = 21
+
+# 手部骨骼连接 (与 mp.solutions.hands.HAND_CONNECTIONS 相同，顺序固定)
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),  # 拇指
+    (0, 5), (5, 6), (6, 7), (7, 8),  # 食指
+    (5, 9), (9, 10), (10, 11), (11, 12), # 中指
+    (9, 13), (13, 14), (14, 15), (15, 16), # 无名指
+    (13, 17), (17, 18), (18, 19), (19, 20), # 小指
+    (0, 17) # 手掌连接
+]
+
+TIP_IDS = [4, 8, 12, 16, 20]   # 指尖
+PIP_IDS = [3, 6, 10, 14, 18]   # 指尖下方的关节 (拇指为IP关节)
+
+# 一次取出一个 landmark 的 (x, y, z)，配合 map/chain 在C层面展开，避免逐点的Python循环
+_XYZ = operator.attrgetter("x", "y", "z")
+
+
+def find_camera(max_index=5):
+    """
+    尝试不同的摄像头索引，返回第一个能读出图像的摄像头。
+    :param max_index: 尝试的索引范围 [0, max_index)。
+    :return: cv2.VideoCapture 对象，找不到时返回 None。
+    """
+    for i in range(max_index):
+        cap = cv2.VideoCapture(i)
+        if cap.isOpened():
+            ret, frame = cap.read()
+            if ret and frame is not None:
+                print(f"找到可用摄像头，索引: {i}")
+                return cap
+            cap.release()
+    return None
+
+
+class HandFrame:
+    """
+    一帧的手部追踪结果。
+    - landmarks: (hands, 21, 3) float32 数组，归一化坐标 (x, y ∈ [0, 1]，z 为相对深度)。
+    - handedness: 每只手的左右手标签 ("Left" / "Right")。
+    - scores: (hands,) float32 数组，每只手的左右手分类置信度。
+    - image_size: 输入图像的 (宽, 高)，用于换算像素坐标。
+    - ids: 每只手跨帧稳定的编号 (见 HandIdentityTracker)，没有分配时为 None。
+
+    注意: 由 HandTracker 返回时，landmarks 和 scores 是追踪器内部缓冲区的视图，
+    下一次 process() 会覆盖其内容。需要跨帧保存时请调用 copy()。
+    """
+    def __init__(self, landmarks, handedness, scores, image_size, ids=None):
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.scores = scores
+        self.image_size = image_size
+        self.ids = ids
+
+    @classmethod
+    def empty(cls, image_size):
+        return cls(np.zeros((0, NUM_LANDMARKS, 3), np.float32), [], np.zeros(0, np.float32), image_size)
+
+    @property
+    def num_hands(self):
+        return len(self.landmarks)
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def __bool__(self):
+        return len(self.landmarks) > 0
+
+    def copy(self):
+        """返回不再引用追踪器缓冲区的独立副本。"""
+        ids = None if self.ids is None else list(self.ids)
+        return HandFrame(self.landmarks.copy(), list(self.handedness), self.scores.copy(), self.image_size, ids)
+
+    def index_of(self, hand_id):
+        """返回编号为 hand_id 的手在本帧中的位置，不在本帧中时返回 None。"""
+        if self.ids is None or hand_id not in self.ids:
+            return None
+        return self.ids.index(hand_id)
+
+    def scaled(self, scale, hand=None, out=None, dtype=np.int32):
+        """
+        把归一化坐标按 (sx, sy, sz) 缩放到目标坐标系，一次向量化运算完成。
+        转换为整数时与 int() 一样向零截断。
+        :param scale: 三个轴的缩放系数。
+        :param hand: 手的编号，None 表示所有手。
+        :param out: 可选的预分配输出数组，用于跨帧复用内存。
+        :param dtype: out 为 None 时新建数组的类型。
+        """
+        landmarks = self.landmarks if hand is None else self.landmarks[hand]
+        if out is None:
+            out = np.empty(landmarks.shape, dtype)
+        elif out.shape != landmarks.shape:
+            out = out[:len(landmarks)]
+        np.multiply(landmarks, scale, out=out, casting="unsafe")
+        return out
+
+    def pixels(self, hand=None, out=None):
+        """
+        返回像素坐标 (int32)，z 为相对深度乘以图像宽度。
+        :param hand: 手的编号，None 表示所有手。
+        :param out: 可选的预分配输出数组。
+        """
+        w, h = self.image_size
+        return self.scaled((w, h, w), hand, out)
+
+
+class HandTracker:
+    """
+    对 MediaPipe Hands 的统一封装，所有入口脚本共用。
+    每帧返回一个 HandFrame，坐标统一为 (hands, 21, 3) 的 float32 数组。
+    关键点写入预分配的缓冲区，跨帧复用，不会每帧新建列表。
+    """
+    def __init__(self, static_image_mode=False, max_num_hands=2, model_complexity=1,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 roi=False, roi_padding=0.5, inference_width=None, refresh_interval=30):
+        """
+        :param static_image_mode: 是否为静态图像模式。
+        :param max_num_hands: 最多检测几只手。
+        :param model_complexity: 地标模型的复杂度 (0或1)。
+        :param min_detection_confidence: 最小检测置信度。
+        :param min_tracking_confidence: 最小跟踪置信度。
+        :param roi: 是否只把上一帧手部附近的区域送入模型 (跟丢或定期刷新时回到全图)。
+        :param roi_padding: 裁剪框在手部包围盒每一侧外扩的比例。
+        :param inference_width: 送入模型的最大图像宽度 (像素)，None 表示不缩放。
+        :param refresh_interval: 使用 roi 时每隔多少帧做一次全图检测，以发现新进入画面的手。
+        """
+        # 在这里才导入 MediaPipe: 回放录制文件等只用到 HandFrame 的代码不需要它
+        import mediapipe as mp
+
+        self.max_num_hands = max_num_hands
+        self.hands = mp.solutions.hands.Hands( # type: ignore
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.results = None
+        self.recorder = None
+        self.region = RegionOfInterest(roi, roi_padding, inference_width, refresh_interval)
+        self.identities = HandIdentityTracker()
+
+        self._landmarks = np.zeros((max_num_hands, NUM_LANDMARKS, 3), np.float32)
+        self._scores = np.zeros(max_num_hands, np.float32)
+
+    def process(self, img_rgb):
+        """
+        对一张RGB图像运行手部检测。
+        :param img_rgb: RGB图像 (H, W, 3)。
+        :return: HandFrame，坐标总是相对于完整的输入图像。
+        """
+        return self._process(img_rgb, None)
+
+    def process_bgr(self, img_bgr):
+        """对一张BGR图像 (OpenCV 默认格式) 运行手部检测。颜色转换只作用于裁剪、缩放后的模型输入。"""
+        return self._process(img_bgr, cv2.COLOR_BGR2RGB)
+
+    def _process(self, img, color_code):
+        h, w = img.shape[:2]
+        full = self.region.use_full_frame()
+        frame = self._detect(img, color_code, full, (w, h))
+        if not full and not frame:
+            # 在裁剪区域内跟丢了: 同一帧立即做一次全图检测
+            full = True
+            frame = self._detect(img, color_code, full, (w, h))
+        self.region.update(frame.landmarks, full)
+        self._identify(frame)
+        if self.recorder is not None:
+            self.recorder.write(frame)
+        return frame
+
+    def _identify(self, frame):
+        """
+        分配稳定的手部编号，并按编号排序 (先出现的手在前)，
+        使同一只手在 landmarks 中的位置不会因为 MediaPipe 的输出顺序而逐帧交换。
+        self.results 保持 MediaPipe 的原始顺序。
+        """
+        ids = self.identities.update(frame.landmarks, frame.handedness)
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        if order != list(range(len(ids))):
+            frame.landmarks[:] = frame.landmarks[order]
+            frame.scores[:] = frame.scores[order]
+            frame.handedness = [frame.handedness[i] for i in order]
+            ids = [ids[i] for i in order]
+        frame.ids = ids
+
+    def _detect(self, img, color_code, full, image_size):
+        """
+        对裁剪、缩放后的图像运行模型，并把关键点映射回原图的归一化坐标。
+        self.results 保留 MediaPipe 的原始结果 (坐标相对于模型输入)。
+        """
+        sub, (sx, sy, ox, oy) = self.region.crop(img, full)
+        sub = np.ascontiguousarray(sub) if color_code is None else cv2.cvtColor(sub, color_code)
+        self.results = self.hands.process(sub)
+        frame = self.extract(self.results, image_size)
+        if (sx, sy, ox, oy) != IDENTITY:
+            # z 与 x 使用相同的尺度 (MediaPipe 的 z 以图像宽度归一化)
+            frame.landmarks *= (sx, sy, sx)
+            frame.landmarks += (ox, oy, 0.0)
+        return frame
+
+    def extract(self, results, image_size):
+        """
+        把 MediaPipe 的返回结果写入预分配的缓冲区，并返回引用该缓冲区的 HandFrame。
+        每只手的63个坐标由 np.fromiter 一次性读出，没有逐点的Python循环。
+        """
+        hands = results.multi_hand_landmarks or []
+        num_hands = min(len(hands), len(self._landmarks))
+        flat = self._landmarks.reshape(len(self._landmarks), -1)
+        for i in range(num_hands):
+            flat[i] = np.fromiter(itertools.chain.from_iterable(map(_XYZ, hands[i].landmark)),
+                                  np.float32, NUM_LANDMARKS * 3)
+
+        handedness = []
+        for i, hand_info in enumerate((results.multi_handedness or [])[:num_hands]):
+            handedness.append(hand_info.classification[0].label)
+            self._scores[i] = hand_info.classification[0].score
+        return HandFrame(self._landmarks[:num_hands], handedness, self._scores[:num_hands], image_size)
+
+    def start_recording(self, path, image_size=(640, 480)):
+        """
+        开始把每帧的结果追加写入录制文件 (格式见 hand_tracker/recording.py)。
+        :param path: 录制文件路径。
+        :param image_size: 图像的 (宽, 高)。
+        """
+        from .recording import LandmarkRecorder
+        self.stop_recording()
+        self.recorder = LandmarkRecorder(path, self.max_num_hands, image_size)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def warm_up(self, image_size=(640, 480)):
+        """
+        用一张空白图像运行一次模型，提前完成 MediaPipe 图的初始化 (第一次 process 时才会加载计算单元)，
+        使第一帧真实画面不会出现延迟尖峰。不经过裁剪、编号和录制，不影响追踪状态。
+        :param image_size: 图像的 (宽, 高)，与摄像头画面一致时预热最充分。
+        """
+        w, h = image_size
+        self.hands.process(np.zeros((h, w, 3), np.uint8))
+
+    def reset(self):
+        """清除跟踪状态，下一帧重新做全图检测 (例如切换到另一段视频时)。"""
+        self.hands.reset()
+        self.region.reset()
+        self.identities.reset()
+
+    def close(self):
+        self.stop_recording()
+        self.hands.close()
+
+
+def draw_landmarks(img, frame, connection_color=(224, 224, 224), landmark_color=(0, 0, 255),
+                   thickness=2, radius=2):
+    """
+    在图像上绘制所有手的骨架 (不依赖 MediaPipe 的 protobuf 结果，回放数据也能用)。
+    :param img: 目标BGR图像。
+    :param frame: HandFrame。
+    """
+    for hand in frame.pixels():
+        points = [tuple(p) for p in hand[:, :2].tolist()]
+        for p1_id, p2_id in HAND_CONNECTIONS:
+            cv2.line(img, points[p1_id], points[p2_id], connection_color, thickness)
+        for point in points:
+            cv2.circle(img, point, radius, landmark_color, cv2.FILLED)
+    return img
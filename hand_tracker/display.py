@@ -0,0 +1,46 @@
+import sys
+
+import numpy as np
+import pygame
+
+# 24 位 Surface 的通道掩码: 使像素在内存中的字节顺序与图像的通道顺序一致
+_MASKS = {
+    "RGB": (0x0000FF, 0x00FF00, 0xFF0000, 0),
+    "BGR": (0xFF0000, 0x00FF00, 0x0000FF, 0),
+}
+if sys.byteorder == "big":
+    _MASKS = {"RGB": _MASKS["BGR"], "BGR": _MASKS["RGB"]}
+
+
+class FramePresenter:
+    """
+    把摄像头画面写入预分配的 pygame Surface，供每帧 blit 到屏幕。
+    Surface 的像素格式与图像的通道顺序相同 (24 位 RGB 或 BGR)，写入只是一次按行的内存拷贝:
+    不做颜色转换、不转置，也不每帧新建 Surface；通道换序由 SDL 在 blit 时顺带完成。
+    因此 OpenCV 的 BGR 画面可以直接显示，检测器已经转换好的 RGB 画面也可以直接复用。
+    """
+    def __init__(self, channel_order="RGB"):
+        """
+        :param channel_order: 输入图像的通道顺序，"RGB" 或 "BGR"。
+        """
+        if channel_order not in _MASKS:
+            raise ValueError(f"未知的通道顺序: {channel_order}")
+        self.channel_order = channel_order
+        self.surface = None
+
+    def update(self, img):
+        """
+        把图像写入 Surface。
+        :param img: (H, W, 3) uint8 图像，通道顺序与 channel_order 一致。
+        :return: 写入后的 Surface (同一个对象跨帧复用，尺寸变化时才重新创建)。
+        """
+        h, w = img.shape[:2]
+        if self.surface is None or self.surface.get_size() != (w, h):
+            self.surface = pygame.Surface((w, h), 0, 24, _MASKS[self.channel_order])
+        # get_buffer() 是包含行尾填充的原始缓冲区 (w * 3 不是 4 的倍数时每行有填充，get_view("1") 会报错)
+        view = self.surface.get_buffer()
+        pixels = np.frombuffer(view, np.uint8).reshape(h, self.surface.get_pitch())
+        pixels[:, :w * 3] = img.reshape(h, w * 3)
+        # 释放缓冲区视图，解除对 Surface 的锁定，之后才能 blit
+        del pixels, view
+        return self.surface
@@ -0,0 +1,175 @@
+import math
+
+import numpy as np
+
+PALM = 9   # 中指根部，作为手掌位置
+
+
+class _HandState:
+    """一只手的手势状态: 每个手势是否成立、等待切换的起始时刻、成立的起始时刻。"""
+    def __init__(self, count, handedness):
+        self.handedness = handedness
+        self.active = np.zeros(count, bool)
+        self.pending_since = np.full(count, np.nan)
+        self.active_since = np.zeros(count)
+        self.held = np.zeros(count, bool)
+        self.swipe_armed = True
+        self.palm = None
+        self.time = None
+
+
+class GestureEventTracker:
+    """
+    把逐帧的手势判断结果转换为离散事件，只在状态变化时产生输出:
+    - gesture_start / gesture_end: 手势成立/结束。原始判断需要持续 min_on / min_off 秒才切换状态 (迟滞)，
+      单帧的误判不会产生事件。gesture_end 附带持续时间 duration。
+    - hold: 手势持续 hold_time 秒时产生一次。
+    - swipe: 手掌速度超过 swipe_speed 时产生一次 (direction 为 left / right / up / down)，
+      速度降到 swipe_speed * swipe_release 以下后才能再次触发。
+    - heartbeat: 超过 heartbeat 秒没有任何事件时产生一次，附带每只手当前成立的手势，接收端可以据此校正状态。
+    手按稳定编号 (没有时按左右手标签，同一标签的多只手再按出现顺序) 区分。短暂漏检的手保留状态，
+    它成立的手势同样要持续 min_off 秒没有出现才结束；确认离开 (update 的 left) 时立即结束。
+    """
+    def __init__(self, gesture_names, min_on=0.1, min_off=0.15, hold_time=0.8, swipe_speed=1.5,
+                 swipe_release=0.5, heartbeat=1.0):
+        """
+        :param gesture_names: 手势名，顺序与 GestureClassifier.classify 的列相同。
+        :param min_on: 原始判断持续成立多少秒后产生 gesture_start。
+        :param min_off: 原始判断持续不成立多少秒后产生 gesture_end。
+        :param hold_time: 手势持续多少秒后产生 hold，None 表示不产生。
+        :param swipe_speed: 触发 swipe 的手掌速度 (归一化坐标/秒，1 约为每秒划过一个画面宽度)，None 表示不检测。
+        :param swipe_release: 速度降到 swipe_speed 的该比例以下后重新允许 swipe。
+        :param heartbeat: 心跳间隔 (秒)，None 表示不发送心跳。
+        """
+        self.names = list(gesture_names)
+        self.min_on = min_on
+        self.min_off = min_off
+        self.hold_time = hold_time
+        self.swipe_speed = swipe_speed
+        self.swipe_release = swipe_release
+        self.heartbeat = heartbeat
+        self.hands = {}
+        self._last_emit = None
+
+    def update(self, frame, gestures, timestamp, palm_velocity=None, left=()):
+        """
+        :param frame: HandFrame。
+        :param gestures: (hands, len(gesture_names)) 手势布尔数组。
+        :param timestamp: 样本时间 (秒)。
+        :param palm_velocity: (hands, 3) 手掌速度 (归一化坐标/秒，例如 HandKinematics.velocity[9])，
+                              None 时由相邻两帧的手掌位置差分得到。
+        :param left: 已确认离开的手的编号 (HandIdentityTracker 的 leave 事件)，立即结束它们成立的手势。
+        :return: 本帧产生的事件列表，每个事件为 dict (type, hand_id, handedness, ...)。
+        """
+        keys = frame.ids if frame.ids is not None else self._label_keys(frame.handedness)
+        events = []
+        hands = {}
+        for i, key in enumerate(keys):
+            state = self.hands.get(key) or _HandState(len(self.names), frame.handedness[i])
+            state.handedness = frame.handedness[i]
+            hands[key] = state
+            velocity = palm_velocity[i] if palm_velocity is not None else None
+            self._update_gestures(key, state, np.asarray(gestures[i], bool), timestamp, events)
+            self._update_swipe(key, state, frame.landmarks[i], velocity, timestamp, events)
+
+        # 本帧没有出现的手: 可能只是漏检，按原始判断都不成立处理，持续 min_off 秒后才结束手势；
+        # 确认离开的手立即结束。没有成立的手势后不再保留状态
+        left = set(left)
+        for key, state in self.hands.items():
+            if key in hands:
+                continue
+            if key in left:
+                for g in np.flatnonzero(state.active).tolist():
+                    events.append(self._event("gesture_end", key, state, self.names[g],
+                                              duration=float(timestamp - state.active_since[g])))
+                continue
+            self._update_gestures(key, state, np.zeros(len(self.names), bool), timestamp, events)
+            if state.active.any():
+                state.palm = None
+                hands[key] = state
+        self.hands = hands
+
+        if events or self._last_emit is None:
+            self._last_emit = timestamp
+        elif self.heartbeat is not None and timestamp - self._last_emit >= self.heartbeat:
+            self._last_emit = timestamp
+            events.append({"type": "heartbeat", "hands": [
+                {"hand_id": key, "handedness": self.hands[key].handedness, "gestures": names}
+                for key, names in self.active_gestures().items()
+            ]})
+        return events
+
+    def active_gestures(self):
+        """每只手当前成立 (经过迟滞) 的手势: {hand_id: [手势名, ...]}。"""
+        return {key: [self.names[g] for g in np.flatnonzero(state.active).tolist()]
+                for key, state in self.hands.items()}
+
+    @staticmethod
+    def _label_keys(handedness):
+        """没有稳定编号时按左右手标签区分，同一标签的第二只手起加序号 (Left、Left_2)。"""
+        counts = {}
+        keys = []
+        for label in handedness:
+            counts[label] = counts.get(label, 0) + 1
+            keys.append(label if counts[label] == 1 else f"{label}_{counts[label]}")
+        return keys
+
+    def _update_gestures(self, key, state, raw, t, events):
+        # 原始判断与当前状态不同的手势开始计时，持续足够久才切换 (成立和结束的时间阈值不同)
+        changed = raw != state.active
+        state.pending_since[~changed] = np.nan
+        state.pending_since[changed & np.isnan(state.pending_since)] = t
+        threshold = np.where(state.active, self.min_off, self.min_on)
+        flip = changed & (t - state.pending_since >= threshold)
+        ends = flip & state.active
+        starts = flip & ~state.active
+        state.active ^= flip
+        state.pending_since[flip] = np.nan
+        state.held[ends] = False
+
+        for g in np.flatnonzero(ends).tolist():
+            events.append(self._event("gesture_end", key, state, self.names[g],
+                                      duration=float(t - state.active_since[g])))
+        state.active_since[starts] = t
+        for g in np.flatnonzero(starts).tolist():
+            events.append(self._event("gesture_start", key, state, self.names[g]))
+
+        if self.hold_time is not None:
+            held = state.active & ~state.held & (t - state.active_since >= self.hold_time)
+            state.held |= held
+            for g in np.flatnonzero(held).tolist():
+                events.append(self._event("hold", key, state, self.names[g],
+                                          duration=float(t - state.active_since[g])))
+
+    def _update_swipe(self, key, state, landmarks, velocity, t, events):
+        palm = landmarks[PALM]
+        if velocity is None:
+            if state.palm is not None and t > state.time:
+                velocity = (palm - state.palm) / (t - state.time)
+            else:
+                velocity = (0.0, 0.0)
+        state.palm, state.time = palm.copy(), t
+        if self.swipe_speed is not None:
+            vx, vy = float(velocity[0]), float(velocity[1])
+            speed = math.hypot(vx, vy)
+            if state.swipe_armed and speed >= self.swipe_speed:
+                state.swipe_armed = False
+                if abs(vx) >= abs(vy):
+                    direction = "right" if vx > 0 else "left"
+                else:
+                    direction = "down" if vy > 0 else "up"
+                events.append(self._event("swipe", key, state, direction=direction, speed=speed))
+            elif speed < self.swipe_speed * self.swipe_release:
+                state.swipe_armed = True
+
+    @staticmethod
+    def _event(kind, key, state, gesture=None, **fields):
+        event = {"type": kind, "hand_id": key, "handedness": state.handedness}
+        if gesture is not None:
+            event["gesture"] = gesture
+        event.update(fields)
+        return event
+
+    def reset(self):
+        self.hands = {}
+        self._last_emit = None
@@ -0,0 +1,213 @@
+import math
+import time
+
+import numpy as np
+
+from .core import HandFrame
+
+
+class LandmarkFilter:
+    """
+    关键点时域滤波器的基类。
+    对整个 (hands, 21, 3) 数组做向量化运算，每只手有独立的状态，按手的键 (稳定编号或左右手标签) 对应:
+    手的顺序变化时状态跟着手走，新出现的手从测量值开始，消失的手的状态被丢弃。
+    子类实现 _init_state(x) 和 _step(x, dt, fresh)。
+    """
+    def __init__(self):
+        self._keys = []
+        self._last_time = None
+        self._out = None
+
+    def __call__(self, landmarks, keys, timestamp=None):
+        """
+        :param landmarks: (hands, 21, 3) 关键点数组。
+        :param keys: 每只手的键，优先使用 HandFrame.ids，没有时使用左右手标签。
+        :param timestamp: 本帧时间 (秒)，默认为 time.perf_counter()。
+        :return: 滤波后的 (hands, 21, 3) 数组 (滤波器内部的缓冲区，下一次调用会覆盖)。
+        """
+        now = time.perf_counter() if timestamp is None else timestamp
+        dt = now - self._last_time if self._last_time is not None else 0.0
+        self._last_time = now
+
+        x = np.asarray(landmarks, np.float32)
+        previous = {key: i for i, key in enumerate(self._keys)}
+        source = np.array([previous.get(key, -1) for key in keys], int)
+        fresh = source < 0
+        self._keys = list(keys)
+        if self._out is None or len(self._out) != len(x) or (source != np.arange(len(x))).any():
+            self._gather(x, source, fresh)
+        if len(x):
+            self._step(x, max(dt, 1e-6), fresh)
+        return self._out
+
+    def _gather(self, x, source, fresh):
+        """按手的键重新排列状态数组: 仍然存在的手沿用自己的状态，新出现的手使用初始状态。"""
+        kept = ~fresh
+        state = self._init_state(x)
+        out = x.copy()
+        if self._out is not None and kept.any():
+            out[kept] = self._out[source[kept]]
+            for name, value in state.items():
+                value[kept] = getattr(self, name)[source[kept]]
+        self._out = out
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _init_state(self, x):
+        return {}
+
+    def _step(self, x, dt, fresh):
+        raise NotImplementedError
+
+    def reset(self):
+        self._keys = []
+        self._last_time = None
+        self._out = None
+
+
+class ExponentialFilter(LandmarkFilter):
+    """指数滑动平均: y = alpha * x + (1 - alpha) * y_prev。"""
+    def __init__(self, alpha=0.5):
+        """
+        :param alpha: 新数据的权重 (0~1)，越小越平滑、延迟越大。
+        """
+        super().__init__()
+        self.alpha = alpha
+
+    def _step(self, x, dt, fresh):
+        out = self._out
+        out += self.alpha * (x - out)
+        out[fresh] = x[fresh]
+
+
+class OneEuroFilter(LandmarkFilter):
+    """
+    One-Euro 滤波器 (Casiez et al., 2012): 截止频率随速度自适应，
+    静止时强力去抖，快速移动时延迟小。坐标为归一化坐标，beta 的默认值按此设置。
+    """
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        """
+        :param min_cutoff: 最小截止频率 (Hz)，越小静止时越平滑。
+        :param beta: 速度系数，越大快速移动时延迟越小。
+        :param d_cutoff: 速度估计的截止频率 (Hz)。
+        """
+        super().__init__()
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _init_state(self, x):
+        return {"_dx": np.zeros_like(x)}
+
+    def _step(self, x, dt, fresh):
+        out, dx = self._out, self._dx
+        dx += self._alpha(self.d_cutoff, dt) * ((x - out) / dt - dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(dx)
+        out += self._alpha(cutoff, dt) * (x - out)
+        out[fresh] = x[fresh]
+        dx[fresh] = 0
+
+
+class KalmanFilter(LandmarkFilter):
+    """
+    匀速模型的卡尔曼滤波器，每个坐标独立，状态为 (位置, 速度)。
+    2x2 协方差矩阵按元素展开为三个数组 (p00, p01, p11)，整个 (hands, 21, 3) 数组一次更新。
+    """
+    def __init__(self, process_noise=0.1, measurement_noise=1e-5):
+        """
+        :param process_noise: 加速度噪声强度，越大越信任测量值 (延迟小、去抖弱)。
+        :param measurement_noise: 测量噪声方差 (归一化坐标的平方)。
+        """
+        super().__init__()
+        self.q = process_noise
+        self.r = measurement_noise
+
+    def _init_state(self, x):
+        return {"_v": np.zeros_like(x), "_p00": np.full_like(x, self.r), "_p01": np.zeros_like(x),
+                "_p11": np.full_like(x, self.q)}
+
+    def _step(self, x, dt, fresh):
+        out, v, p00, p01, p11 = self._out, self._v, self._p00, self._p01, self._p11
+        # 预测: x += v * dt，P = F P F^T + Q
+        out += v * dt
+        p00 += dt * (2 * p01 + dt * p11) + self.q * dt ** 3 / 3
+        p01 += dt * p11 + self.q * dt ** 2 / 2
+        p11 += self.q * dt
+        # 更新
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        y = x - out
+        out += k0 * y
+        v += k1 * y
+        p11 -= k1 * p01
+        p01 *= 1 - k0
+        p00 *= 1 - k0
+        # 新出现的手: 直接采用测量值
+        out[fresh] = x[fresh]
+        v[fresh] = 0
+        p00[fresh], p01[fresh], p11[fresh] = self.r, 0, self.q
+
+
+FILTERS = {
+    "ema": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def make_filter(name, **kwargs):
+    """
+    按名称创建滤波器。
+    :param name: "ema" / "one_euro" / "kalman"，None 或 "none" 返回 None。
+    """
+    if name in (None, "none"):
+        return None
+    if name not in FILTERS:
+        raise ValueError(f"未知的滤波器: {name}")
+    return FILTERS[name](**kwargs)
+
+
+class FilteredTracker:
+    """
+    给追踪器加上滤波阶段，接口与 HandTracker 相同 (process / process_bgr)，
+    可以直接替换任何入口脚本中的追踪器。
+    """
+    def __init__(self, tracker, landmark_filter):
+        """
+        :param tracker: 被包装的追踪器。
+        :param landmark_filter: LandmarkFilter 实例。
+        """
+        self.tracker = tracker
+        self.filter = landmark_filter
+
+    @property
+    def results(self):
+        return self.tracker.results
+
+    @property
+    def identities(self):
+        return self.tracker.identities
+
+    def process(self, img_rgb, timestamp=None, **kwargs):
+        # 其余参数原样传给被包装的追踪器 (例如 LandmarkReplay 的 index)
+        return self._apply(self.tracker.process(img_rgb, **kwargs), timestamp)
+
+    def process_bgr(self, img_bgr, timestamp=None, **kwargs):
+        return self._apply(self.tracker.process_bgr(img_bgr, **kwargs), timestamp)
+
+    def _apply(self, frame, timestamp):
+        keys = frame.handedness if frame.ids is None else frame.ids
+        landmarks = self.filter(frame.landmarks, keys, timestamp)
+        return HandFrame(landmarks, frame.handedness, frame.scores, frame.image_size, frame.ids)
+
+    def reset(self):
+        self.filter.reset()
+        self.tracker.reset()
+
+    def close(self):
+        self.tracker.close()
@@ -0,0 +1,121 @@
+import numpy as np
+
+from .core import PIP_IDS, TIP_IDS
+
+FINGER_NAMES = ["thumb", "index", "middle", "ring", "pinky"]
+
+# 每帧从关键点计算一次的布尔特征:
+# - <finger>_up:   指尖在下方关节上方 (y 更小)，即手指伸出
+# - <finger>_down: 指尖在下方关节下方 (y 更大)，即手指弯曲
+# - thumb_raised:  拇指竖直向上 (指尖 4 < IP关节 3 < MCP关节 2)
+FEATURES = ([f"{name}_up" for name in FINGER_NAMES] +
+            [f"{name}_down" for name in FINGER_NAMES] +
+            ["thumb_raised"])
+
+_DOWN = ["thumb_down", "index_down", "middle_down", "ring_down", "pinky_down"]
+_UP = ["thumb_up", "index_up", "middle_up", "ring_up", "pinky_up"]
+
+# 手势规则表: 手势名 -> [(特征列表, 至少满足的个数), ...]
+# 一个手势的所有条件都满足时成立。新增手势只需添加一行。
+GESTURE_RULES = {
+    "thumb_up": [(["thumb_raised"], 1), (_DOWN[1:], 3)],
+    "fist": [(_DOWN, 4)],
+    "open_hand": [(_UP, 4)],
+    "pointing": [(["index_up"], 1), (["thumb_down", "middle_down", "ring_down", "pinky_down"], 3)],
+    "peace": [(["index_up", "middle_up"], 2), (["thumb_down", "ring_down", "pinky_down"], 2)],
+}
+
+
+def finger_features(landmarks):
+    """
+    计算手指伸展/弯曲特征，对任意批量一次完成。
+    :param landmarks: (..., 21, 3) 关键点数组。
+    :return: (..., len(FEATURES)) 布尔数组，列顺序与 FEATURES 相同。
+    """
+    landmarks = np.asarray(landmarks)
+    tip_y = landmarks[..., TIP_IDS, 1]
+    pip_y = landmarks[..., PIP_IDS, 1]
+    thumb_raised = (landmarks[..., 4, 1] < landmarks[..., 3, 1]) & (landmarks[..., 3, 1] < landmarks[..., 2, 1])
+    return np.concatenate([tip_y < pip_y, tip_y > pip_y, thumb_raised[..., None]], axis=-1)
+
+
+class GestureClassifier:
+    """
+    表驱动的批量手势分类器。
+    规则表在初始化时编译成两个矩阵:
+    - 条件矩阵 (条件数, 特征数): 每个条件统计哪些特征成立，与阈值比较。
+    - 规则矩阵 (手势数, 条件数): 一个手势要求它的所有条件都成立。
+    每帧只计算一次特征，再用两次矩阵乘法得到所有手势，手势数量不影响逐帧的Python开销。
+    """
+    def __init__(self, rules=None):
+        """
+        :param rules: 手势规则表，格式同 GESTURE_RULES，默认使用 GESTURE_RULES。
+        """
+        self.rules = dict(GESTURE_RULES if rules is None else rules)
+        self._compile()
+
+    def _compile(self):
+        clauses = [clause for clauses in self.rules.values() for clause in clauses]
+        self._clause_matrix = np.zeros((len(clauses), len(FEATURES)), np.int32)
+        self._thresholds = np.zeros(len(clauses), np.int32)
+        for i, (features, min_count) in enumerate(clauses):
+            for feature in features:
+                if feature not in FEATURES:
+                    raise ValueError(f"未知的手势特征: {feature}")
+                self._clause_matrix[i, FEATURES.index(feature)] = 1
+            self._thresholds[i] = min_count
+
+        self._rule_matrix = np.zeros((len(self.rules), len(clauses)), np.int32)
+        start = 0
+        for i, clauses in enumerate(self.rules.values()):
+            self._rule_matrix[i, start:start + len(clauses)] = 1
+            start += len(clauses)
+        self._rule_sizes = self._rule_matrix.sum(axis=1)
+        self.names = list(self.rules)
+
+    def add_rule(self, name, clauses):
+        """
+        添加或替换一个手势规则。
+        :param name: 手势名。
+        :param clauses: [(特征列表, 至少满足的个数), ...]。
+        """
+        self.rules[name] = clauses
+        self._compile()
+
+    def classify(self, landmarks):
+        """
+        对任意批量的手进行分类，例如单只手 (21, 3)、一帧 (hands, 21, 3) 或整段录制 (frames, hands, 21, 3)。
+        :param landmarks: (..., 21, 3) 关键点数组。
+        :return: (..., len(self.names)) 布尔数组，列顺序与 self.names 相同。
+        """
+        features = finger_features(landmarks).astype(np.int32)
+        clause_pass = (features @ self._clause_matrix.T) >= self._thresholds
+        return (clause_pass.astype(np.int32) @ self._rule_matrix.T) == self._rule_sizes
+
+    def classify_dict(self, landmarks):
+        """对单只手 (21, 3) 分类，返回 {手势名: bool}。"""
+        return dict(zip(self.names, self.classify(landmarks).tolist()))
+
+    def check(self, name, landmarks):
+        """判断单只手是否为指定手势。"""
+        return bool(self.classify(landmarks)[self.names.index(name)])
+
+
+def hand_rotation(landmarks):
+    """
+    计算手部旋转角度 (度)：手腕(0) -> 中指根部(9) 的方向，对任意批量一次完成。
+    :param landmarks: (..., 21, 3) 关键点数组。
+    :return: (...) 角度数组。
+    """
+    landmarks = np.asarray(landmarks)
+    delta = landmarks[..., 9, :2] - landmarks[..., 0, :2]
+    return np.degrees(np.arctan2(delta[..., 1], delta[..., 0]))
+
+
+def hand_center(landmarks):
+    """
+    计算手部中心点 (21个关键点的平均值)。
+    :param landmarks: (..., 21, 3) 关键点数组。
+    :return: (..., 3) 数组。
+    """
+    return np.asarray(landmarks).mean(axis=-2)
@@ -0,0 +1,105 @@
+import collections
+import time
+
+import numpy as np
+
+# 手掌上比较稳定的关键点: 手腕和四个掌指关节，用它们的平均位置作为手的位置
+PALM_IDS = [0, 5, 9, 13, 17]
+
+
+class _Track:
+    def __init__(self, hand_id, handedness, center, timestamp):
+        self.id = hand_id
+        self.handedness = handedness
+        self.center = center
+        self.velocity = np.zeros(2)
+        self.last_seen = timestamp
+        self.missing = 0
+
+
+class HandIdentityTracker:
+    """
+    给每只手分配跨帧稳定的编号。
+    MediaPipe 返回的手的顺序可能逐帧交换，这里按手掌位置 (匀速外推) 和左右手标签，
+    对已有的轨迹做贪心最近邻匹配: 代价最小的一对先配对，超过 max_distance 的不配对。
+    没有匹配上的手开始一条新轨迹 (enter 事件)；连续 max_missing 帧没有出现的轨迹被移除 (leave 事件)，
+    短暂的漏检不会换编号。
+    进入/离开事件累积在 self.events 中，由使用方调用 pop_events() 取走。
+    """
+    def __init__(self, max_distance=0.2, max_missing=5, handedness_penalty=0.1):
+        """
+        :param max_distance: 手掌位置的最大匹配距离 (归一化坐标)。
+        :param max_missing: 轨迹最多允许连续丢失的帧数。
+        :param handedness_penalty: 左右手标签不一致时加到匹配代价上的值 (标签偶尔会误判，所以不直接禁止)。
+        """
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.handedness_penalty = handedness_penalty
+        self.tracks = {}
+        self.next_id = 0
+        self.events = collections.deque(maxlen=64)
+
+    def update(self, landmarks, handedness, timestamp=None):
+        """
+        :param landmarks: (hands, 21, 3) 关键点数组。
+        :param handedness: 每只手的左右手标签。
+        :param timestamp: 本帧时间 (秒)，默认为 time.perf_counter()。
+        :return: 每只手的编号列表，顺序与 landmarks 相同。
+                 新的进入/离开事件追加到 self.events，每个事件为 ("enter" 或 "leave", 编号, 左右手标签)。
+        """
+        now = time.perf_counter() if timestamp is None else timestamp
+        centers = np.asarray(landmarks)[:, PALM_IDS, :2].mean(axis=1) if len(landmarks) else np.zeros((0, 2))
+        tracks = list(self.tracks.values())
+        ids = [None] * len(centers)
+
+        if tracks and len(centers):
+            predicted = np.array([t.center + t.velocity * (now - t.last_seen) for t in tracks])
+            cost = np.linalg.norm(predicted[:, None] - centers[None], axis=-1)
+            cost += self.handedness_penalty * np.array(
+                [[t.handedness != label for label in handedness] for t in tracks])
+            used_tracks, used_hands = set(), set()
+            for flat in np.argsort(cost, axis=None):
+                t, h = divmod(int(flat), len(centers))
+                if cost[t, h] > self.max_distance:
+                    break
+                if t in used_tracks or h in used_hands:
+                    continue
+                used_tracks.add(t)
+                used_hands.add(h)
+                track = tracks[t]
+                dt = now - track.last_seen
+                if dt > 0:
+                    track.velocity = (centers[h] - track.center) / dt
+                track.center = centers[h]
+                track.handedness = handedness[h]
+                track.last_seen = now
+                track.missing = 0
+                ids[h] = track.id
+
+        for h, hand_id in enumerate(ids):
+            if hand_id is None:
+                track = _Track(self.next_id, handedness[h], centers[h], now)
+                self.tracks[track.id] = track
+                self.next_id += 1
+                ids[h] = track.id
+                self.events.append(("enter", track.id, track.handedness))
+
+        seen = set(ids)
+        for track in tracks:
+            if track.id not in seen:
+                track.missing += 1
+                if track.missing > self.max_missing:
+                    del self.tracks[track.id]
+                    self.events.append(("leave", track.id, track.handedness))
+        return ids
+
+    def pop_events(self):
+        """取走并清空尚未处理的进入/离开事件。"""
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def reset(self):
+        """清除所有轨迹 (不产生 leave 事件)，编号继续递增。"""
+        self.tracks = {}
+        self.events.clear()
@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+
+from .core import HAND_CONNECTIONS, NUM_LANDMARKS
+from .recording import LandmarkReplay
+
+
+def sample_time(cap):
+    """
+    当前样本的时间戳 (秒)，只用于计算时间差: 回放时为录制时间 (与回放速度无关)，摄像头为当前时刻。
+    :param cap: 刚刚 read() 过的 cv2.VideoCapture 或 LandmarkReplay。
+    """
+    if isinstance(cap, LandmarkReplay):
+        return cap.get(0) / 1000    # cv2.CAP_PROP_POS_MSEC
+    return time.perf_counter()
+
+
+class HandKinematics:
+    """
+    一只手所有关键点的速度和加速度 (单位/秒、单位/秒²，单位与输入坐标相同)。
+    最近 history 个样本保存在环形缓冲区中，每次更新用带时间戳的最小二乘二次拟合
+    一次算出 21 个关键点 63 个坐标的速度和加速度 (最新样本处的导数)，帧间隔不均匀时也按真实时间换算。
+    骨骼的速度和加速度取两端关键点的平均值 (骨骼中点)。
+    """
+    def __init__(self, history=4, connections=HAND_CONNECTIONS):
+        """
+        :param history: 用于拟合的样本数 (至少 2；2 个样本时为差分，没有加速度)。
+        :param connections: 骨骼连接 [(起点编号, 终点编号)]。
+        """
+        if history < 2:
+            raise ValueError("history 至少为 2")
+        self.history = history
+        self.connections = list(connections)
+        self.starts = np.array([start for start, _ in self.connections])
+        self.ends = np.array([end for _, end in self.connections])
+        self.positions = np.zeros((history, NUM_LANDMARKS, 3))
+        self.timestamps = np.zeros(history)
+        self.velocity = np.zeros((NUM_LANDMARKS, 3))
+        self.acceleration = np.zeros((NUM_LANDMARKS, 3))
+        self.count = 0
+        self.head = 0   # 下一次写入的位置
+
+    @property
+    def bone_velocity(self):
+        """(骨骼数, 3) 各骨骼中点的速度，顺序与 connections 相同。"""
+        return (self.velocity[self.starts] + self.velocity[self.ends]) / 2
+
+    @property
+    def bone_acceleration(self):
+        return (self.acceleration[self.starts] + self.acceleration[self.ends]) / 2
+
+    def update(self, landmarks, timestamp):
+        """
+        加入一个样本并重新估计速度和加速度。时间戳没有增加 (例如回放循环到开头) 时先清空历史。
+        :param landmarks: (21, 3) 坐标。
+        :param timestamp: 样本时间 (秒)。
+        :return: self。
+        """
+        if self.count and timestamp <= self.timestamps[(self.head - 1) % self.history]:
+            self.reset()
+        self.positions[self.head] = landmarks
+        self.timestamps[self.head] = timestamp
+        self.head = (self.head + 1) % self.history
+        self.count = min(self.count + 1, self.history)
+        if self.count < 2:
+            return self
+
+        # 环形缓冲区中样本的先后顺序不影响拟合，只取有效的样本，时间以最新样本为原点
+        valid = slice(None) if self.count == self.history else slice(0, self.count)
+        t = self.timestamps[valid] - timestamp
+        values = self.positions[valid].reshape(len(t), -1)
+        degree = min(self.count - 1, 2)
+        basis = np.vander(t, degree + 1, increasing=True)     # [1, t, t²]
+        coeffs = np.linalg.lstsq(basis, values, rcond=None)[0]
+        self.velocity[:] = coeffs[1].reshape(NUM_LANDMARKS, 3)
+        if degree == 2:
+            self.acceleration[:] = 2 * coeffs[2].reshape(NUM_LANDMARKS, 3)
+        return self
+
+    def reset(self):
+        self.count = 0
+        self.head = 0
+        self.velocity[:] = 0
+        self.acceleration[:] = 0
+
+
+class KinematicsTracker:
+    """按稳定编号为一帧中的每只手维护一个 HandKinematics，不在本帧中的手被丢弃。"""
+    def __init__(self, history=4):
+        self.history = history
+        self.hands = {}
+
+    def update(self, frame, timestamp):
+        """
+        :param frame: HandFrame。
+        :param timestamp: 样本时间 (秒)。
+        :return: 与 frame 中各手顺序相同的 HandKinematics 列表。
+        """
+        ids = frame.ids if frame.ids is not None else range(frame.num_hands)
+        hands = {}
+        for hand_id, landmarks in zip(ids, frame.landmarks):
+            kinematics = self.hands.get(hand_id) or HandKinematics(self.history)
+            hands[hand_id] = kinematics.update(landmarks, timestamp)
+        self.hands = hands
+        return list(hands.values())
+
+    def reset(self):
+        self.hands = {}
@@ -0,0 +1,231 @@
+import collections
+import multiprocessing
+import queue
+import time
+
+import cv2
+
+from .core import HandFrame
+
+
+def open_source(source):
+    """打开摄像头 (整数索引或 "0" 这样的数字字符串) 或视频文件。"""
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    return cv2.VideoCapture(source), not isinstance(source, int)
+
+
+def _camera_worker(camera_id, source, options, flip, realtime, results, stop_event, dropped):
+    """
+    工作进程: 读取一个输入源，运行自己的 HandTracker，把每帧结果放入共享队列。
+    队列已满时丢弃本帧结果 (计入 dropped)，不阻塞采集。
+    """
+    # 在子进程中导入，避免主进程为每个输入源各建一个 MediaPipe 图
+    from .core import HandTracker
+    from .filters import FilteredTracker, make_filter
+
+    options = dict(options)
+    landmark_filter = make_filter(options.pop("landmark_filter", None))
+    tracker = HandTracker(**options)
+    if landmark_filter is not None:
+        tracker = FilteredTracker(tracker, landmark_filter)
+
+    cap, is_file = open_source(source)
+    if not cap.isOpened():
+        results.put(("error", camera_id, f"无法打开输入源 {source}"))
+        return
+    interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30) if is_file and realtime else 0.0
+    seq = 0
+    next_time = time.perf_counter()
+    try:
+        while not stop_event.is_set():
+            success, img = cap.read()
+            if not success:
+                if is_file:
+                    break
+                continue
+            timestamp = time.time()
+            if flip:
+                img = cv2.flip(img, 1)
+            t0 = time.perf_counter()
+            frame = tracker.process_bgr(img)
+            inference = time.perf_counter() - t0
+            item = ("frame", camera_id, seq, timestamp, inference, frame.landmarks.copy(), list(frame.handedness),
+                    frame.scores.copy(), frame.ids, frame.image_size)
+            try:
+                results.put_nowait(item)
+            except queue.Full:
+                with dropped.get_lock():
+                    dropped.value += 1
+            seq += 1
+            if interval:
+                # 视频文件按原始帧率读取，与实时摄像头对齐
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_time = time.perf_counter()
+    finally:
+        cap.release()
+        tracker.close()
+        results.put(("eof", camera_id, seq))
+
+
+class SourceStats:
+    """单个输入源的统计: 帧率、推理耗时和丢帧数。"""
+    def __init__(self, camera_id, source, window=60):
+        self.camera_id = camera_id
+        self.source = source
+        self.frames = 0
+        self.dropped = 0          # 被更新的帧覆盖、没有进入对齐输出的帧
+        self.worker_dropped = 0   # 队列已满时在工作进程中丢弃的帧
+        self.finished = False
+        self.error = None
+        self.timestamps = collections.deque(maxlen=window)
+        self.inference = collections.deque(maxlen=window)
+
+    @property
+    def fps(self):
+        if len(self.timestamps) < 2 or self.timestamps[-1] <= self.timestamps[0]:
+            return 0.0
+        return (len(self.timestamps) - 1) / (self.timestamps[-1] - self.timestamps[0])
+
+    @property
+    def inference_ms(self):
+        return sum(self.inference) / len(self.inference) * 1000 if self.inference else 0.0
+
+    def __repr__(self):
+        return (f"cam{self.camera_id} ({self.source}): {self.fps:.1f} fps, 推理 {self.inference_ms:.1f}ms, "
+                f"丢弃 {self.dropped + self.worker_dropped}")
+
+
+class MultiCameraManager:
+    """
+    多摄像头采集管理器。
+    每个输入源 (摄像头索引或视频文件) 一个工作进程，各自运行 HandTracker；
+    主进程把各路结果合并为按时间戳对齐的数据流: 每次 read() 以各路最新帧中最早的时间戳为基准，
+    为每一路挑选时间上最接近的一帧。
+    """
+    def __init__(self, sources, tracker_options=None, flip=True, realtime=True, buffer_size=8, queue_size=64):
+        """
+        :param sources: 输入源列表，元素为摄像头索引 (int 或数字字符串) 或视频文件路径。
+        :param tracker_options: 传给每个 HandTracker 的参数，可额外包含 landmark_filter (滤波器名称)。
+        :param flip: 是否水平翻转画面 (与单摄像头程序的镜像效果一致)。
+        :param realtime: 视频文件是否按原始帧率读取 (False 表示尽可能快)。
+        :param buffer_size: 对齐时每一路保留的最近帧数。
+        :param queue_size: 工作进程到主进程的结果队列容量。
+        """
+        self.sources = list(sources)
+        self.tracker_options = dict(tracker_options or {})
+        self.flip = flip
+        self.realtime = realtime
+        ctx = multiprocessing.get_context("spawn")
+        self._ctx = ctx
+        self._results = ctx.Queue(queue_size)
+        self._stop = ctx.Event()
+        self._dropped = [ctx.Value("i", 0) for _ in self.sources]
+        self._buffers = [collections.deque(maxlen=buffer_size) for _ in self.sources]
+        self._emitted = [-1] * len(self.sources)
+        self.stats = [SourceStats(i, source) for i, source in enumerate(self.sources)]
+        self.processes = []
+
+    def start(self):
+        for i, source in enumerate(self.sources):
+            process = self._ctx.Process(
+                target=_camera_worker, name=f"camera-{i}", daemon=True,
+                args=(i, source, self.tracker_options, self.flip, self.realtime, self._results, self._stop,
+                      self._dropped[i]))
+            process.start()
+            self.processes.append(process)
+        return self
+
+    @property
+    def running(self):
+        return not all(stats.finished for stats in self.stats)
+
+    def _drain(self, timeout):
+        """取出队列中的所有结果，放入各路的缓冲区。"""
+        try:
+            item = self._results.get(timeout=timeout)
+        except queue.Empty:
+            self._check_workers()
+            return
+        while True:
+            kind, camera_id = item[0], item[1]
+            stats = self.stats[camera_id]
+            if kind == "frame":
+                _, _, seq, timestamp, inference, landmarks, handedness, scores, ids, image_size = item
+                stats.frames += 1
+                stats.timestamps.append(timestamp)
+                stats.inference.append(inference)
+                frame = HandFrame(landmarks, handedness, scores, image_size, ids)
+                self._buffers[camera_id].append((seq, timestamp, frame))
+            elif kind == "error":
+                stats.error = item[2]
+                stats.finished = True
+                print(f"错误: {item[2]}")
+            else:
+                stats.finished = True
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+        for stats, dropped in zip(self.stats, self._dropped):
+            stats.worker_dropped = dropped.value
+        self._check_workers()
+
+    def _check_workers(self):
+        """工作进程异常退出时不会发送结束标记，这里把它标记为已结束，避免 read() 一直等待。"""
+        for process, stats in zip(self.processes, self.stats):
+            if not stats.finished and process.exitcode not in (None, 0):
+                stats.error = f"工作进程异常退出 (exitcode={process.exitcode})"
+                stats.finished = True
+                print(f"错误: cam{stats.camera_id} {stats.error}")
+
+    def read(self, timeout=1.0):
+        """
+        等待所有仍在运行的输入源都有新帧，返回按时间戳对齐的一组结果。
+        :param timeout: 最长等待秒数。
+        :return: (基准时间戳, {camera_id: (时间戳, HandFrame)})，超时或全部结束时返回 None。
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            self._drain(timeout=max(0.0, min(0.05, deadline - time.perf_counter())))
+            active = [i for i, stats in enumerate(self.stats) if not stats.finished or self._has_new(i)]
+            if not active:
+                return None
+            if all(self._has_new(i) for i in active):
+                break
+            if time.perf_counter() >= deadline:
+                return None
+
+        reference = min(self._buffers[i][-1][1] for i in active)
+        aligned = {}
+        for i in active:
+            seq, timestamp, frame = min(self._buffers[i], key=lambda entry: abs(entry[1] - reference))
+            # 两次输出之间被跳过的帧计为丢弃
+            if self._emitted[i] >= 0:
+                self.stats[i].dropped += max(0, seq - self._emitted[i] - 1)
+            self._emitted[i] = max(seq, self._emitted[i])
+            aligned[i] = (timestamp, frame)
+        return reference, aligned
+
+    def _has_new(self, camera_id):
+        buffer = self._buffers[camera_id]
+        return bool(buffer) and buffer[-1][0] > self._emitted[camera_id]
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
@@ -0,0 +1,200 @@
+import collections
+import threading
+import time
+
+
+class LatestQueue:
+    """
+    有界队列，写满时丢弃最旧的元素。
+    消费者总是拿到最新的数据，慢速阶段不会让上游阻塞。
+    """
+    def __init__(self, maxsize=1):
+        """
+        :param maxsize: 队列最多保留的元素个数。
+        """
+        self._items = collections.deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        """放入一个元素，队列已满时挤掉最旧的元素。"""
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        取出最旧的一个元素。
+        :param timeout: 最长等待秒数，None 表示一直等待。
+        :return: 元素，超时返回 None。
+        """
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def get_latest(self, timeout=0):
+        """
+        取出最新的元素并清空队列，较旧的元素计入丢弃数。
+        :param timeout: 队列为空时最长等待秒数，0 表示不等待，None 表示一直等待。
+        :return: 元素，没有数据时返回 None。
+        """
+        with self._cond:
+            if not self._items and timeout != 0:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def __len__(self):
+        return len(self._items)
+
+
+class StageStats:
+    """单个阶段的耗时统计 (最近 window 次的滑动窗口)。"""
+    def __init__(self, name, window=120):
+        self.name = name
+        self.count = 0
+        self.samples = collections.deque(maxlen=window)
+
+    def record(self, seconds):
+        self.count += 1
+        self.samples.append(seconds)
+
+    def timer(self):
+        """上下文管理器，用 with 语句统计一段代码的耗时。"""
+        return _StageTimer(self)
+
+    @property
+    def last_ms(self):
+        return self.samples[-1] * 1000 if self.samples else 0.0
+
+    @property
+    def mean_ms(self):
+        return sum(self.samples) / len(self.samples) * 1000 if self.samples else 0.0
+
+    @property
+    def max_ms(self):
+        return max(self.samples) * 1000 if self.samples else 0.0
+
+    def __repr__(self):
+        return f"{self.name}: {self.mean_ms:.1f}ms (max {self.max_ms:.1f}ms, n={self.count})"
+
+
+class _StageTimer:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(time.perf_counter() - self.t0)
+        return False
+
+
+class PipelineStage(threading.Thread):
+    """
+    流水线中的一个工作线程。
+    从 in_queue 取数据，调用 func 处理后放入 out_queue。
+    in_queue 为 None 时作为数据源，反复调用 func() 产生数据。
+    func 返回 None 表示本次没有输出 (例如读帧失败)。
+    """
+    def __init__(self, name, func, in_queue, out_queue, stop_event):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.stats = StageStats(name)
+        self.error = None
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                if self.in_queue is None:
+                    with self.stats.timer():
+                        result = self.func()
+                else:
+                    item = self.in_queue.get(timeout=0.1)
+                    if item is None:
+                        continue
+                    with self.stats.timer():
+                        result = self.func(item)
+                if result is not None:
+                    self.out_queue.put(result)
+        except Exception as e:
+            self.error = e
+            self.stop_event.set()
+
+
+class ThreadedPipeline:
+    """
+    采集 -> 推理 -> ... 的多线程流水线。
+    每个阶段一个线程，阶段之间用丢弃旧帧的有界队列连接，
+    整体吞吐量由最慢的阶段决定，而不是所有阶段耗时之和。
+    最后一个阶段的输出放在 self.output 中，由主线程 (例如 pygame 渲染) 消费。
+    """
+    def __init__(self, source, *stages, queue_size=1):
+        """
+        :param source: 无参数的数据源函数，例如读取摄像头的一帧。
+        :param stages: (名称, 函数) 元组，依次处理上一阶段的输出。
+        :param queue_size: 阶段之间队列的容量。
+        """
+        self.stop_event = threading.Event()
+        self.queues = []
+        self.stages = []
+
+        in_queue = None
+        for name, func in (("capture", source),) + stages:
+            out_queue = LatestQueue(queue_size)
+            self.stages.append(PipelineStage(name, func, in_queue, out_queue, self.stop_event))
+            self.queues.append(out_queue)
+            in_queue = out_queue
+        self.output = in_queue
+
+    @property
+    def stats(self):
+        """各阶段的耗时统计，按阶段名称索引。"""
+        return {stage.name: stage.stats for stage in self.stages}
+
+    @property
+    def dropped(self):
+        """各阶段输出队列中被丢弃的帧数。"""
+        return {stage.name: queue.dropped for stage, queue in zip(self.stages, self.queues)}
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    def check(self):
+        """如果有工作线程出错，在调用线程中重新抛出异常。"""
+        for stage in self.stages:
+            if stage.error is not None:
+                raise stage.error
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        for stage in self.stages:
+            if stage.is_alive():
+                stage.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
@@ -0,0 +1,347 @@
+"""
+UE5 UDP 数据流的二进制协议 (JSON 的紧凑替代)。
+
+数据包布局 (小端序):
+
+    头部 (17 字节)
+        magic       2s   b"HT"
+        version     u8   协议版本 (PROTOCOL_VERSION)
+        flags       u8   bit0: 关键点为 int16 量化
+        seq         u32  序号，每发送一包加一
+        timestamp   f64  time.time()
+        num_hands   u8   手的数量
+
+    每只手一条定长记录 (HAND_DTYPE / HAND_DTYPE_Q16)
+        handedness  u1   0 = Left, 1 = Right
+        gestures    u2   手势位域，bit i 对应 gesture_names[i] (最多 MAX_GESTURES 个手势)
+        score       f4   左右手分类置信度
+        rotation    f4   手部旋转角度 (度)
+        center      3*f4 手部中心点 (归一化坐标)
+        landmarks   63*f4，或量化时 63*i2 (值 = round(x * QUANT_SCALE))
+
+两只手的 float32 数据包为 567 字节，int16 量化后为 315 字节，同样内容的 JSON 约 3KB。
+所有手的记录用 NumPy 结构化数组一次写出/读入，不逐个格式化浮点数。
+
+增量模式 (DeltaEncoder / DeltaDecoder):
+周期性发送 int16 量化的关键帧 (即上面的完整数据包)，两个关键帧之间只发送增量包 (flags bit1):
+
+    头部 (17 字节，同上)
+    base_seq        u32  该增量所基于的上一个数据包的序号
+    每只手一条记录 (DELTA_DTYPE)
+        gesture_changed u1   手势是否变化
+        deltas          63*i1 相对上一帧的关键点增量，单位为 DELTA_STEP 个量化步长
+    手势位域          每个 gesture_changed 的手一个 u2
+
+两只手的增量包为 149 字节 (手势不变时)。编码端按接收端的重建结果计算下一帧的增量 (闭环)，误差不会累积。
+旋转角度和中心点由接收端从关键点重新计算。丢包后接收端丢弃后续增量，直到下一个关键帧。
+"""
+import struct
+import time
+
+import numpy as np
+
+from .gestures import GESTURE_RULES, hand_center, hand_rotation
+
+MAGIC = b"HT"
+PROTOCOL_VERSION = 1
+FLAG_QUANTIZED = 0x01
+FLAG_DELTA = 0x02
+
+# int16 量化的缩放系数: 分辨率约 6e-5，可表示 [-2, 2) 范围内的归一化坐标
+QUANT_SCALE = 16384.0
+
+# 增量的单位 (量化步长的倍数)。int8 增量每帧最多表示 ±127 * 4 / 16384 ≈ 0.031 (640宽画面约20像素)
+DELTA_STEP = 4
+
+HEADER = struct.Struct("<2sBBIdB")
+DELTA_HEADER = struct.Struct("<I")
+SEQ_MASK = 0xFFFFFFFF   # 序号为 u32，溢出后从 0 重新开始
+
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+HANDEDNESS_LABELS = ["Left", "Right"]
+
+_HAND_FIELDS = [
+    ("handedness", "u1"),
+    ("gestures", "<u2"),
+    ("score", "<f4"),
+    ("rotation", "<f4"),
+    ("center", "<f4", (3,)),
+]
+HAND_DTYPE = np.dtype(_HAND_FIELDS + [("landmarks", "<f4", (21, 3))])
+HAND_DTYPE_Q16 = np.dtype(_HAND_FIELDS + [("landmarks", "<i2", (21, 3))])
+DELTA_DTYPE = np.dtype([("gesture_changed", "u1"), ("deltas", "i1", (21, 3))])
+GESTURE_BITS_DTYPE = np.dtype("<u2")
+MAX_GESTURES = GESTURE_BITS_DTYPE.itemsize * 8   # 手势位域的位数
+
+
+def is_binary_packet(packet):
+    """根据 magic 判断一个 UDP 数据包是否为二进制协议 (否则为 JSON)。"""
+    return packet[:2] == MAGIC
+
+
+def quantize(landmarks):
+    """把归一化坐标量化为 int16 数值 (以 int32 返回，便于计算增量)。"""
+    return np.clip(np.rint(np.asarray(landmarks) * QUANT_SCALE), -32768, 32767).astype(np.int32)
+
+
+def check_gesture_count(count):
+    """手势数超出位域的位数时抛出 ValueError (否则多出的手势会被静默丢弃)。"""
+    if count > MAX_GESTURES:
+        raise ValueError(f"手势位域最多容纳 {MAX_GESTURES} 个手势，实际为 {count} 个")
+
+
+def pack_gestures(gestures):
+    """
+    把 (hands, G) 布尔数组压缩为位域。
+    :return: (hands,) uint16 数组。
+    """
+    gestures = np.asarray(gestures, bool)
+    check_gesture_count(gestures.shape[-1])
+    weights = 1 << np.arange(gestures.shape[-1], dtype=np.uint16)
+    return (gestures * weights).sum(axis=-1).astype(np.uint16)
+
+
+def unpack_gestures(bits, count):
+    """把位域还原为 (hands, count) 布尔数组。"""
+    check_gesture_count(count)
+    bits = np.asarray(bits, np.uint16)
+    return (bits[..., None] >> np.arange(count, dtype=np.uint16)) & 1 == 1
+
+
+class PacketEncoder:
+    """
+    二进制数据包编码器，维护发送序号。
+    """
+    def __init__(self, quantize=False):
+        """
+        :param quantize: 是否把关键点量化为 int16 (体积约减半，精度约 6e-5)。
+        """
+        self.quantize = quantize
+        self.seq = 0
+        self._dtype = HAND_DTYPE_Q16 if quantize else HAND_DTYPE
+        self._records = np.zeros(0, self._dtype)
+
+    def encode(self, landmarks, handedness, gestures, rotation, center, scores=None, timestamp=None):
+        """
+        编码一帧。
+        :param landmarks: (hands, 21, 3) 归一化坐标数组。
+        :param handedness: 每只手的左右手标签。
+        :param gestures: (hands, G) 手势布尔数组，列顺序与 GESTURE_RULES 相同。
+        :param rotation: (hands,) 手部旋转角度。
+        :param center: (hands, 3) 手部中心点。
+        :param scores: (hands,) 左右手分类置信度，可选。
+        :param timestamp: 时间戳，默认为 time.time()。
+        :return: bytes。
+        """
+        num_hands = len(landmarks)
+        if len(self._records) != num_hands:
+            self._records = np.zeros(num_hands, self._dtype)
+        records = self._records
+        if num_hands:
+            records["handedness"] = [HANDEDNESS_CODES.get(label, 0) for label in handedness]
+            records["gestures"] = pack_gestures(gestures)
+            records["score"] = 0 if scores is None else scores
+            records["rotation"] = rotation
+            records["center"] = center
+            if self.quantize:
+                records["landmarks"] = quantize(landmarks)
+            else:
+                records["landmarks"] = landmarks
+
+        flags = FLAG_QUANTIZED if self.quantize else 0
+        timestamp = time.time() if timestamp is None else timestamp
+        header = HEADER.pack(MAGIC, PROTOCOL_VERSION, flags, self.seq, timestamp, num_hands)
+        self.seq = (self.seq + 1) & SEQ_MASK
+        return header + records.tobytes()
+
+
+def seq_gap(seq, last_seq):
+    """
+    从 last_seq 到 seq 之间丢失的包数 (按 u32 回绕计算)。
+    :return: 丢失的包数；seq 不比 last_seq 新 (重复或乱序到达) 时返回 None。
+    """
+    gap = (seq - last_seq) & SEQ_MASK
+    if gap == 0 or gap > SEQ_MASK // 2:
+        return None
+    return gap - 1
+
+
+def _unpack_header(packet):
+    if len(packet) < HEADER.size:
+        raise ValueError("数据包长度不足")
+    magic, version, flags, seq, timestamp, num_hands = HEADER.unpack_from(packet)
+    if magic != MAGIC:
+        raise ValueError("不是二进制手势数据包")
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"不支持的协议版本: {version}")
+    return magic, version, flags, seq, timestamp, num_hands
+
+
+def decode(packet, gesture_names=None):
+    """
+    解码一个二进制数据包。
+    :param packet: bytes。
+    :param gesture_names: 手势名列表，默认使用 GESTURE_RULES 的顺序。
+    :return: dict，包含 version, seq, timestamp, quantized, landmarks (hands, 21, 3) float32,
+             handedness, scores, gestures {手势名: (hands,) 布尔数组}, rotation, center。
+    """
+    magic, version, flags, seq, timestamp, num_hands = _unpack_header(packet)
+    if flags & FLAG_DELTA:
+        raise ValueError("增量数据包需要使用 DeltaDecoder 解码")
+
+    quantized = bool(flags & FLAG_QUANTIZED)
+    dtype = HAND_DTYPE_Q16 if quantized else HAND_DTYPE
+    if len(packet) != HEADER.size + num_hands * dtype.itemsize:
+        raise ValueError("数据包长度与手的数量不符")
+    records = np.frombuffer(packet, dtype, count=num_hands, offset=HEADER.size)
+
+    landmarks = records["landmarks"].astype(np.float32)
+    if quantized:
+        landmarks /= QUANT_SCALE
+
+    names = list(GESTURE_RULES) if gesture_names is None else gesture_names
+    bits = unpack_gestures(records["gestures"], len(names))
+    return {
+        "version": version,
+        "seq": seq,
+        "timestamp": timestamp,
+        "quantized": quantized,
+        "keyframe": True,
+        "landmarks": landmarks,
+        "handedness": [HANDEDNESS_LABELS[code] for code in records["handedness"].tolist()],
+        "scores": records["score"].astype(np.float32),
+        "gestures": {name: bits[:, i] for i, name in enumerate(names)},
+        "rotation": records["rotation"].astype(np.float32),
+        "center": records["center"].astype(np.float32),
+    }
+
+
+class DeltaEncoder(PacketEncoder):
+    """
+    关键帧 + 增量的编码器，适合在拥塞的局域网上传输多路追踪数据。
+    以下情况发送关键帧: 第一帧、距上一个关键帧已达 keyframe_interval 包、
+    手的数量或左右手变化、某个增量超出 int8 范围 (快速运动)。
+    """
+    def __init__(self, keyframe_interval=30):
+        """
+        :param keyframe_interval: 每隔多少个数据包强制发送一次关键帧。
+        """
+        super().__init__(quantize=True)
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = 0
+        self._since_keyframe = 0
+        self._reference = None      # 接收端重建出的量化关键点 (hands, 21, 3) int32
+        self._handedness = None
+        self._gesture_bits = None
+
+    def force_keyframe(self):
+        """下一次 encode 强制发送关键帧。"""
+        self._reference = None
+
+    def encode(self, landmarks, handedness, gestures, rotation, center, scores=None, timestamp=None):
+        """编码一帧，参数同 PacketEncoder.encode。返回关键帧或增量包。"""
+        quantized = quantize(landmarks)
+        bits = pack_gestures(gestures) if len(landmarks) else np.zeros(0, np.uint16)
+
+        deltas = None
+        if (self._reference is not None and self._since_keyframe < self.keyframe_interval
+                and list(handedness) == self._handedness and len(landmarks) > 0):
+            deltas = np.rint((quantized - self._reference) / DELTA_STEP)
+            if np.abs(deltas).max() > 127:
+                deltas = None
+
+        if deltas is None:
+            packet = super().encode(landmarks, handedness, gestures, rotation, center, scores, timestamp)
+            self._reference = quantized
+            self._handedness = list(handedness)
+            self._gesture_bits = bits
+            self._since_keyframe = 1
+            self.keyframes += 1
+            return packet
+
+        records = np.zeros(len(landmarks), DELTA_DTYPE)
+        records["deltas"] = deltas
+        changed = bits != self._gesture_bits
+        records["gesture_changed"] = changed
+        # 按接收端的重建方式更新参考帧，保证两端一致
+        self._reference = self._reference + records["deltas"].astype(np.int32) * DELTA_STEP
+        self._gesture_bits = bits
+        self._since_keyframe += 1
+
+        timestamp = time.time() if timestamp is None else timestamp
+        header = HEADER.pack(MAGIC, PROTOCOL_VERSION, FLAG_QUANTIZED | FLAG_DELTA, self.seq, timestamp, len(landmarks))
+        base_seq = DELTA_HEADER.pack((self.seq - 1) & SEQ_MASK)
+        self.seq = (self.seq + 1) & SEQ_MASK
+        return header + base_seq + records.tobytes() + bits[changed].astype(GESTURE_BITS_DTYPE).tobytes()
+
+
+class DeltaDecoder:
+    """
+    关键帧 + 增量数据流的解码器 (有状态)，也能解码普通的二进制数据包。
+    出现丢包时丢弃后续增量，直到收到下一个关键帧。
+    """
+    def __init__(self, gesture_names=None):
+        """
+        :param gesture_names: 手势名列表，默认使用 GESTURE_RULES 的顺序。
+        """
+        self.gesture_names = list(GESTURE_RULES) if gesture_names is None else gesture_names
+        check_gesture_count(len(self.gesture_names))
+        self.latest = None          # 最近一次重建出的完整帧 (decode 返回的 dict)
+        self.last_seq = None
+        self.dropped = 0            # 因丢包而无法重建的增量包数
+        self._reference = None
+
+    def decode(self, packet):
+        """
+        解码一个数据包。
+        :return: 与 protocol.decode 相同格式的 dict；增量包无法重建时返回 None。
+        """
+        magic, version, flags, seq, timestamp, num_hands = _unpack_header(packet)
+        if not flags & FLAG_DELTA:
+            data = decode(packet, self.gesture_names)
+            self.latest = data
+            self.last_seq = seq
+            self._reference = quantize(data["landmarks"]) if data["quantized"] else None
+            return data
+
+        (base_seq,) = DELTA_HEADER.unpack_from(packet, HEADER.size)
+        previous = self.latest
+        if (self._reference is None or base_seq != self.last_seq
+                or previous is None or len(previous["handedness"]) != num_hands):
+            self.dropped += 1
+            self._reference = None
+            return None
+
+        offset = HEADER.size + DELTA_HEADER.size
+        records = np.frombuffer(packet, DELTA_DTYPE, count=num_hands, offset=offset)
+        changed = records["gesture_changed"].astype(bool)
+        offset += num_hands * DELTA_DTYPE.itemsize
+        if len(packet) != offset + int(changed.sum()) * GESTURE_BITS_DTYPE.itemsize:
+            raise ValueError("增量数据包长度不符")
+
+        self._reference = self._reference + records["deltas"].astype(np.int32) * DELTA_STEP
+        landmarks = (self._reference / QUANT_SCALE).astype(np.float32)
+
+        gestures = {name: values.copy() for name, values in previous["gestures"].items()}
+        if changed.any():
+            bits = np.frombuffer(packet, GESTURE_BITS_DTYPE, offset=offset)
+            unpacked = unpack_gestures(bits, len(self.gesture_names))
+            for i, name in enumerate(self.gesture_names):
+                gestures[name][changed] = unpacked[:, i]
+
+        data = {
+            "version": version,
+            "seq": seq,
+            "timestamp": timestamp,
+            "quantized": True,
+            "keyframe": False,
+            "landmarks": landmarks,
+            "handedness": previous["handedness"],
+            "scores": previous["scores"],
+            "gestures": gestures,
+            "rotation": hand_rotation(landmarks).astype(np.float32),
+            "center": hand_center(landmarks).astype(np.float32),
+        }
+        self.latest = data
+        self.last_seq = seq
+        return data
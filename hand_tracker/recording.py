@@ -0,0 +1,241 @@
+"""
+关键点录制与回放。
+
+录制文件是只追加的二进制文件:
+
+    文件头 (16 字节)
+        magic       4s   b"HTRC"
+        version     u8   RECORDING_VERSION
+        max_hands   u8   每帧最多保存几只手
+        width       u16  原始图像宽度
+        height      u16  原始图像高度
+        (6 字节保留)
+
+    每帧一条定长记录 (record_dtype(max_hands))
+        timestamp   f8   time.time()
+        num_hands   u1
+        handedness  u1 * max_hands   0 = Left, 1 = Right
+        scores      f4 * max_hands
+        landmarks   f4 * max_hands * 21 * 3   归一化坐标
+
+记录定长，回放时整个文件用 np.memmap 映射，按帧号直接索引，不需要解析或拷贝。
+程序异常退出时最后一条不完整的记录会被忽略。
+"""
+import os
+import struct
+import time
+
+import numpy as np
+
+from .core import NUM_LANDMARKS, HandFrame
+from .identity import HandIdentityTracker
+from .protocol import HANDEDNESS_CODES, HANDEDNESS_LABELS
+
+RECORDING_MAGIC = b"HTRC"
+RECORDING_VERSION = 1
+FILE_HEADER = struct.Struct("<4sBBHH6x")
+
+
+def record_dtype(max_hands):
+    """每帧记录的结构化类型。"""
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("num_hands", "u1"),
+        ("handedness", "u1", (max_hands,)),
+        ("scores", "<f4", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, 3)),
+    ])
+
+
+def read_header(path):
+    """读取录制文件头，返回 (max_hands, (宽, 高))。"""
+    with open(path, "rb") as f:
+        data = f.read(FILE_HEADER.size)
+    if len(data) < FILE_HEADER.size:
+        raise ValueError(f"不是有效的录制文件: {path}")
+    magic, version, max_hands, width, height = FILE_HEADER.unpack(data)
+    if magic != RECORDING_MAGIC:
+        raise ValueError(f"不是有效的录制文件: {path}")
+    if version != RECORDING_VERSION:
+        raise ValueError(f"不支持的录制文件版本: {version}")
+    return max_hands, (width, height)
+
+
+class LandmarkRecorder:
+    """
+    把每帧的 HandFrame 追加写入录制文件。
+    文件已存在且参数一致时在末尾继续追加。
+    """
+    def __init__(self, path, max_hands=2, image_size=(640, 480)):
+        """
+        :param path: 录制文件路径。
+        :param max_hands: 每帧最多保存几只手，多出的手会被忽略。
+        :param image_size: 原始图像的 (宽, 高)，回放时用于换算像素坐标。
+        """
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) >= FILE_HEADER.size:
+            max_hands, image_size = read_header(path)
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            self.file.write(FILE_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, max_hands, *image_size))
+        self.max_hands = max_hands
+        self.image_size = tuple(image_size)
+        self.frames = 0
+        self._record = np.zeros(1, record_dtype(max_hands))
+
+    def write(self, frame, timestamp=None):
+        """
+        追加一帧。
+        :param frame: HandFrame。
+        :param timestamp: 时间戳，默认为 time.time()。
+        """
+        record = self._record[0]
+        num_hands = min(frame.num_hands, self.max_hands)
+        record["timestamp"] = time.time() if timestamp is None else timestamp
+        record["num_hands"] = num_hands
+        record["handedness"][:num_hands] = [HANDEDNESS_CODES.get(label, 0) for label in frame.handedness[:num_hands]]
+        record["scores"][:num_hands] = frame.scores[:num_hands]
+        record["landmarks"][:num_hands] = frame.landmarks[:num_hands]
+        self.file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class LandmarkReplay:
+    """
+    用 np.memmap 映射录制文件并按帧回放。
+    同时实现了 cv2.VideoCapture (read/isOpened/get/set/release) 和 HandTracker (process/process_bgr)
+    的接口，可以直接替换摄像头和追踪器 (不需要 MediaPipe): read() 按录制时的节奏返回一张空白图像，
+    随后的 process() 返回该帧录制的关键点。
+    读取和推理在不同线程时，只由读取线程移动回放位置: 它在 read() 之后记下 position，
+    随图像一起交给推理线程，推理线程调用 process(index=...)。
+    """
+    def __init__(self, path, realtime=True, speed=1.0, loop=False):
+        """
+        :param path: 录制文件路径。
+        :param realtime: True 按录制时的时间间隔回放，False 尽可能快地回放。
+        :param speed: 实时回放的速度倍率。
+        :param loop: 播放到结尾后是否从头循环。
+        """
+        self.path = path
+        self.max_hands, self.image_size = read_header(path)
+        self.dtype = record_dtype(self.max_hands)
+        count = (os.path.getsize(path) - FILE_HEADER.size) // self.dtype.itemsize
+        if count <= 0:
+            raise ValueError(f"录制文件中没有数据: {path}")
+        self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=FILE_HEADER.size, shape=(count,))
+        self.timestamps = self.records["timestamp"]
+        self._num_hands = self.records["num_hands"]
+        self._handedness = self.records["handedness"]
+        self._scores = self.records["scores"]
+        self._landmarks = self.records["landmarks"]
+
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+        self.position = -1
+        self.results = None
+        self.identities = HandIdentityTracker()
+        self._start = None
+        w, h = self.image_size
+        self._blank = np.zeros((h, w, 3), np.uint8)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        """返回第 index 帧的 HandFrame (直接引用映射内存，不拷贝)。"""
+        num_hands = int(self._num_hands[index])
+        handedness = [HANDEDNESS_LABELS[code] for code in self._handedness[index, :num_hands].tolist()]
+        return HandFrame(self._landmarks[index, :num_hands], handedness, self._scores[index, :num_hands],
+                         self.image_size)
+
+    @property
+    def duration(self):
+        """录制时长 (秒)。"""
+        return float(self.timestamps[-1] - self.timestamps[0])
+
+    def frames(self):
+        """按回放节奏依次产生 (时间戳, HandFrame)。"""
+        while self.advance():
+            yield float(self.timestamps[self.position]), self[self.position]
+
+    def advance(self):
+        """移动到下一帧，实时模式下等待到该帧的播放时间。到结尾且不循环时返回 False。"""
+        self.position += 1
+        if self.position >= len(self.records):
+            if not self.loop:
+                self.position = len(self.records) - 1
+                return False
+            self.position = 0
+            self._start = None
+
+        if self.realtime:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = now - (self.timestamps[self.position] - self.timestamps[0]) / self.speed
+            target = self._start + (self.timestamps[self.position] - self.timestamps[0]) / self.speed
+            if target > now:
+                time.sleep(target - now)
+        return True
+
+    # --- cv2.VideoCapture 接口 ---
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if not self.advance():
+            return False, None
+        return True, self._blank.copy()
+
+    def get(self, prop):
+        w, h = self.image_size
+        if prop == 0:    # cv2.CAP_PROP_POS_MSEC: 当前帧相对第一帧的录制时间
+            return float(self.timestamps[max(self.position, 0)] - self.timestamps[0]) * 1000
+        if prop == 3:    # cv2.CAP_PROP_FRAME_WIDTH
+            return w
+        if prop == 4:    # cv2.CAP_PROP_FRAME_HEIGHT
+            return h
+        if prop == 5 and self.duration > 0:    # cv2.CAP_PROP_FPS
+            return (len(self.records) - 1) / self.duration
+        if prop == 7:    # cv2.CAP_PROP_FRAME_COUNT
+            return len(self.records)
+        return 0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+    # --- HandTracker 接口 ---
+    def process(self, img_rgb=None, index=None):
+        """
+        返回录制的 HandFrame，忽略传入的图像。
+        :param index: 帧号，None 表示当前帧 (最近一次 read() 所在位置)。
+        """
+        if index is None:
+            index = max(self.position, 0)
+        frame = self[index]
+        frame.ids = self.identities.update(frame.landmarks, frame.handedness, float(self.timestamps[index]))
+        return frame
+
+    def process_bgr(self, img_bgr=None, index=None):
+        return self.process(index=index)
+
+    def reset(self):
+        self.identities.reset()
+
+    def close(self):
+        pass
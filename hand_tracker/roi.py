@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+
+# 恒等变换: (sx, sy, ox, oy)，模型输入的归一化坐标 -> 原图归一化坐标为 x * sx + ox
+IDENTITY = (1.0, 1.0, 0.0, 0.0)
+
+
+class RegionOfInterest:
+    """
+    推理前的预处理: 按上一帧的关键点把图像裁剪到手部附近的区域，并缩小到指定的推理分辨率。
+    跟丢或到达刷新间隔时回到全图检测，以便发现新进入画面的手。
+    裁剪框带有迟滞: 手在框内留有足够边距时沿用上一帧的框，避免框每帧抖动干扰 MediaPipe 的跟踪。
+    """
+    def __init__(self, crop=True, padding=0.5, inference_width=None, refresh_interval=30):
+        """
+        :param crop: 是否裁剪到手部区域，False 时只做缩放。
+        :param padding: 裁剪框在手部包围盒每一侧外扩的比例 (相对于手的大小)。
+        :param inference_width: 送入模型的最大图像宽度 (像素)，None 表示不缩放。
+        :param refresh_interval: 连续裁剪多少帧后做一次全图检测。
+        """
+        self.crop_enabled = crop
+        self.padding = padding
+        self.inference_width = inference_width
+        self.refresh_interval = refresh_interval
+        self.box = None   # 归一化坐标 (x0, y0, x1, y1)，None 表示全图
+        self.frames_since_refresh = 0
+        self.full_frames = 0
+        self.cropped_frames = 0
+
+    def use_full_frame(self):
+        """本帧是否应该做全图检测。"""
+        return self.box is None or self.frames_since_refresh >= self.refresh_interval
+
+    def crop(self, img, full=False):
+        """
+        裁剪并缩放图像。
+        :param img: 原图 (H, W, C)。
+        :param full: True 时使用全图。
+        :return: (模型输入图像, 变换 (sx, sy, ox, oy))。输入图像可能是原图的视图。
+        """
+        h, w = img.shape[:2]
+        if full or self.box is None:
+            x0, y0, x1, y1 = 0, 0, w, h
+        else:
+            bx0, by0, bx1, by1 = self.box
+            x0, y0 = int(bx0 * w), int(by0 * h)
+            x1, y1 = max(x0 + 1, int(np.ceil(bx1 * w))), max(y0 + 1, int(np.ceil(by1 * h)))
+        sub = img[y0:y1, x0:x1]
+
+        width = x1 - x0
+        if self.inference_width and width > self.inference_width:
+            height = max(1, round((y1 - y0) * self.inference_width / width))
+            sub = cv2.resize(sub, (self.inference_width, height), interpolation=cv2.INTER_AREA)
+
+        if (x0, y0, x1, y1) == (0, 0, w, h):
+            return sub, IDENTITY
+        return sub, (width / w, (y1 - y0) / h, x0 / w, y0 / h)
+
+    def update(self, landmarks, full):
+        """
+        根据本帧 (已映射回原图的) 关键点更新裁剪框。
+        :param landmarks: (hands, 21, 3) 归一化坐标。
+        :param full: 本帧是否为全图检测。
+        """
+        if full:
+            self.full_frames += 1
+            self.frames_since_refresh = 0
+        else:
+            self.cropped_frames += 1
+            self.frames_since_refresh += 1
+
+        if not self.crop_enabled or not len(landmarks):
+            self.box = None
+            return
+
+        lo = landmarks[..., :2].min(axis=(0, 1))
+        hi = landmarks[..., :2].max(axis=(0, 1))
+        pad = float((hi - lo).max()) * self.padding
+        if self.box is not None and not full:
+            x0, y0, x1, y1 = self.box
+            margin = pad / 2
+            inside = (lo[0] - x0 >= margin and lo[1] - y0 >= margin and
+                      x1 - hi[0] >= margin and y1 - hi[1] >= margin)
+            # 手明显变小时 (例如远离摄像头) 也要收紧裁剪框
+            tight = max(x1 - x0, y1 - y0) <= 2 * (float((hi - lo).max()) + 2 * pad)
+            if inside and tight:
+                return
+        box = (max(0.0, float(lo[0]) - pad), max(0.0, float(lo[1]) - pad),
+               min(1.0, float(hi[0]) + pad), min(1.0, float(hi[1]) + pad))
+        # 手几乎完全在画面外时裁剪框会退化，回到全图
+        self.box = box if box[2] - box[0] > 0.05 and box[3] - box[1] > 0.05 else None
+
+    def reset(self):
+        self.box = None
+        self.frames_since_refresh = 0
@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+
+from .core import HandFrame
+from .pipeline import StageStats
+
+
+class InferenceScheduler:
+    """
+    跳帧推理调度器，包装 HandTracker (或 LandmarkReplay)，接口与其相同 (process / process_bgr)。
+    只在部分帧上运行 MediaPipe，其余帧用匀速模型外推关键点:
+        landmarks(t) = 上次检测结果 + 速度 * (t - 上次检测时间)
+    速度由最近两次检测结果估计。调用方 (游戏循环、UE5 数据流) 每帧都能拿到平滑的关键点，
+    推理占用的CPU却大幅减少。
+
+    两种调度方式:
+    - every=N: 每 N 帧推理一次。
+    - max_cpu=比例: 按推理的实测耗时自适应，使推理最多占用该比例的时间，
+      例如推理耗时 15ms、max_cpu=0.3 时约每 50ms 推理一次。
+    """
+    def __init__(self, tracker, every=1, max_cpu=None, max_prediction=0.1):
+        """
+        :param tracker: 被包装的追踪器。
+        :param every: 每隔多少帧推理一次 (max_cpu 为 None 时生效)。
+        :param max_cpu: 推理最多占用的时间比例 (0~1)，设置后按耗时自适应调度。
+        :param max_prediction: 最长外推时间 (秒)，超过后关键点停在外推的终点，避免漂移。
+        """
+        self.tracker = tracker
+        self.every = max(1, int(every))
+        self.max_cpu = max_cpu
+        self.max_prediction = max_prediction
+        self.stats = StageStats("inference")
+        self.predicted = False
+        self.inferences = 0
+        self.predictions = 0
+
+        self._frames = 0
+        self._last = None        # 上次检测的 HandFrame 副本
+        self._last_time = None
+        self._velocity = None    # (hands, 21, 3)，每秒的变化量
+        self._buffer = None
+
+    @property
+    def results(self):
+        return self.tracker.results
+
+    @property
+    def identities(self):
+        return self.tracker.identities
+
+    def should_infer(self, now):
+        """本帧是否需要运行推理。"""
+        if self._last is None:
+            return True
+        if self.max_cpu:
+            return now - self._last_time >= self.stats.mean_ms / 1000 / self.max_cpu
+        return self._frames % self.every == 0
+
+    def process(self, img_rgb, timestamp=None):
+        """
+        :param img_rgb: RGB图像。
+        :param timestamp: 本帧时间 (秒)，默认为 time.perf_counter()。
+        :return: HandFrame。外推帧的 landmarks 引用调度器内部的缓冲区，下一次调用会覆盖。
+        """
+        return self._process(self.tracker.process, img_rgb, timestamp)
+
+    def process_bgr(self, img_bgr, timestamp=None):
+        return self._process(self.tracker.process_bgr, img_bgr, timestamp)
+
+    def _process(self, func, img, timestamp):
+        now = time.perf_counter() if timestamp is None else timestamp
+        infer = self.should_infer(now)
+        self._frames += 1
+        if infer:
+            t0 = time.perf_counter()
+            frame = func(img)
+            self.stats.record(time.perf_counter() - t0)
+            self._update(now, frame)
+            self.predicted = False
+            self.inferences += 1
+            return frame
+
+        self.predicted = True
+        self.predictions += 1
+        return self._predict(now)
+
+    def _update(self, now, frame):
+        last = self._last
+        if (last is not None and now > self._last_time and last.num_hands == frame.num_hands and
+                last.handedness == frame.handedness and last.ids == frame.ids):
+            self._velocity = (frame.landmarks - last.landmarks) / (now - self._last_time)
+        else:
+            # 手的编号、数量或左右手变化时无法对应，先不外推
+            self._velocity = np.zeros_like(frame.landmarks)
+        self._last = frame.copy()
+        self._last_time = now
+        if self._buffer is None or self._buffer.shape != frame.landmarks.shape:
+            self._buffer = np.empty_like(frame.landmarks)
+
+    def _predict(self, now):
+        last = self._last
+        dt = min(now - self._last_time, self.max_prediction)
+        np.multiply(self._velocity, dt, out=self._buffer)
+        self._buffer += last.landmarks
+        return HandFrame(self._buffer, last.handedness, last.scores, last.image_size, last.ids)
+
+    def reset(self):
+        self._last = None
+        self._velocity = None
+        self.tracker.reset()
+
+    def close(self):
+        self.tracker.close()
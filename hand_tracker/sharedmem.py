@@ -0,0 +1,300 @@
+"""
+同一台机器上的多个进程共享追踪结果的环形缓冲区 (multiprocessing.shared_memory)。
+
+共享内存布局 (小端序):
+
+    头部 (SHM_HEADER，192 字节)
+        magic       4s    b"HTSM"
+        version     u8    SHM_VERSION
+        max_hands   u8    每帧最多保存几只手
+        capacity    u32   环形缓冲区的槽位数
+        width       u16   原始图像宽度
+        height      u16   原始图像高度
+        gestures    128s  逗号分隔的手势名，位域中 bit i 对应第 i 个名字
+        (偏移 144) write_seq  u64  最近写完的一帧的序号，从 1 开始，0 表示还没有数据
+        (偏移 152) closed     u64  写入端关闭后为 1
+
+    capacity 个槽位，每个槽位一条定长记录 (slot_dtype(max_hands))，序号为 seq 的帧写在 seq % capacity
+        seq_begin   u8    开始写入时的序号
+        timestamp   f8    time.time()
+        num_hands   u1
+        handedness  u1 * max_hands   0 = Left, 1 = Right
+        gestures    u2 * max_hands   手势位域
+        ids         i4 * max_hands   稳定编号，没有时为 -1
+        scores      f4 * max_hands
+        landmarks   f4 * max_hands * 21 * 3   归一化坐标
+        seq_end     u8    写完后的序号
+
+只有一个写入端，读取端不加锁 (seqlock): 写入端先写 seq_begin，再写数据，最后写 seq_end 和 write_seq；
+读取端在读数据前检查 seq_end、读完后检查 seq_begin，两者都等于所读的序号时数据完整。
+读取端直接引用共享内存 (np.ndarray 视图)，不序列化、不拷贝；视图在写入端绕回覆盖该槽位 (capacity 帧) 之前有效。
+"""
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .core import NUM_LANDMARKS, HandFrame
+from .gestures import GESTURE_RULES
+from .protocol import HANDEDNESS_CODES, HANDEDNESS_LABELS, check_gesture_count, pack_gestures, unpack_gestures
+
+SHM_MAGIC = b"HTSM"
+SHM_VERSION = 1
+NAMES_SIZE = 128
+SHM_HEADER = struct.Struct(f"<4sBBIHH{NAMES_SIZE}s")
+SEQ_OFFSET = 144
+SLOTS_OFFSET = 192
+
+
+def slot_dtype(max_hands):
+    """每个槽位的结构化类型。"""
+    return np.dtype([
+        ("seq_begin", "<u8"),
+        ("timestamp", "<f8"),
+        ("num_hands", "u1"),
+        ("handedness", "u1", (max_hands,)),
+        ("gestures", "<u2", (max_hands,)),
+        ("ids", "<i4", (max_hands,)),
+        ("scores", "<f4", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, 3)),
+        ("seq_end", "<u8"),
+    ], align=True)
+
+
+# 本进程中 SharedLandmarkWriter 创建的共享内存名称 (fork 出的子进程继承这份集合)
+_WRITER_NAMES = set()
+
+
+def _attach(name):
+    """打开已有的共享内存，读取端退出时不删除它。"""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    # Python 3.13 之前没有 track 参数: 打开时会向 resource_tracker 登记，读取进程退出时会删除共享内存，
+    # 所以打开后注销。写入端在本进程 (或父进程) 中时不注销: resource_tracker 按名称只记一次，
+    # 注销会连写入端的登记一起去掉
+    shm = shared_memory.SharedMemory(name)
+    if name not in _WRITER_NAMES:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedLandmarkWriter:
+    """
+    把每帧的追踪结果写入共享内存环形缓冲区，供同一台机器上任意多个 SharedLandmarkReader 读取。
+    同名的共享内存已存在 (例如上次异常退出残留) 时会被替换。
+    """
+    def __init__(self, name="hand_tracker", max_hands=2, capacity=64, image_size=(640, 480), gesture_names=None):
+        """
+        :param name: 共享内存名称，读取端用同一个名称打开。
+        :param max_hands: 每帧最多保存几只手，多出的手会被忽略。
+        :param capacity: 环形缓冲区的槽位数，读取端落后超过该帧数时丢帧。
+        :param image_size: 原始图像的 (宽, 高)。
+        :param gesture_names: 手势名列表 (位域顺序)，默认使用 GESTURE_RULES 的顺序。
+                              最多 MAX_GESTURES 个，逗号分隔后不超过 128 字节 (头部的 gestures 字段)。
+        """
+        self.name = name
+        self.max_hands = max_hands
+        self.capacity = capacity
+        self.image_size = tuple(image_size)
+        self.gesture_names = list(GESTURE_RULES) if gesture_names is None else list(gesture_names)
+        check_gesture_count(len(self.gesture_names))
+        names = ",".join(self.gesture_names).encode()
+        if len(names) > NAMES_SIZE:
+            # struct 会静默截断，读取端会得到错误的手势数
+            raise ValueError(f"手势名共 {len(names)} 字节，超出共享内存头部的 {NAMES_SIZE} 字节")
+        self.dtype = slot_dtype(max_hands)
+        size = SLOTS_OFFSET + capacity * self.dtype.itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # 残留的共享内存: 打开时的登记由 unlink() 注销
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        _WRITER_NAMES.add(name)
+
+        self.shm.buf[:SHM_HEADER.size] = SHM_HEADER.pack(
+            SHM_MAGIC, SHM_VERSION, max_hands, capacity, *self.image_size, names)
+        self._seq = np.ndarray(2, "<u8", self.shm.buf, SEQ_OFFSET)
+        self._seq[:] = 0
+        self.slots = np.ndarray(capacity, self.dtype, self.shm.buf, SLOTS_OFFSET)
+        self._fields = {name: self.slots[name] for name in self.dtype.names}
+        self.seq = 0
+
+    def write(self, frame, gestures=None, timestamp=None):
+        """
+        写入一帧。
+        :param frame: HandFrame。
+        :param gestures: (hands, len(gesture_names)) 手势布尔数组，None 表示不写手势。
+        :param timestamp: 时间戳，默认为 time.time()。
+        :return: 该帧的序号。
+        """
+        seq = self.seq + 1
+        i = seq % self.capacity
+        n = min(frame.num_hands, self.max_hands)
+        fields = self._fields
+        fields["seq_begin"][i] = seq
+        fields["timestamp"][i] = time.time() if timestamp is None else timestamp
+        fields["num_hands"][i] = n
+        fields["handedness"][i, :n] = [HANDEDNESS_CODES.get(label, 0) for label in frame.handedness[:n]]
+        fields["gestures"][i, :n] = pack_gestures(gestures[:n]) if gestures is not None else 0
+        fields["ids"][i, :n] = frame.ids[:n] if frame.ids is not None else -1
+        fields["scores"][i, :n] = frame.scores[:n]
+        fields["landmarks"][i, :n] = frame.landmarks[:n]
+        fields["seq_end"][i] = seq
+        self._seq[0] = seq
+        self.seq = seq
+        return seq
+
+    def close(self):
+        """标记为已关闭并删除共享内存 (已打开的读取端在关闭前仍可读取已映射的数据)。"""
+        if self.slots is None:
+            return
+        self._seq[1] = 1
+        self._seq = self.slots = self._fields = None
+        self.shm.close()
+        self.shm.unlink()
+        _WRITER_NAMES.discard(self.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class SharedLandmarkReader:
+    """
+    读取 SharedLandmarkWriter 写入的环形缓冲区，不加锁、不拷贝。
+    每个读取进程各自维护读取位置，互不影响，也不影响写入端。
+    """
+    def __init__(self, name="hand_tracker"):
+        """
+        :param name: 共享内存名称。
+        """
+        self.shm = _attach(name)
+        magic, version, max_hands, capacity, width, height, names = SHM_HEADER.unpack(
+            bytes(self.shm.buf[:SHM_HEADER.size]))
+        if magic != SHM_MAGIC:
+            self.shm.close()
+            raise ValueError(f"不是手部追踪的共享内存: {name}")
+        if version != SHM_VERSION:
+            self.shm.close()
+            raise ValueError(f"不支持的共享内存版本: {version}")
+        self.name = name
+        self.max_hands = max_hands
+        self.capacity = capacity
+        self.image_size = (width, height)
+        names = names.rstrip(b"\0").decode()
+        self.gesture_names = names.split(",") if names else []
+        self._seq = np.ndarray(2, "<u8", self.shm.buf, SEQ_OFFSET)
+        self.slots = np.ndarray(capacity, slot_dtype(max_hands), self.shm.buf, SLOTS_OFFSET)
+        self._fields = {name: self.slots[name] for name in self.slots.dtype.names}
+        self.position = int(self._seq[0])   # 上一次 read_next() 读到的序号
+        self.dropped = 0
+
+    @property
+    def latest_seq(self):
+        """最近写完的一帧的序号，0 表示还没有数据。"""
+        return int(self._seq[0])
+
+    @property
+    def closed(self):
+        """写入端是否已经关闭。"""
+        return bool(self._seq[1])
+
+    def valid(self, seq):
+        """序号为 seq 的帧是否仍完整地保存在缓冲区中 (用于确认 copy=False 返回的视图没有被覆盖)。"""
+        i = seq % self.capacity
+        return seq > 0 and self._fields["seq_end"][i] == seq and self._fields["seq_begin"][i] == seq
+
+    def read(self, seq, copy=True):
+        """
+        读取序号为 seq 的帧。
+        :param copy: False 时返回的数组是共享内存的视图，用完后可以用 valid(seq) 确认期间没有被覆盖。
+        :return: (timestamp, HandFrame, gestures (hands, G) 布尔数组)；该帧还没写完或已被覆盖时返回 None。
+        """
+        i = seq % self.capacity
+        fields = self._fields
+        if seq <= 0 or fields["seq_end"][i] != seq:
+            return None
+        n = int(fields["num_hands"][i])
+        timestamp = float(fields["timestamp"][i])
+        landmarks = fields["landmarks"][i, :n]
+        scores = fields["scores"][i, :n]
+        if copy:
+            landmarks, scores = landmarks.copy(), scores.copy()
+        handedness = [HANDEDNESS_LABELS[code] for code in fields["handedness"][i, :n].tolist()]
+        ids = fields["ids"][i, :n].tolist()
+        gestures = unpack_gestures(fields["gestures"][i, :n], len(self.gesture_names))
+        if fields["seq_begin"][i] != seq:
+            return None
+        frame = HandFrame(landmarks, handedness, scores, self.image_size, ids if n and ids[0] >= 0 else None)
+        return timestamp, frame, gestures
+
+    def read_latest(self, copy=True):
+        """读取最新的一帧，没有数据时返回 None。"""
+        for _ in range(3):
+            seq = self.latest_seq
+            if seq == 0:
+                return None
+            item = self.read(seq, copy)
+            if item is not None:
+                self.position = seq
+                return item
+        return None
+
+    def read_next(self, timeout=None, poll_interval=0.001, copy=True):
+        """
+        按顺序读取下一帧。落后超过 capacity 帧时跳到缓冲区中最旧的一帧，跳过的帧计入 dropped。
+        :param timeout: 没有新数据时最长等待秒数，None 表示一直等待 (写入端关闭后立即返回)。
+        :param poll_interval: 等待时检查新数据的间隔 (秒)。
+        :return: 同 read()，超时或写入端已关闭时返回 None。
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            latest = self.latest_seq
+            if latest > self.position:
+                if latest - self.position > self.capacity - 1:
+                    # 最旧的槽位可能正在被覆盖，从它的下一帧开始读
+                    skipped = latest - self.capacity + 1 - self.position
+                    self.dropped += skipped
+                    self.position += skipped
+                self.position += 1
+                item = self.read(self.position, copy)
+                if item is not None:
+                    return item
+                self.dropped += 1
+                continue
+            if self.closed or (deadline is not None and time.perf_counter() >= deadline):
+                return None
+            time.sleep(poll_interval)
+
+    def frames(self, copy=True):
+        """依次产生每一帧的 (timestamp, HandFrame, gestures)，直到写入端关闭。"""
+        while True:
+            item = self.read_next(copy=copy)
+            if item is None:
+                return
+            yield item
+
+    def close(self):
+        self._seq = self.slots = self._fields = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # 调用方仍持有 copy=False 返回的视图，映射在这些视图释放后由垃圾回收关闭
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+
+import cv2
+
+# 上一次可用的摄像头配置 (索引、后端、分辨率、帧率)，下次启动时优先尝试
+CAMERA_CACHE = os.path.join(os.path.expanduser("~"), ".hand_tracker_camera.json")
+
+
+def load_camera_config(path=CAMERA_CACHE):
+    """读取缓存的摄像头配置，文件不存在或损坏时返回 None。"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_camera_config(config, path=CAMERA_CACHE):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+    except OSError as e:
+        print(f"无法保存摄像头配置: {e}")
+
+
+def _backend_id(name):
+    """按名称查找 OpenCV 的视频后端编号，找不到时返回 cv2.CAP_ANY。"""
+    for backend in cv2.videoio_registry.getBackends():
+        if cv2.videoio_registry.getBackendName(backend) == name:
+            return backend
+    return cv2.CAP_ANY
+
+
+def _try_open(index, backend=cv2.CAP_ANY, width=None, height=None, fps=None):
+    """打开并配置一个摄像头，grab() 成功才算可用 (不解码图像)，否则返回 None。"""
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    # 分辨率和帧率在第一次取帧之前设置，避免驱动按默认格式启动后再重新协商
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if not cap.grab():
+        cap.release()
+        return None
+    return cap
+
+
+def open_camera(max_index=5, width=None, height=None, fps=None, cache=CAMERA_CACHE):
+    """
+    打开摄像头: 先按缓存的配置打开上一次可用的设备，失败时再依次尝试各个索引，成功后更新缓存。
+    :param max_index: 探测的索引范围 [0, max_index)。
+    :param width: 请求的宽度，None 时使用缓存的值。
+    :param height: 请求的高度，None 时使用缓存的值。
+    :param fps: 请求的帧率，None 时使用缓存的值。
+    :param cache: 配置缓存文件路径，None 表示不使用缓存。
+    :return: cv2.VideoCapture 对象，找不到时返回 None。
+    """
+    config = load_camera_config(cache) if cache else None
+    tried = set()
+    cap = None
+    if config is not None:
+        index = config.get("index", 0)
+        tried.add(index)
+        cap = _try_open(index, _backend_id(config.get("backend")), width or config.get("width"),
+                        height or config.get("height"), fps or config.get("fps"))
+    if cap is None:
+        for index in range(max_index):
+            if index in tried:
+                continue
+            cap = _try_open(index, width=width, height=height, fps=fps)
+            if cap is not None:
+                print(f"找到可用摄像头，索引: {index}")
+                break
+    if cap is None:
+        return None
+    if cache:
+        save_camera_config({
+            "index": index,
+            "backend": cap.getBackendName(),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+        }, cache)
+    return cap
+
+
+def fast_start(tracker_factory, camera=True, width=None, height=None, fps=None, max_index=5,
+               cache=CAMERA_CACHE, warmup=True):
+    """
+    并行启动: 一个线程打开摄像头，同时在当前线程中创建追踪器 (构建 MediaPipe 图) 并做一次预热推理，
+    使第一帧真实画面不会出现初始化造成的延迟尖峰。启动耗时会打印出来。
+    :param tracker_factory: 无参数的函数，返回带 warm_up(image_size) 方法的追踪器。
+    :param camera: 是否打开摄像头 (回放等场景为 False)。
+    :param width: 请求的宽度。
+    :param height: 请求的高度。
+    :param fps: 请求的帧率。
+    :param max_index: 缓存失效时探测的索引范围。
+    :param cache: 摄像头配置缓存文件路径，None 表示不使用缓存。
+    :param warmup: 是否做预热推理。
+    :return: (摄像头或 None, 追踪器, 各阶段耗时 (秒) 的字典)。
+    """
+    start = time.perf_counter()
+    timings = {}
+    opened = {}
+
+    def open_worker():
+        t0 = time.perf_counter()
+        opened["cap"] = open_camera(max_index, width, height, fps, cache)
+        timings["camera"] = time.perf_counter() - t0
+
+    thread = None
+    if camera:
+        thread = threading.Thread(target=open_worker, name="camera-open", daemon=True)
+        thread.start()
+
+    t0 = time.perf_counter()
+    tracker = tracker_factory()
+    timings["model"] = time.perf_counter() - t0
+    if warmup:
+        t0 = time.perf_counter()
+        # 缓存中有分辨率时按实际画面大小预热，否则按请求的大小
+        config = load_camera_config(cache) if cache else None
+        size = (width or (config or {}).get("width") or 640, height or (config or {}).get("height") or 480)
+        tracker.warm_up(size)
+        timings["warmup"] = time.perf_counter() - t0
+
+    if thread is not None:
+        thread.join()
+    timings["total"] = time.perf_counter() - start
+    parts = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items() if name != "total")
+    print(f"启动耗时: {timings['total'] * 1000:.0f}ms ({parts}，摄像头与模型并行)")
+    return opened.get("cap"), tracker, timings
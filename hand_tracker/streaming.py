@@ -0,0 +1,571 @@
+import asyncio
+import base64
+import hashlib
+import json
+import select
+import socket
+import struct
+import threading
+import time
+import urllib.parse
+
+PAYLOADS = ("full", "gestures", "commands", "events", "binary")
+
+# "gestures" 数据去掉的大数组字段 (每只手 21×3)
+HEAVY_FIELDS = ("landmarks", "velocity", "acceleration")
+
+# 手势 -> 命令，按优先级排列，都不成立时为 "idle"
+GESTURE_COMMANDS = (
+    ("fist", "stop"),
+    ("open_hand", "jump"),
+    ("thumb_up", "move_forward"),
+    ("pointing", "turn"),
+    ("peace", "special"),
+)
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"   # RFC 6455
+WS_MAX_MESSAGE = 65536   # 客户端发来的控制消息的最大长度
+
+
+def gesture_command(data):
+    """一帧数据对应的命令: 已带有 "command" 字段时直接使用，否则按 GESTURE_COMMANDS 从各手的手势得出。"""
+    if "command" in data:
+        return data["command"]
+    hands = data.get("hands")
+    if hands is None:
+        hands = [hand for camera in data.get("cameras", ()) for hand in camera["hands"]]
+    for gesture, command in GESTURE_COMMANDS:
+        if any(hand.get(gesture) for hand in hands):
+            return command
+    return "idle"
+
+
+def project(data, payload):
+    """
+    按订阅的数据类型裁剪一帧数据。
+    :param data: 发布的完整数据 (hand_tracking_ue5 的 JSON 数据包)。
+    :param payload: "full" / "gestures" / "commands" / "events"。
+    :return: dict。
+    """
+    if payload == "full":
+        return data
+    if payload == "commands":
+        return {"command": gesture_command(data), "timestamp": data.get("timestamp")}
+    if payload == "events":
+        return {"timestamp": data.get("timestamp"), "events": data.get("events", [])}
+
+    def strip(hands):
+        return [{key: value for key, value in hand.items() if key not in HEAVY_FIELDS} for hand in hands]
+
+    out = {key: value for key, value in data.items() if key not in ("hands", "cameras", "hands_3d")}
+    if "hands" in data:
+        out["hands"] = strip(data["hands"])
+    if "cameras" in data:
+        out["cameras"] = [dict(camera, hands=strip(camera["hands"])) for camera in data["cameras"]]
+    return out
+
+
+def ws_frame(payload, opcode=0x1):
+    """编码一个服务端发出的 (不加掩码的) WebSocket 帧。opcode 0x1 为文本，0x2 为二进制。"""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+def ws_accept_key(key):
+    """握手响应中的 Sec-WebSocket-Accept: base64(SHA-1(客户端的 Sec-WebSocket-Key + WS_GUID))。"""
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+
+
+def _parse_headers(lines):
+    """HTTP 头部行 -> {小写的名称: 值}。"""
+    headers = {}
+    for line in lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def _unmask(data, mask):
+    return bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+def _parse_options(message, subscriber):
+    """
+    按订阅消息 {"subscribe": 数据类型, "rate": 每秒最多几条, "on_change": true} 更新订阅者，格式错误时抛出 ValueError。
+    """
+    payload = message.get("subscribe", subscriber.payload)
+    if payload not in PAYLOADS:
+        raise ValueError(f"未知的数据类型: {payload}")
+    if payload != subscriber.payload:
+        subscriber.payload = payload
+        subscriber.last_time = None
+    if "rate" in message:
+        subscriber.rate = float(message["rate"]) or None
+    if "on_change" in message:
+        subscriber.on_change = bool(message["on_change"])
+
+
+class Subscriber:
+    """一个订阅者: 数据类型、最高发送频率和发送统计。"""
+    def __init__(self, kind, address, payload="full", rate=None, channel=0, expires=None, on_change=False):
+        """
+        :param kind: "udp" 或 "websocket"。
+        :param address: 对端地址 (host, port)。
+        :param payload: 数据类型，见 PAYLOADS。"binary" 只接收发布时给出的二进制数据包。
+        :param rate: 每秒最多发送几条，None 表示每帧都发送。
+        :param channel: "binary" 数据的通道号 (多摄像头时为摄像头编号)。
+        :param expires: 订阅过期的时刻 (time.perf_counter())，None 表示不过期。
+        :param on_change: "commands" 订阅者只在命令变化时发送 (另加心跳)，False 时每帧发送。
+        """
+        if payload not in PAYLOADS:
+            raise ValueError(f"未知的数据类型: {payload}")
+        self.kind = kind
+        self.address = address
+        self.payload = payload
+        self.rate = rate
+        self.channel = channel
+        self.expires = expires
+        self.on_change = on_change
+        self.next_time = 0.0
+        self.sent = 0
+        self.dropped = 0   # 客户端处理不过来时被跳过的帧 (不含按频率限制跳过的帧)
+        self.last_command = None
+        self.last_time = None
+        self.pending = None
+        self.ready = None
+
+    def command_changed(self, command, now, heartbeat):
+        """on_change 的 "commands" 订阅者只在命令变化时发送，命令不变时每 heartbeat 秒重发一次 (None 表示不重发)。"""
+        if command != self.last_command or self.last_time is None:
+            return True
+        return heartbeat is not None and now - self.last_time >= heartbeat
+
+    def due(self, now):
+        """按频率限制判断本帧是否发送。落后太多时不补发，从当前时刻重新计时。"""
+        if not self.rate:
+            return True
+        if now < self.next_time:
+            return False
+        self.next_time += 1 / self.rate
+        if self.next_time <= now:
+            self.next_time = now + 1 / self.rate
+        return True
+
+    def __repr__(self):
+        rate = f"{self.rate:g}/s" if self.rate else "每帧"
+        return (f"{self.kind} {self.address[0]}:{self.address[1]} [{self.payload} @{rate}]: "
+                f"发送 {self.sent}, 丢弃 {self.dropped}")
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, address):
+        self.server._udp_control(data, address)
+
+    def error_received(self, exc):
+        # 对端端口未监听时 (ICMP 端口不可达) 只统计，不影响其他订阅者
+        self.server.errors += 1
+
+
+class StreamServer:
+    """
+    基于 asyncio 的数据流服务，在后台线程中运行事件循环，把追踪结果发布给任意多个订阅者。
+
+    - UDP: 固定目标 (add_udp_target，例如 UE5)；客户端也可以向 udp_port 发送 JSON 订阅消息
+      {"subscribe": "gestures", "rate": 30}，之后数据发往消息的来源地址。订阅需要在 subscriber_timeout
+      秒内重发一次续期，{"unsubscribe": true} 取消订阅。
+    - WebSocket: 连接 ws://host:ws_port/?payload=gestures&rate=30，连接后发送同样格式的文本消息可以修改订阅。
+
+    每个订阅者自选数据类型和最高频率: "full" / "gestures" / "commands" 每帧发送，"commands" 订阅时加上
+    "on_change": true (WebSocket 为 ?on_change=1) 则只在命令变化时发送 (另加心跳)；
+    "events" 只在数据带有事件 (手的进入/离开、GestureEventTracker 的手势事件) 时发送；"binary" 为二进制数据包。
+    publish() 只把数据交给事件循环，不等待发送；每类数据每帧只序列化一次。事件循环来不及处理时只保留最新一帧，
+    WebSocket 客户端读得慢时其未发出的旧帧被新帧替换，都不会阻塞追踪循环或其他订阅者。
+    """
+    def __init__(self, host="127.0.0.1", udp_port=None, ws_port=None, subscriber_timeout=5.0,
+                 max_udp_buffer=256 * 1024, heartbeat=1.0):
+        """
+        :param host: 接收订阅的监听地址，默认只允许本机连接。
+        :param udp_port: 接收 UDP 订阅消息的端口，None 表示只发送给固定目标。
+        :param ws_port: WebSocket 端口，None 表示不启用。
+        :param subscriber_timeout: UDP 订阅者多久没有续期后被移除 (秒)。
+        :param max_udp_buffer: UDP 发送缓冲超过该字节数时跳过本帧。
+        :param heartbeat: 命令不变时 on_change 的 "commands" 订阅者的重发间隔 (秒)，None 表示不重发。
+        """
+        self.host = host
+        self.udp_port = udp_port
+        self.ws_port = ws_port
+        self.subscriber_timeout = subscriber_timeout
+        self.max_udp_buffer = max_udp_buffer
+        self.heartbeat = heartbeat
+        self.targets = []        # 固定的 UDP 目标
+        self.subscribers = {}    # UDP 订阅者，按地址
+        self.clients = set()     # WebSocket 订阅者
+        self.published = 0
+        self.dropped = 0         # 事件循环来不及发送、被更新的帧替换的帧
+        self.errors = 0
+        self._pending = {}       # 每个通道等待发送的最新一帧
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._transport = None
+        self._ws_server = None
+        self._tasks = set()      # WebSocket 连接的处理任务
+        self._writers = set()
+
+    def add_udp_target(self, address, payload="full", rate=None, channel=0, on_change=False):
+        """添加固定的 UDP 目标 (不需要订阅消息，不会过期)。可以在 start() 之前或之后调用。"""
+        subscriber = Subscriber("udp", tuple(address), payload, rate, channel, on_change=on_change)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.targets.append, subscriber)
+        else:
+            self.targets.append(subscriber)
+        return subscriber
+
+    @property
+    def stats(self):
+        return list(self.targets) + list(self.subscribers.values()) + list(self.clients)
+
+    def start(self):
+        """在后台线程中启动事件循环，端口被占用等错误在这里抛出。"""
+        ready = threading.Event()
+        error = []
+        loop = self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self._open())
+            except Exception as e:
+                error.append(e)
+                loop.close()
+                ready.set()
+                return
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self._close())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="stream-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if error:
+            self._loop = self._thread = None
+            raise error[0]
+        return self
+
+    async def _open(self):
+        local = (self.host, self.udp_port) if self.udp_port is not None else None
+        self._transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(self), local_addr=local, family=socket.AF_INET)
+        # 端口为 0 时由系统分配，记录实际端口
+        if self.udp_port is not None:
+            self.udp_port = self._transport.get_extra_info("sockname")[1]
+        if self.ws_port is not None:
+            self._ws_server = await asyncio.start_server(self._ws_client, self.host, self.ws_port)
+            self.ws_port = self._ws_server.sockets[0].getsockname()[1]
+
+    async def _close(self):
+        if self._ws_server is not None:
+            self._ws_server.close()
+            await self._ws_server.wait_closed()
+        # 直接断开连接 (不等待读得慢的客户端收完缓冲区)，各连接的处理任务读到 EOF 后自行结束
+        for writer in list(self._writers):
+            writer.transport.abort()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._transport.close()
+
+    def stop(self):
+        """停止事件循环，关闭所有连接。"""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = self._thread = None
+
+    def publish(self, data, packet=None, channel=0):
+        """
+        发布一帧 (线程安全，立即返回)。发布后不要再修改 data。
+        :param data: JSON 数据 (dict)，None 表示本帧只有二进制数据包。
+        :param packet: 已编码的二进制数据包 (bytes)，发给 "binary" 订阅者。
+        :param channel: packet 的通道号，只发给相同通道的 "binary" 订阅者。
+        """
+        if self._loop is None:
+            return
+        self.published += 1
+        with self._lock:
+            scheduled = bool(self._pending)
+            if channel in self._pending:
+                self.dropped += 1
+            self._pending[channel] = (data, packet)
+        if not scheduled:
+            self._loop.call_soon_threadsafe(self._dispatch)
+
+    def _dispatch(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        now = time.perf_counter()
+        expired = [address for address, s in self.subscribers.items() if s.expires < now]
+        for address in expired:
+            del self.subscribers[address]
+        for channel, (data, packet) in pending.items():
+            self._send(data, packet, channel, now)
+
+    def _send(self, data, packet, channel, now):
+        encoded = {}
+        command = gesture_command(data) if data is not None else None
+
+        def message(subscriber):
+            """本帧发给该订阅者的数据，不需要发送时返回 None。"""
+            if subscriber.payload == "binary":
+                return packet if packet is not None and subscriber.channel == channel and subscriber.due(now) else None
+            if data is None:
+                return None
+            if subscriber.payload == "events" and not data.get("events"):
+                return None
+            if (subscriber.payload == "commands" and subscriber.on_change
+                    and not subscriber.command_changed(command, now, self.heartbeat)):
+                return None
+            if not subscriber.due(now):
+                return None
+            if subscriber.payload not in encoded:
+                encoded[subscriber.payload] = json.dumps(project(data, subscriber.payload)).encode()
+            if subscriber.payload == "commands":
+                subscriber.last_command, subscriber.last_time = command, now
+            return encoded[subscriber.payload]
+
+        udp_full = self._transport.get_write_buffer_size() > self.max_udp_buffer
+        for subscriber in self.targets + list(self.subscribers.values()):
+            out = message(subscriber)
+            if out is None:
+                continue
+            if udp_full:
+                subscriber.dropped += 1
+                continue
+            self._transport.sendto(out, subscriber.address)
+            subscriber.sent += 1
+
+        for subscriber in self.clients:
+            out = message(subscriber)
+            if out is None:
+                continue
+            if subscriber.pending is not None:
+                subscriber.dropped += 1
+            subscriber.pending = ws_frame(out, 0x2 if subscriber.payload == "binary" else 0x1)
+            subscriber.ready.set()
+
+    def _udp_control(self, data, address):
+        """处理 UDP 订阅消息，回复 {"subscribed": 数据类型, "timeout": 秒} 或 {"error": ...}。"""
+        if self.udp_port is None:
+            return
+        try:
+            message = json.loads(data.decode())
+            if message.get("unsubscribe"):
+                self.subscribers.pop(address, None)
+                return
+            subscriber = self.subscribers.get(address) or Subscriber("udp", address)
+            _parse_options(message, subscriber)
+        except (ValueError, AttributeError, TypeError) as e:
+            self._transport.sendto(json.dumps({"error": str(e)}).encode(), address)
+            return
+        subscriber.expires = time.perf_counter() + self.subscriber_timeout
+        if address not in self.subscribers:
+            self.subscribers[address] = subscriber
+            self._transport.sendto(json.dumps({"subscribed": subscriber.payload,
+                                               "timeout": self.subscriber_timeout}).encode(), address)
+
+    async def _ws_client(self, reader, writer):
+        """一个 WebSocket 连接: 握手后由读取和发送两个任务分别处理订阅消息和数据。"""
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        self._writers.add(writer)
+        subscriber = None
+        try:
+            request = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            path = request[0].split(" ")[1]
+            headers = _parse_headers(request[1:])
+            key = headers.get("sec-websocket-key")
+            query = {name: values[-1] for name, values in urllib.parse.parse_qs(urllib.parse.urlsplit(path).query).items()}
+            subscriber = Subscriber("websocket", writer.get_extra_info("peername")[:2])
+            if key is None:
+                raise ValueError("不是 WebSocket 请求")
+            _parse_options({"subscribe": query.get("payload", "full"), "rate": query.get("rate", 0),
+                            "on_change": query.get("on_change", "0") not in ("0", "false")}, subscriber)
+        except (ValueError, IndexError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            writer.close()
+            self._writers.discard(writer)
+            self._tasks.discard(task)
+            return
+
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {ws_accept_key(key)}\r\n\r\n").encode())
+        subscriber.ready = asyncio.Event()
+        self.clients.add(subscriber)
+        sender = asyncio.ensure_future(self._ws_send(subscriber, writer))
+        try:
+            await self._ws_receive(subscriber, reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(subscriber)
+            sender.cancel()
+            writer.close()
+            self._writers.discard(writer)
+            self._tasks.discard(task)
+
+    async def _ws_send(self, subscriber, writer):
+        """把订阅者最新的一帧写出，等待客户端读走 (drain) 期间到达的帧会替换未发出的旧帧。"""
+        try:
+            while True:
+                await subscriber.ready.wait()
+                subscriber.ready.clear()
+                frame, subscriber.pending = subscriber.pending, None
+                writer.write(frame)
+                await writer.drain()
+                subscriber.sent += 1
+        except ConnectionError:
+            pass
+
+    async def _ws_receive(self, subscriber, reader, writer):
+        """读取客户端发来的帧: 文本为订阅消息，ping 回复 pong，close 结束连接。"""
+        while True:
+            b0, b1 = await reader.readexactly(2)
+            opcode, n = b0 & 0x0F, b1 & 0x7F
+            if n == 126:
+                n, = struct.unpack("!H", await reader.readexactly(2))
+            elif n == 127:
+                n, = struct.unpack("!Q", await reader.readexactly(8))
+            if n > WS_MAX_MESSAGE:
+                return
+            mask = await reader.readexactly(4) if b1 & 0x80 else None
+            data = await reader.readexactly(n)
+            if mask is not None:
+                data = _unmask(data, mask)
+            if opcode == 0x8:
+                writer.write(ws_frame(data[:2], 0x8))
+                return
+            if opcode == 0x9:
+                writer.write(ws_frame(data, 0xA))
+            elif opcode == 0x1:
+                try:
+                    _parse_options(json.loads(data.decode()), subscriber)
+                except (ValueError, AttributeError, TypeError) as e:
+                    writer.write(ws_frame(json.dumps({"error": str(e)}).encode()))
+
+
+class WebSocketClient:
+    """最小的同步 WebSocket 客户端，用于本机测试和基准测试 (只支持 ws://)。"""
+    def __init__(self, url, timeout=5.0):
+        """
+        :param url: 例如 ws://127.0.0.1:8765/?payload=gestures&rate=30。
+        :param timeout: 连接和握手的超时 (秒)。
+        """
+        parts = urllib.parse.urlsplit(url)
+        self.sock = socket.create_connection((parts.hostname, parts.port or 80), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # 自己缓冲收到的字节，只取出完整的帧: 等待超时不会丢掉或截断半个帧
+        self._buffer = bytearray()
+        key = base64.b64encode(struct.pack("!QQ", time.time_ns(), id(self))).decode()
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        self.sock.sendall((f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n"
+                           f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n")
+                          .encode())
+        deadline = time.perf_counter() + timeout
+        while b"\r\n\r\n" not in self._buffer:
+            if not self._fill(deadline):
+                self.close()
+                raise ConnectionError("WebSocket 握手超时")
+        end = self._buffer.index(b"\r\n\r\n") + 4
+        response = bytes(self._buffer[:end]).decode("latin-1").split("\r\n")
+        del self._buffer[:end]
+        status = response[0]
+        headers = _parse_headers(response[1:])
+        if status.split(" ")[1:2] != ["101"]:
+            self.close()
+            raise ConnectionError(f"WebSocket 握手失败: {status.strip()}")
+        if headers.get("sec-websocket-accept") != ws_accept_key(key):
+            self.close()
+            raise ConnectionError("WebSocket 握手失败: Sec-WebSocket-Accept 不匹配")
+
+    def _fill(self, deadline):
+        """等待套接字可读后把收到的数据追加到缓冲区，到 deadline (None 表示一直等待) 仍没有数据时返回 False。"""
+        remaining = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+        readable, _, _ = select.select([self.sock], [], [], remaining)
+        if not readable:
+            return False
+        data = self.sock.recv(65536)
+        if not data:
+            raise ConnectionError("连接已关闭")
+        self._buffer += data
+        return True
+
+    def _next_frame(self):
+        """从缓冲区取出一个完整的帧 (opcode, data)，还不完整时返回 None。"""
+        buffer = self._buffer
+        if len(buffer) < 2:
+            return None
+        opcode, n, offset = buffer[0] & 0x0F, buffer[1] & 0x7F, 2
+        if n == 126:
+            if len(buffer) < 4:
+                return None
+            n, = struct.unpack_from("!H", buffer, 2)
+            offset = 4
+        elif n == 127:
+            if len(buffer) < 10:
+                return None
+            n, = struct.unpack_from("!Q", buffer, 2)
+            offset = 10
+        if len(buffer) < offset + n:
+            return None
+        data = bytes(buffer[offset:offset + n])
+        del buffer[:offset + n]
+        return opcode, data
+
+    def recv(self, timeout=None):
+        """
+        接收一条消息。
+        :param timeout: 最长等待秒数，None 表示一直等待。
+        :return: 文本消息为 str，二进制消息为 bytes，超时返回 None。
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                if not self._fill(deadline):
+                    return None
+                continue
+            opcode, data = frame
+            if opcode == 0x1:
+                return data.decode()
+            if opcode == 0x2:
+                return data
+            if opcode == 0x8:
+                raise ConnectionError("服务端关闭了连接")
+
+    def send(self, text):
+        """发送一条文本消息 (客户端发出的帧必须加掩码)。"""
+        data = text.encode()
+        mask = struct.pack("!I", time.perf_counter_ns() & 0xFFFFFFFF)
+        n = len(data)
+        if n < 126:
+            header = struct.pack("!BB", 0x81, 0x80 | n)
+        elif n < 65536:
+            header = struct.pack("!BBH", 0x81, 0x80 | 126, n)
+        else:
+            header = struct.pack("!BBQ", 0x81, 0x80 | 127, n)
+        self.sock.sendall(header + mask + _unmask(data, mask))
+
+    def close(self):
+        self.sock.close()
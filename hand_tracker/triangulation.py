@@ -0,0 +1,180 @@
+import json
+
+import cv2
+import numpy as np
+
+# 手腕 (0) 到中指掌指关节 (9) 的长度，成年人约 8~10cm，用于单摄像头的距离估算
+HAND_LENGTH_CM = 9.0
+
+
+def triangulate_dlt(points, projections, valid=None):
+    """
+    向量化的 DLT 三角测量: 一次求解所有关键点。
+    每个视图、每个点提供两个线性方程 x * P[2] - P[0] = 0 和 y * P[2] - P[1] = 0，
+    对每个点的 (2V, 4) 方程组做 SVD，取最小奇异值对应的向量作为齐次坐标。
+    :param points: (V, N, 2) 去畸变后的像素坐标。
+    :param projections: (V, 3, 4) 投影矩阵。
+    :param valid: (V, N) 布尔数组，False 的观测不参与求解，None 表示全部有效。
+    :return: (N, 3) 三维坐标，单位与标定时的平移量相同。
+    """
+    points = np.asarray(points, np.float64)
+    projections = np.asarray(projections, np.float64)
+    rows = np.stack([
+        points[..., 0, None] * projections[:, None, 2] - projections[:, None, 0],
+        points[..., 1, None] * projections[:, None, 2] - projections[:, None, 1],
+    ], axis=1)                                                   # (V, 2, N, 4)
+    # 每行归一化，避免不同视图的像素尺度影响最小二乘的权重
+    rows /= np.linalg.norm(rows, axis=-1, keepdims=True) + 1e-12
+    if valid is not None:
+        rows *= np.asarray(valid)[:, None, :, None]
+    a = rows.transpose(2, 0, 1, 3).reshape(points.shape[1], -1, 4)  # (N, 2V, 4)
+    _, _, vh = np.linalg.svd(a)
+    x = vh[:, -1]
+    return x[:, :3] / x[:, 3:]
+
+
+class CameraCalibration:
+    """单个摄像头的标定参数: 内参、畸变系数和相对于参考摄像头 (0号) 的位姿。"""
+    def __init__(self, matrix, dist=None, rotation=None, translation=None, image_size=(640, 480), source=None):
+        """
+        :param matrix: 3x3 内参矩阵 (像素)。
+        :param dist: 畸变系数，None 表示无畸变。
+        :param rotation: 3x3 旋转矩阵，把参考坐标系中的点变换到本摄像头坐标系。
+        :param translation: 平移向量 (单位即三角测量结果的单位，标定脚本中为厘米)。
+        :param image_size: 标定时的图像尺寸 (宽, 高)。
+        :param source: 输入源 (摄像头索引或视频文件)，供入口脚本打开同一个设备。
+        """
+        self.matrix = np.asarray(matrix, np.float64).reshape(3, 3)
+        self.dist = np.zeros(5) if dist is None else np.asarray(dist, np.float64).ravel()
+        self.rotation = np.eye(3) if rotation is None else np.asarray(rotation, np.float64).reshape(3, 3)
+        self.translation = np.zeros(3) if translation is None else np.asarray(translation, np.float64).ravel()
+        self.image_size = tuple(image_size)
+        self.source = source
+        self.projection = self.matrix @ np.hstack([self.rotation, self.translation[:, None]])
+
+    def undistort(self, landmarks):
+        """
+        把归一化关键点转换为去畸变后的像素坐标。
+        :param landmarks: (..., 21, 2 或 3) 归一化坐标 (相对于本摄像头的图像)。
+        :return: (..., 21, 2) 像素坐标。
+        """
+        landmarks = np.asarray(landmarks)
+        pixels = landmarks[..., :2] * self.image_size
+        if not self.dist.any():
+            return pixels
+        flat = pixels.reshape(-1, 1, 2).astype(np.float64)
+        return cv2.undistortPoints(flat, self.matrix, self.dist, P=self.matrix).reshape(pixels.shape)
+
+    def to_dict(self):
+        return {"matrix": self.matrix.tolist(), "dist": self.dist.tolist(), "rotation": self.rotation.tolist(),
+                "translation": self.translation.tolist(), "image_size": list(self.image_size), "source": self.source}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["matrix"], data.get("dist"), data.get("rotation"), data.get("translation"),
+                   data.get("image_size", (640, 480)), data.get("source"))
+
+
+class Calibration:
+    """
+    多视图标定: 一组 CameraCalibration，0号摄像头为参考坐标系。
+    保存为 JSON 文件 (calibrate_cameras.py 生成)，入口脚本启动时加载。
+    两个及以上视图时用 DLT 三角测量得到以厘米为单位的三维关键点；
+    只有一个视图时用标定的焦距和手掌长度估算距离。
+    """
+    def __init__(self, cameras, hand_length_cm=HAND_LENGTH_CM):
+        """
+        :param cameras: CameraCalibration 列表。
+        :param hand_length_cm: 手腕到中指掌指关节的长度，用于单摄像头的距离估算。
+        """
+        self.cameras = list(cameras)
+        self.hand_length_cm = hand_length_cm
+        self.projections = np.stack([camera.projection for camera in self.cameras])
+
+    def __len__(self):
+        return len(self.cameras)
+
+    @property
+    def sources(self):
+        return [camera.source for camera in self.cameras]
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"cameras": [camera.to_dict() for camera in self.cameras],
+                       "hand_length_cm": self.hand_length_cm}, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([CameraCalibration.from_dict(camera) for camera in data["cameras"]],
+                   data.get("hand_length_cm", HAND_LENGTH_CM))
+
+    def triangulate(self, views):
+        """
+        三角测量一只手的所有关键点。
+        :param views: 每个摄像头一项，为该视图中这只手的 (21, 2 或 3) 归一化坐标，没有检测到时为 None。
+        :return: (21, 3) 参考摄像头坐标系下的三维坐标 (厘米)，有效视图少于两个时返回 None。
+        """
+        used = [i for i, view in enumerate(views) if view is not None]
+        if len(used) < 2:
+            return None
+        points = np.stack([self.cameras[i].undistort(views[i]) for i in used])
+        return triangulate_dlt(points, self.projections[used])
+
+    def triangulate_frames(self, frames):
+        """
+        三角测量同一时刻多个摄像头的 HandFrame。
+        各视图的手按左右手标签对应 (所有视图的画面需要以同样的方式翻转)。
+        :param frames: 每个摄像头一项 HandFrame，没有数据时为 None。
+        :return: [(左右手标签, (21, 3) 三维坐标)]，只包含至少两个视图中出现的手。
+        """
+        labels = []
+        for frame in frames:
+            for label in frame.handedness if frame is not None else ():
+                if label not in labels:
+                    labels.append(label)
+        hands = []
+        for label in labels:
+            views = [frame.landmarks[frame.handedness.index(label)]
+                     if frame is not None and label in frame.handedness else None for frame in frames]
+            points = self.triangulate(views)
+            if points is not None:
+                hands.append((label, points))
+        return hands
+
+    def reprojection_error(self, points, views):
+        """
+        三维点重投影回各视图的平均误差 (像素)，用于检查标定和左右手对应是否正确。
+        :param points: (21, 3) 三维坐标。
+        :param views: 与 triangulate() 相同。
+        """
+        homogeneous = np.hstack([points, np.ones((len(points), 1))])
+        errors = []
+        for camera, view in zip(self.cameras, views):
+            if view is None:
+                continue
+            projected = homogeneous @ camera.projection.T
+            projected = projected[:, :2] / projected[:, 2:]
+            errors.append(np.linalg.norm(projected - camera.undistort(view), axis=-1).mean())
+        return float(np.mean(errors)) if errors else 0.0
+
+    def monocular_distance(self, landmarks, camera=0):
+        """
+        单视图距离估算: 距离 = 焦距 * 手掌长度 / 手腕到中指掌指关节的像素距离。
+        :param landmarks: (21, 2 或 3) 归一化坐标。
+        :param camera: 摄像头编号。
+        :return: 距离 (厘米)，无法计算时返回 0。
+        """
+        calibration = self.cameras[camera]
+        pixels = calibration.undistort(landmarks)
+        pixel_dist = float(np.linalg.norm(pixels[9] - pixels[0]))
+        if pixel_dist <= 0:
+            return 0.0
+        focal = (calibration.matrix[0, 0] + calibration.matrix[1, 1]) / 2
+        return float(focal * self.hand_length_cm / pixel_dist)
+
+
+def hand_distance(points):
+    """三维关键点 (厘米) 对应的手掌到参考摄像头的距离: 手腕和中指掌指关节中点的欧氏距离。"""
+    return float(np.linalg.norm((points[0] + points[9]) / 2))
@@ -1,20 +1,11 @@
 import cv2
-import mediapipe as mp
 import time
 
-# 尝试不同的摄像头索引
-def find_camera():
-    for i in range(5):  # 尝试索引0-4
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            ret, frame = cap.read()
-            if ret and frame is not None:
-                print(f"找到可用摄像头，索引: {i}")
-                return cap
-            cap.release()
-    return None
+from hand_tracker.core import HandTracker, TIP_IDS, draw_landmarks
+from hand_tracker.startup import fast_start
 
-cap = find_camera()
+# 摄像头和 MediaPipe 并行初始化，摄像头优先使用上次缓存的配置
+cap, tracker, _ = fast_start(HandTracker)
 if cap is None:
     print("错误：没有找到可用的摄像头！")
     print("请确保：")
@@ -23,9 +14,6 @@ if cap is None:
     print("3. 您有访问摄像头的权限")
     exit(1)
 
-mpHands = mp.solutions.hands # type: ignore
-hands = mpHands.Hands()
-mpDraw = mp.solutions.drawing_utils # type: ignore
 
 pTime = 0
 cTime = 0
@@ -41,27 +29,13 @@ while True:
         continue
         
     img = cv2.flip(img, 1)
-    imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    results = hands.process(imgRGB)
+    frame = tracker.process_bgr(img)
 
-    if results.multi_hand_landmarks:
-        for handLms in results.multi_hand_landmarks:
-            for id, lm in enumerate(handLms.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                # print(id, cx, cy)  # 注释掉打印以减少输出
-                if id == 4 :
-                    cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
-                if id == 8 :
-                    cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
-                if id == 12 :
-                    cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
-                if id == 16 :
-                    cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
-                if id == 20 :
-                    cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
+    # 指尖 (4, 8, 12, 16, 20) 的像素坐标
+    for cx, cy in frame.pixels()[:, TIP_IDS, :2].reshape(-1, 2).tolist():
+        cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
 
-            mpDraw.draw_landmarks(img, handLms, mpHands.HAND_CONNECTIONS)
+    draw_landmarks(img, frame)
 
     cTime = time.time()
     fps = 1 / (cTime - pTime)
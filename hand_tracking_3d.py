@@ -1,9 +1,18 @@
 import cv2
-import mediapipe as mp
 import time
 import math
 import pygame
 import numpy as np
+import argparse
+
+from hand_tracker.core import HandTracker, HAND_CONNECTIONS, TIP_IDS, draw_landmarks
+from hand_tracker.pipeline import ThreadedPipeline, StageStats
+from hand_tracker.filters import FilteredTracker, make_filter
+from hand_tracker.recording import LandmarkReplay
+from hand_tracker.multicam import open_source
+from hand_tracker.triangulation import Calibration, hand_distance
+from hand_tracker.startup import fast_start
+from hand_tracker.display import FramePresenter
 
 # --- 死亡搁浅风格辉光绘制函数 (优化版) ---
 def draw_glowing_line(surface, color, start, end, thickness, glow_intensity=0.8):
@@ -45,13 +54,119 @@ def draw_glowing_circle(surface, color, center, radius, core_alpha, glow_intensi
     # 核心半透明层
     pygame.draw.circle(surface, (r, g, b, core_alpha), center, radius)
 
+def draw_glowing_hand(surface, lmList, line_color, tip_color, joint_color, tip_ids=TIP_IDS):
+    """
+    绘制一只手的辉光骨架。
+    :param surface: 目标Pygame Surface (必须支持 per-pixel alpha)。
+    :param lmList: findPosition() 返回的 [id, x, y, z] 列表。
+    :param line_color: 骨骼连接线颜色。
+    :param tip_color: 指尖关节点颜色。
+    :param joint_color: 其他关节点颜色。
+    :param tip_ids: 指尖关节点编号。
+    """
+    # 绘制骨骼连接
+    for conn in HAND_CONNECTIONS:
+        p1 = lmList[conn[0]]
+        p2 = lmList[conn[1]]
+        draw_glowing_line(surface, line_color, (p1[1], p1[2]), (p2[1], p2[2]), 2)
+
+    # 绘制关节点 (后画，并区分指尖)
+    for point in lmList:
+        joint_id = point[0]
+        center_pos = (point[1], point[2])
+        if joint_id in tip_ids:
+            # 指尖: 大、高亮
+            draw_glowing_circle(surface, tip_color, center_pos, 6, core_alpha=190)
+        else:
+            # 其他关节: 小、次要颜色
+            draw_glowing_circle(surface, joint_color, center_pos, 3, core_alpha=220)
+
+
+class GlowHandRenderer:
+    """
+    辉光骨架渲染器，效果与 draw_glowing_hand 基本相同 (关节点与骨骼重叠处是混合而不是覆盖)，
+    但开销与手在画面中的大小成正比，而不是与窗口大小成正比:
+    - 关节点的辉光圆预先渲染为精灵，按 (颜色, 半径, 透明度) 缓存，每帧用一次 blits() 批量贴图；
+    - 只清除上一帧画过的区域，只把本帧手部包围盒 (脏矩形) 内的像素叠加到屏幕上。
+    """
+    def __init__(self, size, line_color, tip_color, joint_color, tip_ids=TIP_IDS, thickness=2, glow_intensity=0.8):
+        """
+        :param size: 渲染层的 (宽, 高)。
+        :param line_color: 骨骼连接线颜色。
+        :param tip_color: 指尖关节点颜色。
+        :param joint_color: 其他关节点颜色。
+        :param tip_ids: 指尖关节点编号。
+        :param thickness: 骨骼核心线条粗细。
+        :param glow_intensity: 辉光强度。
+        """
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.line_color = line_color
+        self.tip_ids = set(tip_ids)
+        self.thickness = thickness
+        self.glow_intensity = glow_intensity
+        self.rect = None   # 本帧绘制的区域，None 表示没有手
+        self._sprites = {}
+        # 每个关节点的精灵及其左上角相对于关节点的偏移
+        self._tip = self._sprite(tip_color, 6, 190)
+        self._joint = self._sprite(joint_color, 3, 220)
+        # 包围盒外扩的像素数: 覆盖外层辉光线条和最大的关节点精灵
+        self.padding = max(thickness * 2, 6 + 4) + 2
+
+    def _sprite(self, color, radius, core_alpha):
+        """返回 (精灵, 偏移)，同样的参数只渲染一次。"""
+        key = (color, radius, core_alpha)
+        if key not in self._sprites:
+            half = radius + 4
+            sprite = pygame.Surface((2 * half + 1, 2 * half + 1), pygame.SRCALPHA)
+            draw_glowing_circle(sprite, color, (half, half), radius, core_alpha, self.glow_intensity)
+            self._sprites[key] = (sprite, half)
+        return self._sprites[key]
+
+    def draw(self, lmList):
+        """
+        绘制一只手 (先清除上一帧的区域)。
+        :param lmList: findPosition() 返回的 [id, x, y, z] 列表，为空时只清除。
+        :return: 本帧的脏矩形，没有手时为 None。
+        """
+        if self.rect is not None:
+            self.surface.fill((0, 0, 0, 0), self.rect)
+            self.rect = None
+        if not lmList:
+            return None
+
+        xs = [point[1] for point in lmList]
+        ys = [point[2] for point in lmList]
+        pad = self.padding
+        rect = pygame.Rect(min(xs) - pad, min(ys) - pad, max(xs) - min(xs) + 2 * pad + 1, max(ys) - min(ys) + 2 * pad + 1)
+        self.rect = rect.clip(self.surface.get_rect())
+
+        # 骨骼连接 (线段的方向和长度每帧不同，直接绘制，只落在脏矩形内)
+        for start, end in HAND_CONNECTIONS:
+            p1, p2 = lmList[start], lmList[end]
+            draw_glowing_line(self.surface, self.line_color, (p1[1], p1[2]), (p2[1], p2[2]), self.thickness,
+                              self.glow_intensity)
+
+        # 关节点: 缓存的精灵一次批量贴图
+        stamps = []
+        for joint_id, x, y, _ in lmList:
+            sprite, half = self._tip if joint_id in self.tip_ids else self._joint
+            stamps.append((sprite, (x - half, y - half)))
+        self.surface.blits(stamps, doreturn=False)
+        return self.rect
+
+    def blit_to(self, target, dest=(0, 0)):
+        """只把脏矩形内的像素叠加到目标表面上。"""
+        if self.rect is not None:
+            target.blit(self.surface, (dest[0] + self.rect.x, dest[1] + self.rect.y), self.rect)
+
 
 class HandDetector():
     """
-    使用MediaPipe库查找用户的手。
+    使用共享的 HandTracker 查找用户的手。
     导出地标坐标，并可以判断哪些手指是伸出的。
     """
-    def __init__(self, mode=False, maxHands=2, model_complexity=1, detectionCon=0.5, trackCon=0.5):
+    def __init__(self, mode=False, maxHands=2, model_complexity=1, detectionCon=0.5, trackCon=0.5,
+                 roi=False, inference_width=None, tracker=None):
         """
         初始化HandDetector。
         :param mode: 是否为静态图像模式。
@@ -59,6 +174,9 @@ class HandDetector():
         :param model_complexity: 地标模型的复杂度 (0或1)。
         :param detectionCon: 最小检测置信度。
         :param trackCon: 最小跟踪置信度。
+        :param roi: 是否只对上一帧手部附近的区域做推理。
+        :param inference_width: 送入模型的最大图像宽度，None 表示不缩放。
+        :param tracker: 使用已有的追踪器 (例如回放时的 LandmarkReplay)，None 表示创建 MediaPipe 的 HandTracker。
         """
         self.mode = mode
         self.maxHands = maxHands
@@ -66,20 +184,33 @@ class HandDetector():
         self.detectionCon = detectionCon
         self.trackCon = trackCon
 
-        self.mpHands = mp.solutions.hands # type: ignore
-        self.hands = self.mpHands.Hands(self.mode, self.maxHands, self.model_complexity, self.detectionCon, self.trackCon)
-        self.mpDraw = mp.solutions.drawing_utils # type: ignore
+        if tracker is None:
+            tracker = HandTracker(self.mode, self.maxHands, self.model_complexity, self.detectionCon, self.trackCon,
+                                  roi=roi, inference_width=inference_width)
+        self.tracker = tracker
 
-        # 马卡龙配色 (BGR)
-        macaron_pink = (203, 192, 255)
-        macaron_green = (192, 255, 192)
-        self.landmark_drawing_spec = self.mpDraw.DrawingSpec(color=macaron_pink, thickness=2, circle_radius=2)
-        self.connection_drawing_spec = self.mpDraw.DrawingSpec(color=macaron_green, thickness=2)
-        
-        self.tipIds = [4, 8, 12, 16, 20]
+        self.tipIds = TIP_IDS
         self.lmList = []
         self.handedness = ""
         self.results = None
+        self.frame = None
+        # 像素坐标缓冲区，跨帧复用
+        self.lmPixels = np.zeros((21, 3), np.int32)
+
+    def process(self, imgRGB, **kwargs):
+        """
+        对RGB图像运行手部检测，结果保存在 self.frame (HandFrame) 中。
+        :param imgRGB: RGB图像。
+        :param kwargs: 传给追踪器的其余参数 (例如回放时的 index)。
+        :return: HandFrame。
+        """
+        self.frame = self.tracker.process(imgRGB, **kwargs)
+        self.results = self.tracker.results
+        return self.frame
+
+    def warm_up(self, image_size=(640, 480)):
+        """预热模型，避免第一帧的初始化延迟。"""
+        self.tracker.warm_up(image_size)
 
     def findHands(self, img, draw=True):
         """
@@ -89,40 +220,42 @@ class HandDetector():
         :return: 处理后的图像。
         """
         imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
+        self.process(imgRGB)
 
-        if self.results and self.results.multi_hand_landmarks:
-            for handLms in self.results.multi_hand_landmarks:
-                if draw:
-                    self.mpDraw.draw_landmarks(img, handLms, self.mpHands.HAND_CONNECTIONS)
+        # 使用映射回原图的关键点绘制 (开启 roi 时 self.results 的坐标相对于裁剪区域)
+        if draw and self.frame:
+            draw_landmarks(img, self.frame)
         return img
 
-    def findPosition(self, img, handNo=0, draw=True):
+    def findPosition(self, img, handNo=0, draw=True, handId=None):
         """
         获取一只手上所有关键点的3D坐标。
         :param img: 要处理的图像。
         :param handNo: 手的编号 (0或1)。
         :param draw: 是否在关键点上绘制圆圈。
+        :param handId: 跨帧稳定的手部编号 (HandFrame.ids)，指定时忽略 handNo；该手不在画面中时返回空列表。
         :return: 返回一个列表，包含每个关键点的 [id, x, y, z]。
         """
         self.lmList = []
-        if self.results and self.results.multi_hand_landmarks:
-            # 只处理指定的一只手
-            if len(self.results.multi_hand_landmarks) > handNo:
-                myHand = self.results.multi_hand_landmarks[handNo]
-                # 获取手的左右信息
-                if self.results.multi_handedness:
-                    hand_info = self.results.multi_handedness[handNo]
-                    self.handedness = hand_info.classification[0].label
-
-                for id, lm in enumerate(myHand.landmark):
-                    h, w, c = img.shape
-                    # 获取x,y,z坐标
-                    cx, cy, cz = int(lm.x * w), int(lm.y * h), lm.z
-                    self.lmList.append([id, cx, cy, cz])
-                    if draw:
-                        # 马卡龙粉色
-                        cv2.circle(img, (cx, cy), 5, (203, 192, 255), cv2.FILLED)
+        if handId is not None:
+            handNo = self.frame.index_of(handId) if self.frame is not None else None
+            if handNo is None:
+                return self.lmList
+        # 只处理指定的一只手
+        if self.frame is not None and self.frame.num_hands > handNo:
+            # 获取手的左右信息
+            if len(self.frame.handedness) > handNo:
+                self.handedness = self.frame.handedness[handNo]
+
+            # 一次向量化运算得到所有关键点的像素坐标
+            h, w = img.shape[:2]
+            self.frame.scaled((w, h, w), handNo, out=self.lmPixels)
+            depths = self.frame.landmarks[handNo, :, 2]
+            for id, ((cx, cy, _), cz) in enumerate(zip(self.lmPixels.tolist(), depths.tolist())):
+                self.lmList.append([id, cx, cy, cz])
+                if draw:
+                    # 马卡龙粉色
+                    cv2.circle(img, (cx, cy), 5, (203, 192, 255), cv2.FILLED)
         return self.lmList
 
     def fingersUp(self):
@@ -157,7 +290,21 @@ class HandDetector():
                 fingers.append(0)
         return fingers
 
-def main():
+def main(pipeline=False, record=None, replay=None, replay_realtime=True, roi=False, inference_width=None,
+         landmark_filter=None, calibration=None):
+    """
+    :param pipeline: 是否启用多线程流水线模式。
+                     启用后采集、推理、渲染分别在独立线程中运行，
+                     帧率由最慢的阶段决定，渲染端总是显示最新的结果。
+    :param record: 录制文件路径，设置后把每帧的追踪结果追加写入该文件。
+    :param replay: 回放的录制文件路径，设置后用录制的数据代替摄像头 (循环播放)。
+    :param replay_realtime: 回放时是否按录制时的节奏，False 表示尽可能快。
+    :param roi: 是否只对上一帧手部附近的区域做推理。
+    :param inference_width: 送入模型的最大图像宽度，None 表示不缩放。
+    :param landmark_filter: 关键点滤波器名称 ("ema" / "one_euro" / "kalman")，None 或 "none" 表示不滤波。
+    :param calibration: 标定文件路径 (calibrate_cameras.py 生成)。包含两个及以上摄像头时同步采集所有视图并做三角测量，
+                        显示手掌到 0 号摄像头的实际距离；只有一个摄像头时用标定的焦距估算距离。
+    """
     # --- Pygame 初始化 ---
     pygame.init()
     
@@ -167,8 +314,8 @@ def main():
     WINDOW_W, WINDOW_H = CAM_W + SIDEBAR_W, CAM_H
     
     screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
-    # 辉光渲染层
-    glow_surface = pygame.Surface((CAM_W, CAM_H), pygame.SRCALPHA)
+    # 摄像头画面的显示表面: 直接复用推理阶段已经转换好的RGB图像，跨帧复用
+    presenter = FramePresenter("RGB")
     pygame.display.set_caption("Death Stranding UI - Hand Tracking")
     
     # --- 字体 (优先使用更具科技感的字体) ---
@@ -192,23 +339,110 @@ def main():
     C_BTN_EXIT = (19, 31, 48)
     C_BTN_EXIT_HOVER = (255, 70, 70)
     C_SEPARATOR = (35, 54, 69)      # 分割线颜色 (更暗)
+
+    # 辉光渲染层 (缓存的关节点精灵，只更新手部所在的区域)
+    glow = GlowHandRenderer((CAM_W, CAM_H), C_ACCENT, C_JOINT_TIP, C_JOINT_OTHER)
     
     # --- OpenCV & MediaPipe 初始化 ---
     pTime = 0
-    cap = cv2.VideoCapture(0)
+    calibration = Calibration.load(calibration) if calibration else None
+    # 标定文件记录了每个视图对应的输入源，没有记录时按摄像头索引
+    sources = [0]
+    if calibration is not None and not replay:
+        sources = [source if source is not None else i for i, source in enumerate(calibration.sources)]
+    def make_detector():
+        return HandDetector(detectionCon=0.75, maxHands=1, roi=roi, inference_width=inference_width)
+
+    if replay:
+        # 回放: 录制文件同时代替摄像头和追踪器，不加载模型
+        cap = LandmarkReplay(replay, realtime=replay_realtime, loop=True)
+        detector = HandDetector(maxHands=1, tracker=cap)
+    elif calibration is not None:
+        # 标定文件指定了输入源
+        cap = open_source(sources[0])[0]
+        detector = make_detector()
+        detector.warm_up((CAM_W, CAM_H))
+    else:
+        # 摄像头 (优先使用上次缓存的配置) 和 MediaPipe 并行初始化，并预热模型
+        cap, detector, _ = fast_start(make_detector, width=CAM_W, height=CAM_H)
+        if cap is None:
+            raise SystemExit("没有找到可用的摄像头！")
     cap.set(3, CAM_W)
     cap.set(4, CAM_H)
-    detector = HandDetector(detectionCon=0.75, maxHands=1)
+    # 其余标定视图: 与主摄像头同步采集，各自一个追踪器
+    views = []
+    for source in sources[1:]:
+        view_cap = open_source(source)[0]
+        view_cap.set(3, CAM_W)
+        view_cap.set(4, CAM_H)
+        views.append((view_cap, HandTracker(max_num_hands=1, min_detection_confidence=0.75)))
+    if record and not replay:
+        detector.tracker.start_recording(record, (CAM_W, CAM_H))
+    landmark_filter = make_filter(landmark_filter)
+    if landmark_filter is not None:
+        # 手指计数和距离估算都基于滤波后的关键点
+        detector.tracker = FilteredTracker(detector.tracker, landmark_filter)
 
-    # --- 距离估算标定参数 ---
+    # --- 距离估算标定参数 (没有标定文件时使用) ---
     D_REF_CM = 30.0
     PIX_DIST_REF = 150.0 
 
+    def estimate_distance(lmList, view_frames):
+        """估算手掌到摄像头的距离 (厘米): 多视图三角测量 > 标定焦距的单视图估算 > 参考距离的反比估算。"""
+        if not lmList: return 0
+        frame = detector.frame
+        if view_frames:
+            for label, points in calibration.triangulate_frames([frame] + view_frames):
+                if label == detector.handedness:
+                    return hand_distance(points)
+        if calibration is not None:
+            return calibration.monocular_distance(frame.landmarks[0])
+        x1, y1, x2, y2 = lmList[0][1], lmList[0][2], lmList[9][1], lmList[9][2]
+        pixel_dist = math.hypot(x2 - x1, y2 - y1)
+        return (PIX_DIST_REF * D_REF_CM) / pixel_dist if pixel_dist > 0 else 0
+
     # --- UI 布局计算 ---
     cam_area_rect = pygame.Rect(0, 0, CAM_W, CAM_H)
     sidebar_rect = pygame.Rect(CAM_W, 0, SIDEBAR_W, WINDOW_H)
     exit_btn_rect = pygame.Rect(sidebar_rect.left, WINDOW_H - 50, SIDEBAR_W, 50)
 
+    # --- 流水线各阶段 ---
+    def capture():
+        """采集阶段: 读取一帧并翻转、转换为RGB (有多个标定视图时同时采集其余视图)。"""
+        if views:
+            # 先 grab 所有摄像头再 retrieve，使各视图的曝光时刻尽量接近
+            if not cap.grab() or not all(view_cap.grab() for view_cap, _ in views): return None
+            img_bgr = cap.retrieve()[1]
+            view_images = [cv2.flip(view_cap.retrieve()[1], 1) for view_cap, _ in views]
+        else:
+            success, img_bgr = cap.read()
+            if not success: return None
+            view_images = []
+        # 回放位置只由采集阶段移动，帧号随图像交给推理阶段 (流水线模式下两者在不同线程)
+        tracker_args = {"index": cap.position} if replay else {}
+        img_flipped = cv2.flip(img_bgr, 1)
+        img_rgb = cv2.cvtColor(img_flipped, cv2.COLOR_BGR2RGB)
+        return img_flipped, img_rgb, view_images, tracker_args
+
+    def inference(frame):
+        """推理阶段: 运行MediaPipe并提取关键点、手指状态和距离。"""
+        img_flipped, img_rgb, view_images, tracker_args = frame
+        img_rgb.flags.writeable = False
+        detector.process(img_rgb, **tracker_args)
+        img_rgb.flags.writeable = True
+        lmList = detector.findPosition(img_flipped, draw=False)
+        fingers = detector.fingersUp()
+        view_frames = [view_tracker.process_bgr(img) for (_, view_tracker), img in zip(views, view_images)]
+        return img_rgb, lmList, fingers, estimate_distance(lmList, view_frames)
+
+    if pipeline:
+        tracker = ThreadedPipeline(capture, ("inference", inference)).start()
+        stage_stats = tracker.stats
+    else:
+        tracker = None
+        stage_stats = {name: StageStats(name) for name in ("capture", "inference")}
+    stage_stats["render"] = StageStats("render")
+
     running = True
     while running:
         # --- 事件处理 ---
@@ -224,58 +458,38 @@ def main():
                     running = False
         
         # --- 获取图像 & 手部检测 ---
-        success, img_bgr = cap.read()
-        if not success: continue
-        
-        img_flipped = cv2.flip(img_bgr, 1)
-        img_rgb = cv2.cvtColor(img_flipped, cv2.COLOR_BGR2RGB)
-        
-        img_rgb.flags.writeable = False
-        detector.results = detector.hands.process(img_rgb)
-        img_rgb.flags.writeable = True
-        lmList = detector.findPosition(img_flipped, draw=False)
-        
-        img_pygame = pygame.image.frombuffer(img_rgb.tobytes(), (CAM_W, CAM_H), "RGB")
+        if tracker:
+            tracker.check()
+            result = tracker.output.get_latest(timeout=0.1)
+            if result is None: continue
+        else:
+            with stage_stats["capture"].timer():
+                frame = capture()
+            if frame is None: continue
+            with stage_stats["inference"].timer():
+                result = inference(frame)
+        img_rgb, lmList, fingers, dist_cm = result
+
+        render_start = time.perf_counter()
+
+        img_pygame = presenter.update(img_rgb)
 
         # --- 核心绘制 ---
         screen.fill(C_BACKGROUND)
         screen.blit(img_pygame, (0, 0))
         
-        # 清空辉光层
-        glow_surface.fill((0, 0, 0, 0))
+        # --- 绘制辉光骨架 (同时清除上一帧画过的区域) ---
+        glow.draw(lmList)
 
         # 初始化数据变量
-        totalFingers, dist_cm = 0, 0
+        totalFingers = 0
 
         if lmList:
-            # --- 绘制辉光骨架 ---
-            # 绘制骨骼连接
-            for conn in detector.mpHands.HAND_CONNECTIONS:
-                p1 = lmList[conn[0]]
-                p2 = lmList[conn[1]]
-                draw_glowing_line(glow_surface, C_ACCENT, (p1[1], p1[2]), (p2[1], p2[2]), 2)
-                
-            # 绘制关节点 (后画，并区分指尖)
-            for point in lmList:
-                joint_id = point[0]
-                center_pos = (point[1], point[2])
-                if joint_id in detector.tipIds:
-                    # 指尖: 大、高亮
-                    draw_glowing_circle(glow_surface, C_JOINT_TIP, center_pos, 6, core_alpha=190)
-                else:
-                    # 其他关节: 小、次要颜色
-                    draw_glowing_circle(glow_surface, C_JOINT_OTHER, center_pos, 3, core_alpha=220)
-
-
             # --- 功能计算 ---
-            fingers = detector.fingersUp()
             totalFingers = fingers.count(1)
-            x1, y1, x2, y2 = lmList[0][1], lmList[0][2], lmList[9][1], lmList[9][2]
-            pixel_dist = math.hypot(x2 - x1, y2 - y1)
-            if pixel_dist > 0: dist_cm = (PIX_DIST_REF * D_REF_CM) / pixel_dist
 
-        # 将辉光层叠加到主屏幕
-        screen.blit(glow_surface, (0, 0))
+        # 将辉光层的脏矩形叠加到主屏幕
+        glow.blit_to(screen)
 
         # --- 侧边栏UI绘制 (V2 - 优化布局) ---
         pygame.draw.rect(screen, C_PANEL, sidebar_rect)
@@ -287,12 +501,15 @@ def main():
         screen.blit(title, (sidebar_rect.left + 60, y_pos - 10))
         y_pos += 40
 
-        # 2. FPS (元数据)
+        # 2. FPS (元数据) 与各阶段耗时
         cTime = time.time()
         fps = 1 / (cTime - pTime) if (cTime - pTime) > 0 else 0
         pTime = cTime
         label_fps = font_main.render(f"FPS: {int(fps)}", True, C_TEXT_DIM)
         screen.blit(label_fps, (sidebar_rect.left + 20, y_pos))
+        latency_text = "  ".join(f"{name[:3].upper()} {stats.mean_ms:.1f}" for name, stats in stage_stats.items())
+        label_latency = font_title.render(f"{latency_text} ms", True, C_TEXT_DIM)
+        screen.blit(label_latency, (sidebar_rect.left + 20, y_pos + 24))
         y_pos += 40
 
         # 分割线
@@ -322,9 +539,29 @@ def main():
         screen.blit(exit_text, exit_rect)
         
         pygame.display.flip()
+        stage_stats["render"].record(time.perf_counter() - render_start)
 
+    if tracker:
+        tracker.stop()
+        print("各阶段耗时:", ", ".join(repr(stats) for stats in stage_stats.values()))
+        print("丢弃帧数:", tracker.dropped)
     cap.release()
+    for view_cap, view_tracker in views:
+        view_cap.release()
+        view_tracker.close()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Death Stranding UI - Hand Tracking")
+    parser.add_argument("--pipeline", action="store_true", help="采集/推理/渲染分线程运行")
+    parser.add_argument("--record", help="把追踪结果录制到文件")
+    parser.add_argument("--replay", help="回放录制文件代替摄像头")
+    parser.add_argument("--replay-fast", action="store_true", help="尽可能快地回放，不按录制时的节奏")
+    parser.add_argument("--roi", action="store_true", help="只对手部附近的区域做推理")
+    parser.add_argument("--inference-width", type=int, default=None, help="送入模型的最大图像宽度 (像素)")
+    parser.add_argument("--filter", default="none", choices=["none", "ema", "one_euro", "kalman"], help="关键点时域滤波器")
+    parser.add_argument("--calibration", help="摄像头标定文件 (calibrate_cameras.py 生成)，距离以实际厘米显示")
+    args = parser.parse_args()
+    main(pipeline=args.pipeline, record=args.record, replay=args.replay, replay_realtime=not args.replay_fast,
+         roi=args.roi, inference_width=args.inference_width, landmark_filter=args.filter,
+         calibration=args.calibration)
@@ -1,137 +1,276 @@
 import cv2
-import mediapipe as mp
 import time
-import json
-import socket
 import math
+import argparse
+
+from hand_tracker.core import HandTracker, draw_landmarks
+from hand_tracker.events import PALM, GestureEventTracker
+from hand_tracker.gestures import GestureClassifier, hand_center, hand_rotation
+from hand_tracker.protocol import DeltaEncoder, PacketEncoder
+from hand_tracker.recording import LandmarkReplay
+from hand_tracker.filters import FilteredTracker, make_filter
+from hand_tracker.multicam import MultiCameraManager
+from hand_tracker.scheduler import InferenceScheduler
+from hand_tracker.sharedmem import SharedLandmarkWriter
+from hand_tracker.kinematics import KinematicsTracker, sample_time
+from hand_tracker.startup import fast_start, open_camera
+from hand_tracker.streaming import StreamServer
+from hand_tracker.triangulation import Calibration, hand_distance
+
+class ProtocolOptions:
+    """发给 UE5 的数据: 格式、增量模式的关键帧间隔，以及是否只发送事件。"""
+    def __init__(self, protocol="json", keyframe_interval=30, events_only=False, heartbeat=1.0):
+        """
+        :param protocol: 数据格式。"json": 原有的JSON格式；
+                         "binary": 二进制协议 (float32 关键点)；
+                         "binary16": 二进制协议 (int16 量化关键点)；
+                         "delta": 周期性关键帧 + 增量包。
+                         二进制协议见 hand_tracker/protocol.py。
+        :param keyframe_interval: "delta" 模式下每隔多少个数据包发送一次关键帧。
+        :param events_only: 只向 UE5 发送事件 (手的进入/离开、gesture_start / gesture_end / hold / swipe 和心跳)，
+                            手势不变时没有网络流量。仅用于 JSON 格式的单摄像头模式。
+        :param heartbeat: 没有事件时心跳事件的间隔 (秒)，None 表示不发送心跳。
+        """
+        if events_only and protocol != "json":
+            raise ValueError("只发送事件时数据格式必须为 json")
+        self.protocol = protocol
+        self.keyframe_interval = keyframe_interval
+        self.events_only = events_only
+        self.heartbeat = heartbeat
+
+
+class StreamOptions:
+    """UE5 以外的订阅者: 数据流服务的监听地址和端口，以及本机共享内存。"""
+    def __init__(self, host="127.0.0.1", subscribe_port=None, ws_port=None, shared_memory=None):
+        """
+        :param host: 接收订阅的监听地址。
+        :param subscribe_port: 接收 UDP 订阅消息的端口，None 表示只发送给 UE5。
+        :param ws_port: WebSocket 订阅端口，None 表示不启用。
+                        订阅者可以选择数据类型 (full / gestures / commands / binary) 和频率，见 hand_tracker/streaming.py。
+        :param shared_memory: 共享内存名称，设置后每帧的关键点和手势同时写入共享内存环形缓冲区，
+                              供本机其他进程用 SharedLandmarkReader 读取 (多摄像头时第 i 路的名称加后缀 _i)。
+        """
+        self.host = host
+        self.subscribe_port = subscribe_port
+        self.ws_port = ws_port
+        self.shared_memory = shared_memory
+
+    @property
+    def has_subscribers(self):
+        """是否允许其他客户端订阅 (否则数据只发给 UE5)。"""
+        return self.subscribe_port is not None or self.ws_port is not None
+
+
+class TrackingOptions:
+    """追踪器: 推理区域和分辨率、跳帧推理、关键点滤波。"""
+    def __init__(self, roi=False, inference_width=None, infer_every=1, infer_cpu=None, landmark_filter=None):
+        """
+        :param roi: 是否只对上一帧手部附近的区域做推理 (跟丢或定期刷新时回到全图)。
+        :param inference_width: 送入模型的最大图像宽度，None 表示不缩放。
+        :param infer_every: 每隔多少帧运行一次推理，其余帧外推关键点。
+        :param infer_cpu: 推理最多占用的时间比例 (0~1)，设置后按推理耗时自适应跳帧，优先于 infer_every。
+        :param landmark_filter: 关键点滤波器名称 ("ema" / "one_euro" / "kalman")，None 或 "none" 表示不滤波。
+        """
+        self.roi = roi
+        self.inference_width = inference_width
+        self.infer_every = infer_every
+        self.infer_cpu = infer_cpu
+        self.landmark_filter = landmark_filter
+
+
+class SourceOptions:
+    """输入源: 录制/回放、多摄像头和标定文件。"""
+    def __init__(self, record=None, replay=None, replay_realtime=True, cameras=None, calibration=None):
+        """
+        :param record: 录制文件路径，设置后把每帧的追踪结果追加写入该文件。
+        :param replay: 回放的录制文件路径，设置后用录制的数据代替摄像头，播放完毕后退出。
+        :param replay_realtime: 回放时是否按录制时的节奏，False 表示尽可能快。
+        :param cameras: 多个输入源 (摄像头索引或视频文件)，设置后每个输入源在独立进程中追踪，
+                        按时间戳对齐后一起发送 (JSON 为一个包含 "cameras" 列表的数据包，
+                        二进制协议下第 i 路发送到 ue5_port + i)。此模式不显示画面，不支持录制/回放和跳帧推理。
+        :param calibration: 标定文件路径 (calibrate_cameras.py 生成)。多摄像头时 JSON 数据包附带三角测量的
+                            三维关键点 (厘米)，未指定 cameras 时使用标定文件记录的输入源；
+                            单摄像头时每只手附带用标定焦距估算的 distance_cm。
+        """
+        self.record = record
+        self.replay = replay
+        self.replay_realtime = replay_realtime
+        self.cameras = cameras
+        self.calibration = calibration
+
 
 class HandGestureToUE5:
-    def __init__(self, ue5_ip="127.0.0.1", ue5_port=12345):
-        # 网络设置
+    def __init__(self, ue5_ip="127.0.0.1", ue5_port=12345, protocol=None, stream=None, tracking=None, source=None):
+        """
+        :param ue5_ip: UE5 接收端的IP。
+        :param ue5_port: UE5 接收端的端口。
+        :param protocol: ProtocolOptions，None 表示逐帧发送 JSON。
+        :param stream: StreamOptions，None 表示只发送给 UE5。
+        :param tracking: TrackingOptions，None 表示全图推理、每帧推理、不滤波。
+        :param source: SourceOptions，None 表示使用摄像头。
+        """
+        protocol = protocol or ProtocolOptions()
+        stream = stream or StreamOptions()
+        tracking = tracking or TrackingOptions()
+        source = source or SourceOptions()
+        # 网络设置: UE5 是数据流服务的一个固定 UDP 目标，其他客户端可以另外订阅
         self.ue5_ip = ue5_ip
         self.ue5_port = ue5_port
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.protocol = protocol.protocol
+        self.keyframe_interval = protocol.keyframe_interval
+        self.encoder = self.make_encoder()
+        self.server = StreamServer(stream.host, stream.subscribe_port, stream.ws_port, heartbeat=protocol.heartbeat)
+        ue5_payload = "binary" if self.encoder is not None else "events" if protocol.events_only else "full"
+        self.server.add_udp_target((ue5_ip, ue5_port), ue5_payload)
+        # 只发送事件且没有其他订阅者时，不需要逐帧生成完整的 JSON 数据
+        self.events_only = protocol.events_only and not stream.has_subscribers
+        self.shared_memory = stream.shared_memory
+        self.shared_writers = {}   # 按摄像头编号，收到第一帧时按图像尺寸创建
         
-        # MediaPipe设置
-        self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
-        self.mpDraw = mp.solutions.drawing_utils
+        # 表驱动的手势分类器，一次计算一帧中所有手的所有手势
+        self.classifier = GestureClassifier()
+        # 每只手所有关键点的速度和加速度 (JSON 数据包中的 velocity / acceleration)
+        self.kinematics = KinematicsTracker()
+        # 手势状态机: 只在手势切换时产生事件 (JSON 数据包中的 events)
+        self.gesture_events = GestureEventTracker(self.classifier.names, heartbeat=protocol.heartbeat)
         
-        # 摄像头设置
-        self.cap = self.find_camera()
-        if self.cap is None:
-            raise Exception("没有找到可用的摄像头！")
+        self.replay = source.replay
+        self.manager = None
+        cameras = source.cameras
+        self.calibration = Calibration.load(source.calibration) if source.calibration else None
+        if self.calibration is not None:
+            print(f"加载标定文件: {source.calibration} ({len(self.calibration)} 个摄像头)")
+            if not cameras and len(self.calibration) > 1:
+                cameras = [source if source is not None else i for i, source in enumerate(self.calibration.sources)]
+        if cameras:
+            if self.calibration is not None and len(self.calibration) != len(cameras):
+                raise ValueError(f"标定文件包含 {len(self.calibration)} 个摄像头，但指定了 {len(cameras)} 个输入源")
+            # 多摄像头: 每个输入源一个追踪进程，滤波也在各自的进程中完成
+            self.manager = MultiCameraManager(cameras, dict(
+                static_image_mode=False,
+                max_num_hands=2,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.5,
+                roi=tracking.roi,
+                inference_width=tracking.inference_width,
+                landmark_filter=tracking.landmark_filter
+            ))
+            self.cap = self.tracker = None
+            # 每一路独立的编码器 (delta 模式的参考帧按摄像头区分)
+            self.encoders = [self.encoder] + [self.make_encoder() for _ in cameras[1:]]
+            if self.encoder is not None:
+                for camera_id in range(1, len(cameras)):
+                    self.server.add_udp_target((ue5_ip, ue5_port + camera_id), "binary", channel=camera_id)
+            self.camera_kinematics = [KinematicsTracker() for _ in cameras]
+            print(f"多摄像头模式: {len(cameras)} 个输入源")
+            self.start_server()
+            return
+        if source.replay:
+            # 回放: 录制文件同时代替摄像头和追踪器
+            self.cap = self.tracker = LandmarkReplay(source.replay, realtime=source.replay_realtime)
+            print(f"回放录制文件: {source.replay} ({len(self.cap)} 帧)")
+        else:
+            # MediaPipe 和摄像头并行初始化 (摄像头优先使用上次缓存的配置)，并预热模型
+            self.cap, self.tracker, _ = fast_start(lambda: HandTracker(
+                static_image_mode=False,
+                max_num_hands=2,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.5,
+                roi=tracking.roi,
+                inference_width=tracking.inference_width
+            ))
+            if self.cap is None:
+                raise Exception("没有找到可用的摄像头！")
             
-        print(f"准备发送数据到UE5: {ue5_ip}:{ue5_port}")
+            if source.record:
+                image_size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+                self.tracker.start_recording(source.record, image_size)
+                print(f"录制追踪数据到: {source.record}")
+        
+        landmark_filter = make_filter(tracking.landmark_filter)
+        if landmark_filter is not None:
+            # 手势在滤波后的关键点上判断，UE5 端不再需要自己去抖
+            self.tracker = FilteredTracker(self.tracker, landmark_filter)
+        if tracking.infer_every > 1 or tracking.infer_cpu:
+            # 跳帧推理: 未推理的帧外推关键点，数据流仍按摄像头帧率发送
+            self.tracker = InferenceScheduler(self.tracker, tracking.infer_every, tracking.infer_cpu)
+            
+        self.start_server()
+    
+    @classmethod
+    def from_args(cls, args):
+        """按命令行参数创建。"""
+        return cls(
+            args.ip, args.port,
+            protocol=ProtocolOptions(args.protocol, args.keyframe_interval, args.events, args.heartbeat or None),
+            stream=StreamOptions(args.stream_host, args.subscribe_port, args.ws_port, args.shm),
+            tracking=TrackingOptions(args.roi, args.inference_width, args.infer_every, args.infer_cpu, args.filter),
+            source=SourceOptions(args.record, args.replay, not args.replay_fast, args.cameras, args.calibration),
+        )
+    
+    def start_server(self):
+        """启动数据流服务并打印 UE5 目标和订阅地址。"""
+        self.server.start()
+        print(f"准备发送数据到UE5: {self.ue5_ip}:{self.ue5_port} ({self.protocol})")
+        if self.server.udp_port is not None:
+            print(f"UDP 订阅端口: {self.server.host}:{self.server.udp_port}")
+        if self.server.ws_port is not None:
+            print(f"WebSocket 订阅: ws://{self.server.host}:{self.server.ws_port}/?payload=gestures&rate=30")
+    
+    def make_encoder(self):
+        """按数据格式创建编码器，JSON 返回 None。"""
+        if self.protocol == "json":
+            return None
+        if self.protocol in ("binary", "binary16"):
+            return PacketEncoder(quantize=(self.protocol == "binary16"))
+        if self.protocol == "delta":
+            return DeltaEncoder(self.keyframe_interval)
+        raise ValueError(f"未知的数据格式: {self.protocol}")
     
     def find_camera(self):
-        for i in range(5):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                ret, frame = cap.read()
-                if ret and frame is not None:
-                    print(f"找到可用摄像头，索引: {i}")
-                    return cap
-                cap.release()
-        return None
+        return open_camera()
     
-    def calculate_gesture_data(self, hand_landmarks):
-        """计算手势相关数据"""
-        landmarks = []
-        for lm in hand_landmarks.landmark:
-            landmarks.append([lm.x, lm.y, lm.z])
+    def calculate_gesture_data(self, landmarks, gestures=None, kinematics=None):
+        """
+        计算手势相关数据
+        :param landmarks: 一只手的 (21, 3) 归一化坐标数组。
+        :param gestures: 该手已由 classifier.classify 算好的手势布尔数组，None 时现算。
+        :param kinematics: 该手的 HandKinematics，设置后附带各关键点的速度 (归一化坐标/秒) 和加速度。
+        """
+        if gestures is None:
+            gestures = self.classifier.classify(landmarks)
+        points = landmarks.tolist()
         
-        # 计算基本手势
-        gesture_data = {
-            "landmarks": landmarks,
-            "thumb_up": self.is_thumb_up(landmarks),
-            "fist": self.is_fist(landmarks),
-            "open_hand": self.is_open_hand(landmarks),
-            "pointing": self.is_pointing(landmarks),
-            "peace": self.is_peace_sign(landmarks),
-            "hand_rotation": self.calculate_hand_rotation(landmarks),
-            "hand_center": self.calculate_hand_center(landmarks)
-        }
+        # 基本手势 (thumb_up, fist, open_hand, pointing, peace ...)
+        gesture_data = {"landmarks": points}
+        gesture_data.update(zip(self.classifier.names, gestures.tolist()))
+        gesture_data["hand_rotation"] = self.calculate_hand_rotation(points)
+        gesture_data["hand_center"] = self.calculate_hand_center(landmarks)
+        if kinematics is not None:
+            gesture_data["velocity"] = kinematics.velocity.tolist()
+            gesture_data["acceleration"] = kinematics.acceleration.tolist()
         
         return gesture_data
     
     def is_thumb_up(self, landmarks):
         """检测大拇指向上手势"""
-        thumb_tip = landmarks[4]
-        thumb_ip = landmarks[3]
-        thumb_mcp = landmarks[2]
-        
-        # 大拇指向上且其他手指弯曲
-        thumb_up = thumb_tip[1] < thumb_ip[1] < thumb_mcp[1]
-        
-        # 检查其他手指是否弯曲
-        fingers_down = 0
-        finger_tips = [8, 12, 16, 20]  # 食指、中指、无名指、小指指尖
-        finger_pips = [6, 10, 14, 18]  # 对应的PIP关节
-        
-        for tip, pip in zip(finger_tips, finger_pips):
-            if landmarks[tip][1] > landmarks[pip][1]:  # 指尖在PIP关节下方表示弯曲
-                fingers_down += 1
-                
-        return thumb_up and fingers_down >= 3
+        return self.classifier.check("thumb_up", landmarks)
     
     def is_fist(self, landmarks):
         """检测握拳手势"""
-        fingers_down = 0
-        finger_tips = [4, 8, 12, 16, 20]  # 所有指尖
-        finger_pips = [3, 6, 10, 14, 18]  # 对应关节
-        
-        for tip, pip in zip(finger_tips, finger_pips):
-            if landmarks[tip][1] > landmarks[pip][1]:
-                fingers_down += 1
-                
-        return fingers_down >= 4
+        return self.classifier.check("fist", landmarks)
     
     def is_open_hand(self, landmarks):
         """检测张开手掌"""
-        fingers_up = 0
-        finger_tips = [4, 8, 12, 16, 20]
-        finger_pips = [3, 6, 10, 14, 18]
-        
-        for tip, pip in zip(finger_tips, finger_pips):
-            if landmarks[tip][1] < landmarks[pip][1]:
-                fingers_up += 1
-                
-        return fingers_up >= 4
+        return self.classifier.check("open_hand", landmarks)
     
     def is_pointing(self, landmarks):
         """检测指向手势（食指向上，其他手指弯曲）"""
-        index_up = landmarks[8][1] < landmarks[6][1]
-        other_fingers_down = 0
-        
-        other_tips = [4, 12, 16, 20]
-        other_pips = [3, 10, 14, 18]
-        
-        for tip, pip in zip(other_tips, other_pips):
-            if landmarks[tip][1] > landmarks[pip][1]:
-                other_fingers_down += 1
-                
-        return index_up and other_fingers_down >= 3
+        return self.classifier.check("pointing", landmarks)
     
     def is_peace_sign(self, landmarks):
         """检测V字手势（食指和中指向上）"""
-        index_up = landmarks[8][1] < landmarks[6][1]
-        middle_up = landmarks[12][1] < landmarks[10][1]
-        
-        other_fingers_down = 0
-        other_tips = [4, 16, 20]
-        other_pips = [3, 14, 18]
-        
-        for tip, pip in zip(other_tips, other_pips):
-            if landmarks[tip][1] > landmarks[pip][1]:
-                other_fingers_down += 1
-                
-        return index_up and middle_up and other_fingers_down >= 2
+        return self.classifier.check("peace", landmarks)
     
     def calculate_hand_rotation(self, landmarks):
         """计算手部旋转角度"""
@@ -145,23 +284,35 @@ class HandGestureToUE5:
         return angle
     
     def calculate_hand_center(self, landmarks):
-        """计算手部中心点"""
-        center_x = sum([lm[0] for lm in landmarks]) / len(landmarks)
-        center_y = sum([lm[1] for lm in landmarks]) / len(landmarks)
-        center_z = sum([lm[2] for lm in landmarks]) / len(landmarks)
-        
-        return [center_x, center_y, center_z]
+        """计算手部中心点 (landmarks 为 (21, 3) 数组)"""
+        return landmarks.mean(axis=0).tolist()
     
-    def send_to_ue5(self, data):
-        """发送数据到UE5"""
-        try:
-            json_data = json.dumps(data)
-            self.sock.sendto(json_data.encode(), (self.ue5_ip, self.ue5_port))
-        except Exception as e:
-            print(f"发送数据失败: {e}")
+    def write_shared(self, frame, gestures, timestamp, camera_id=0):
+        """把一帧写入共享内存环形缓冲区 (没有设置 shared_memory 时什么也不做)。"""
+        if self.shared_memory is None:
+            return
+        writer = self.shared_writers.get(camera_id)
+        if writer is None:
+            name = self.shared_memory if camera_id == 0 else f"{self.shared_memory}_{camera_id}"
+            writer = self.shared_writers[camera_id] = SharedLandmarkWriter(
+                name, image_size=frame.image_size, gesture_names=self.classifier.names)
+            print(f"追踪结果写入共享内存: {name}")
+        writer.write(frame, gestures, timestamp)
+    
+    def send_to_ue5(self, data, packet=None, channel=0):
+        """
+        发布一帧到 UE5 和所有订阅者 (不阻塞，序列化和发送在数据流服务的线程中完成)
+        :param data: JSON 数据，None 表示只有二进制数据包。
+        :param packet: 已编码的二进制数据包。
+        :param channel: 二进制数据包的通道号 (多摄像头时为摄像头编号，UE5 端口为 ue5_port + channel)。
+        """
+        self.server.publish(data, packet, channel)
     
     def run(self):
         """主运行循环"""
+        if self.manager is not None:
+            self.run_multi()
+            return
         pTime = 0
         
         print("手势追踪启动！支持的手势：")
@@ -176,39 +327,73 @@ class HandGestureToUE5:
             success, img = self.cap.read()
             
             if not success or img is None:
+                if self.replay:
+                    break
                 continue
+            timestamp = sample_time(self.cap)
                 
             img = cv2.flip(img, 1)
             h, w, c = img.shape
-            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(imgRGB)
+            frame = self.tracker.process_bgr(img)
+            kinematics = self.kinematics.update(frame, timestamp)
             
             # 准备发送给UE5的数据
             ue5_data = {
                 "timestamp": time.time(),
                 "hands": []
             }
+            # 手的进入/离开事件 (按稳定编号)，UE5 端可以据此创建/销毁对应的手
+            events = [{"type": kind, "hand_id": hand_id, "handedness": label}
+                      for kind, hand_id, label in self.tracker.identities.pop_events()]
+            
+            # 一次分类这一帧中所有的手
+            all_gestures = self.classifier.classify(frame.landmarks)
+            rotations = hand_rotation(frame.landmarks)
+            self.write_shared(frame, all_gestures, ue5_data["timestamp"])
             
-            if results.multi_hand_landmarks:
-                for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                    # 计算手势数据
-                    gesture_data = self.calculate_gesture_data(hand_landmarks)
-                    
-                    # 添加手部索引（左手/右手）
-                    handedness = results.multi_handedness[i].classification[0].label
-                    gesture_data["handedness"] = handedness
-                    
-                    ue5_data["hands"].append(gesture_data)
-                    
-                    # 绘制手部关键点
-                    self.mpDraw.draw_landmarks(img, hand_landmarks, self.mpHands.HAND_CONNECTIONS)
-                    
-                    # 在屏幕上显示检测到的手势
-                    self.draw_gesture_info(img, gesture_data, i)
+            # 手势切换、保持、挥动和心跳事件
+            left = [event["hand_id"] for event in events if event["type"] == "leave"]
+            events += self.gesture_events.update(frame, all_gestures, timestamp, [k.velocity[PALM] for k in kinematics],
+                                                 left)
+            if events:
+                ue5_data["events"] = events
+            
+            for i, hand_landmarks in enumerate(frame.landmarks):
+                # 计算手势数据
+                if self.encoder is None and not self.events_only:
+                    gesture_data = self.calculate_gesture_data(hand_landmarks, all_gestures[i], kinematics[i])
+                else:
+                    # 二进制协议直接发送数组，只发送事件时不需要逐帧数据，这里只准备屏幕显示需要的字段
+                    gesture_data = dict(zip(self.classifier.names, all_gestures[i].tolist()))
+                    gesture_data["hand_rotation"] = float(rotations[i])
+                
+                # 添加手部索引（左手/右手）和跨帧稳定的编号
+                gesture_data["handedness"] = frame.handedness[i]
+                gesture_data["hand_id"] = frame.ids[i] if frame.ids is not None else i
+                
+                if self.calibration is not None:
+                    gesture_data["distance_cm"] = self.calibration.monocular_distance(hand_landmarks)
+                
+                ue5_data["hands"].append(gesture_data)
+                
+                # 在屏幕上显示检测到的手势
+                self.draw_gesture_info(img, gesture_data, i)
+            
+            # 绘制手部关键点
+            draw_landmarks(img, frame)
             
             # 发送数据到UE5
-            if ue5_data["hands"]:
-                self.send_to_ue5(ue5_data)
+            if self.events_only:
+                if events:
+                    self.send_to_ue5({"timestamp": ue5_data["timestamp"], "events": events})
+            elif ue5_data["hands"] or events:
+                packet = None
+                if self.encoder is not None and ue5_data["hands"]:
+                    packet = self.encoder.encode(
+                        frame.landmarks, frame.handedness, all_gestures, rotations,
+                        hand_center(frame.landmarks), frame.scores, ue5_data["timestamp"]
+                    )
+                self.send_to_ue5(ue5_data, packet)
             
             # 计算和显示FPS
             cTime = time.time()
@@ -225,10 +410,63 @@ class HandGestureToUE5:
         
         self.cleanup()
     
+    def run_multi(self, stats_interval=5.0):
+        """
+        多摄像头运行循环: 读取按时间戳对齐的各路结果并发送，按 Ctrl+C 退出。
+        :param stats_interval: 打印各路帧率和丢帧数的间隔 (秒)。
+        """
+        print("多摄像头手势追踪启动！按 Ctrl+C 退出")
+        self.manager.start()
+        last_stats = time.time()
+        try:
+            while self.manager.running:
+                aligned = self.manager.read(timeout=1.0)
+                if aligned is None:
+                    continue
+                reference, frames = aligned
+                ue5_data = {"timestamp": reference, "cameras": []}
+                for camera_id, (timestamp, frame) in sorted(frames.items()):
+                    all_gestures = self.classifier.classify(frame.landmarks)
+                    self.write_shared(frame, all_gestures, timestamp, camera_id)
+                    if self.encoder is None:
+                        kinematics = self.camera_kinematics[camera_id].update(frame, timestamp)
+                        hands = []
+                        for i, hand_landmarks in enumerate(frame.landmarks):
+                            gesture_data = self.calculate_gesture_data(hand_landmarks, all_gestures[i], kinematics[i])
+                            gesture_data["handedness"] = frame.handedness[i]
+                            gesture_data["hand_id"] = frame.ids[i] if frame.ids is not None else i
+                            hands.append(gesture_data)
+                        ue5_data["cameras"].append({"camera": camera_id, "timestamp": timestamp, "hands": hands})
+                    elif frame.num_hands:
+                        self.send_to_ue5(None, self.encoders[camera_id].encode(
+                            frame.landmarks, frame.handedness, all_gestures, hand_rotation(frame.landmarks),
+                            hand_center(frame.landmarks), frame.scores, timestamp
+                        ), camera_id)
+                if self.encoder is None and len(self.calibration or ()) > 1:
+                    # 按左右手标签对应各视图的手，三角测量得到参考摄像头坐标系下的三维关键点
+                    views = [frames[i][1] if i in frames else None for i in range(len(self.calibration))]
+                    ue5_data["hands_3d"] = [
+                        {"handedness": label, "landmarks_cm": points.tolist(), "distance_cm": hand_distance(points)}
+                        for label, points in self.calibration.triangulate_frames(views)
+                    ]
+                if self.encoder is None and any(camera["hands"] for camera in ue5_data["cameras"]):
+                    self.send_to_ue5(ue5_data)
+                
+                if time.time() - last_stats >= stats_interval:
+                    last_stats = time.time()
+                    for stats in self.manager.stats:
+                        print(stats)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for stats in self.manager.stats:
+                print(stats)
+            self.cleanup()
+    
     def draw_gesture_info(self, img, gesture_data, hand_index):
         """在图像上绘制手势信息"""
         y_offset = 70 + hand_index * 120
-        hand_label = f"{gesture_data['handedness']} Hand:"
+        hand_label = f"#{gesture_data['hand_id']} {gesture_data['handedness']} Hand:"
         
         cv2.putText(img, hand_label, (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
         
@@ -253,14 +491,47 @@ class HandGestureToUE5:
     
     def cleanup(self):
         """清理资源"""
-        self.cap.release()
-        cv2.destroyAllWindows()
-        self.sock.close()
+        if self.manager is not None:
+            self.manager.stop()
+        else:
+            self.cap.release()
+            cv2.destroyAllWindows()
+            self.tracker.close()
+        stats_list = self.server.stats   # 停止后 WebSocket 订阅者会被移除，先取出统计
+        self.server.stop()
+        for writer in self.shared_writers.values():
+            writer.close()
+        for stats in stats_list:
+            print(stats)
         print("程序已退出")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand Gesture Control for UE5")
+    parser.add_argument("--ip", default="127.0.0.1", help="UE5 接收端IP")
+    parser.add_argument("--port", type=int, default=12345, help="UE5 接收端端口")
+    parser.add_argument("--protocol", default="json", choices=["json", "binary", "binary16", "delta"],
+                        help="数据格式: JSON 或二进制协议 (binary16 为 int16 量化, delta 为关键帧+增量)")
+    parser.add_argument("--keyframe-interval", type=int, default=30, help="delta 模式的关键帧间隔 (包)")
+    parser.add_argument("--record", help="把追踪结果录制到文件")
+    parser.add_argument("--replay", help="回放录制文件代替摄像头")
+    parser.add_argument("--replay-fast", action="store_true", help="尽可能快地回放，不按录制时的节奏")
+    parser.add_argument("--roi", action="store_true", help="只对手部附近的区域做推理")
+    parser.add_argument("--inference-width", type=int, default=None, help="送入模型的最大图像宽度 (像素)")
+    parser.add_argument("--infer-every", type=int, default=1, help="每隔多少帧运行一次推理，其余帧外推关键点")
+    parser.add_argument("--infer-cpu", type=float, default=None, help="推理最多占用的时间比例 (0~1)，按耗时自适应跳帧")
+    parser.add_argument("--filter", default="none", choices=["none", "ema", "one_euro", "kalman"], help="关键点时域滤波器")
+    parser.add_argument("--cameras", nargs="+", metavar="SRC",
+                        help="多个输入源 (摄像头索引或视频文件)，每个输入源在独立进程中追踪")
+    parser.add_argument("--calibration", help="摄像头标定文件 (calibrate_cameras.py 生成)，以厘米发送三维坐标/距离")
+    parser.add_argument("--stream-host", default="127.0.0.1", help="接收订阅的监听地址 (0.0.0.0 允许其他机器订阅)")
+    parser.add_argument("--subscribe-port", type=int, default=None, help="接收 UDP 订阅消息的端口")
+    parser.add_argument("--ws-port", type=int, default=None, help="WebSocket 订阅端口")
+    parser.add_argument("--shm", metavar="NAME", help="同时把追踪结果写入该名称的共享内存环形缓冲区")
+    parser.add_argument("--events", action="store_true", help="只在手势变化时向 UE5 发送事件 (JSON)，不再逐帧发送")
+    parser.add_argument("--heartbeat", type=float, default=1.0, help="没有事件时的心跳间隔 (秒)，0 表示不发送心跳")
+    args = parser.parse_args()
     try:
-        hand_tracker = HandGestureToUE5()
+        hand_tracker = HandGestureToUE5.from_args(args)
         hand_tracker.run()
     except Exception as e:
         print(f"程序错误: {e}") 
\ No newline at end of file
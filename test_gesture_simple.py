@@ -1,20 +1,28 @@
 import cv2
-import mediapipe as mp
-import json
-import socket
 import time
+import numpy as np
+
+from hand_tracker.core import HandTracker, TIP_IDS, PIP_IDS, draw_landmarks
+from hand_tracker.events import GestureEventTracker
+from hand_tracker.streaming import StreamServer
+
+# 命令按优先级排列
+COMMANDS = ["stop", "jump", "move_forward"]
 
 # 简化版手势检测，便于测试
 def main():
-    # 网络设置
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # 网络设置: 只发送命令 (与 hand_tracking_ue5.py 共用数据流服务)，命令变化时才发送，不变时每秒一次心跳
     ue5_ip = "127.0.0.1"
     ue5_port = 12345
+    server = StreamServer()
+    server.add_udp_target((ue5_ip, ue5_port), "commands", on_change=True)
+    server.start()
+
+    # 逐帧的判断先经过迟滞 (持续 0.1 秒才成立、0.15 秒才结束)，单帧误判不会改变命令
+    debounce = GestureEventTracker(COMMANDS, hold_time=None, swipe_speed=None, heartbeat=None)
     
     # MediaPipe设置
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(min_detection_confidence=0.7)
-    mp_draw = mp.solutions.drawing_utils
+    tracker = HandTracker(min_detection_confidence=0.7)
     
     # 摄像头设置
     cap = cv2.VideoCapture(0)
@@ -28,48 +36,36 @@ def main():
             continue
             
         frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb_frame)
+        hand_frame = tracker.process_bgr(frame)
         
-        gesture_command = "idle"
+        raw = np.zeros((hand_frame.num_hands, len(COMMANDS)), bool)
+        
+        # 绘制手部关键点
+        draw_landmarks(frame, hand_frame)
+        
+        for i, landmarks in enumerate(hand_frame.landmarks):
+            # 简单手势识别
+            # 检测握拳（所有指尖都在对应关节下方）
+            fingers_down = int((landmarks[TIP_IDS, 1] > landmarks[PIP_IDS, 1]).sum())
+            
+            if fingers_down >= 4:
+                raw[i, COMMANDS.index("stop")] = True
+            elif fingers_down <= 1:
+                raw[i, COMMANDS.index("jump")] = True
+            elif landmarks[8][1] < landmarks[6][1] and fingers_down >= 3:  # 食指向上
+                raw[i, COMMANDS.index("move_forward")] = True
         
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # 绘制手部关键点
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                
-                # 简单手势识别
-                landmarks = []
-                for lm in hand_landmarks.landmark:
-                    landmarks.append([lm.x, lm.y])
-                
-                # 检测握拳（所有指尖都在对应关节下方）
-                fingers_down = 0
-                finger_tips = [4, 8, 12, 16, 20]
-                finger_joints = [3, 6, 10, 14, 18]
-                
-                for tip, joint in zip(finger_tips, finger_joints):
-                    if landmarks[tip][1] > landmarks[joint][1]:
-                        fingers_down += 1
-                
-                if fingers_down >= 4:
-                    gesture_command = "stop"
-                elif fingers_down <= 1:
-                    gesture_command = "jump"
-                elif landmarks[8][1] < landmarks[6][1] and fingers_down >= 3:  # 食指向上
-                    gesture_command = "move_forward"
+        debounce.update(hand_frame, raw, time.perf_counter())
+        active = {name for names in debounce.active_gestures().values() for name in names}
+        gesture_command = next((command for command in COMMANDS if command in active), "idle")
         
-        # 发送数据到UE5
+        # 发送数据到UE5 (数据流服务会跳过与上次相同的命令)
         data = {
             "command": gesture_command,
             "timestamp": time.time()
         }
         
-        try:
-            json_data = json.dumps(data)
-            sock.sendto(json_data.encode(), (ue5_ip, ue5_port))
-        except Exception as e:
-            print(f"发送失败: {e}")
+        server.publish(data)
         
         # 显示当前命令
         cv2.putText(frame, f"Command: {gesture_command}", (10, 30), 
@@ -81,7 +77,7 @@ def main():
     
     cap.release()
     cv2.destroyAllWindows()
-    sock.close()
+    server.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
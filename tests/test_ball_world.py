@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pytest.importorskip("cv2")
+pygame = pytest.importorskip("pygame")
+
+from hand_ball_game import BallWorld  # noqa: E402
+
+W, H = 640, 480
+
+
+def test_spawn_reuses_oldest_slot_when_full():
+    world = BallWorld(capacity=3)
+    slots = [world.spawn(100 * i, 100, velocity=(0, 0, 0)) for i in range(3)]
+    assert slots == [0, 1, 2] and len(world) == 3
+    assert world.spawn(500, 100, velocity=(0, 0, 0)) == 0
+    assert world.active.tolist() == [1, 2, 0]
+    world.remove([2])
+    assert world.active.tolist() == [1, 0] and not world.alive[2]
+    assert world.spawn(0, 0, velocity=(0, 0, 0)) == 2
+    world.clear()
+    assert len(world) == 0 and world.alive.sum() == 0
+
+
+def test_step_matches_scalar_integration():
+    world = BallWorld(capacity=4, gravity=1000.0, friction=0.5)
+    world.spawn(300, 200, 0, velocity=(60, -120, 30))
+    dt = 1 / 60
+    x, y, z = 300.0, 200.0, 0.0
+    vx, vy, vz = 60.0, -120.0, 30.0
+    for _ in range(10):
+        world.step(dt, W, H)
+        vy += 1000.0 * dt
+        vx, vy, vz = (v * 0.5 ** dt for v in (vx, vy, vz))
+        x, y, z = x + vx * dt, y + vy * dt, z + vz * dt
+    np.testing.assert_allclose(world.position[0], [x, y, z])
+    np.testing.assert_allclose(world.velocity[0], [vx, vy, vz])
+    np.testing.assert_allclose(world.interpolated(0.0)[0], world.previous_position[0])
+
+
+def test_step_bounces_off_edges():
+    world = BallWorld(capacity=4, radius=20, gravity=0.0, bounce=0.5, friction=1.0)
+    left = world.spawn(25, 200, velocity=(-600, 0, 0))
+    floor = world.spawn(300, 455, velocity=(100, 600, 0))
+    depth = world.spawn(300, 200, 790, velocity=(0, 0, 1200))
+    world.step(1 / 60, W, H, depth_far=800)
+    assert world.position[left, 0] == 20 and world.velocity[left, 0] == 300
+    assert world.position[floor, 1] == H - 20 and world.velocity[floor, 1] == -300
+    assert world.velocity[floor, 0] == pytest.approx(90)
+    assert world.position[depth, 2] == 800 and world.velocity[depth, 2] == -600
+
+
+def test_trail_ring_buffer_and_out_of_bounds():
+    world = BallWorld(capacity=2, gravity=0.0, friction=1.0, trail_length=4)
+    slot = world.spawn(100, 100, velocity=(60, 0, 0))
+    for _ in range(6):
+        world.step(1 / 60, W, H)
+    assert world.trail_count[slot] == 4
+    columns = (world.trail_head - 4 + np.arange(4)) % 4
+    np.testing.assert_allclose(world.trail[slot, columns, 0], [102, 103, 104, 105])
+
+    world.position[slot] = (W + 300, 100, 0)
+    assert world.out_of_bounds(W, H).tolist() == [slot]
+
+
+def test_project_and_draw():
+    world = BallWorld(capacity=2, focal_length=500)
+    screen, scale = world.project(np.array([[W / 2 + 100, H / 2, 500], [0, 0, -600]]), W, H)
+    assert screen[0].tolist() == [W // 2 + 50, H // 2] and scale[0] == 0.5
+    assert scale[1] < 0
+    world.spawn(W / 2, H / 2, velocity=(0, 0, 0))
+    world.step(1 / 60, W, H)
+    surface = pygame.Surface((W, H))
+    world.draw(surface)
+    assert surface.get_at((W // 2, H // 2))[:3] != (0, 0, 0)
@@ -0,0 +1,62 @@
+import numpy as np
+
+from hand_tracker.collision import SegmentCollider, first_within
+from hand_tracker.core import HAND_CONNECTIONS
+
+
+def point_segment_distance(p, a, b):
+    """点到线段的距离 (逐个计算的参照实现)。"""
+    ab = b - a
+    length_sq = ab @ ab
+    t = 0.0 if length_sq == 0 else min(max((p - a) @ ab / length_sq, 0.0), 1.0)
+    return np.linalg.norm(p - (a + t * ab))
+
+
+def random_hand(rng):
+    return rng.uniform(200, 400, (21, 3))
+
+
+def test_closest_points_match_reference():
+    rng = np.random.default_rng(0)
+    landmarks = random_hand(rng)
+    landmarks[1] = landmarks[0]                   # 长度为零的骨骼
+    positions = rng.uniform(100, 500, (200, 3))
+    collider = SegmentCollider()
+    dist, bone, closest = collider.closest_points(positions, landmarks)
+    for i, p in enumerate(positions):
+        distances = [point_segment_distance(p, landmarks[s], landmarks[e]) for s, e in HAND_CONNECTIONS]
+        assert np.isclose(dist[i], min(distances))
+        assert np.isclose(distances[bone[i]], dist[i])
+        assert np.isclose(np.linalg.norm(p - closest[i]), dist[i])
+
+
+def test_query_matches_brute_force():
+    rng = np.random.default_rng(1)
+    collider = SegmentCollider()
+    for _ in range(20):
+        landmarks = random_hand(rng)
+        positions = rng.uniform(0, 600, (100, 3))
+        reach = rng.uniform(10, 60, 100)
+        index, dist, bone, closest = collider.query(positions, landmarks, reach)
+        expected = [i for i, p in enumerate(positions)
+                    if min(point_segment_distance(p, landmarks[s], landmarks[e])
+                           for s, e in HAND_CONNECTIONS) < reach[i]]
+        assert index.tolist() == expected
+        assert collider.candidates >= len(index)
+        assert len(dist) == len(bone) == len(closest) == len(index)
+
+
+def test_query_broad_phase_rejects_far_balls():
+    collider = SegmentCollider()
+    landmarks = np.random.default_rng(2).uniform(0, 1, (21, 3))
+    index, dist, bone, closest = collider.query(np.full((5, 3), 100.0), landmarks, 1.0)
+    assert collider.candidates == 0
+    assert index.shape == (0,) and closest.shape == (0, 3)
+
+
+def test_first_within():
+    positions = np.array([[0, 0, 0], [5, 0, 0], [1, 0, 0]], float)
+    assert first_within(positions, (1.2, 0, 0), 2) == 0
+    assert first_within(positions, (4, 0, 0), 2) == 1
+    assert first_within(positions, (10, 0, 0), 2) is None
+    assert first_within(np.zeros((0, 3)), (0, 0, 0), 2) is None
@@ -0,0 +1,77 @@
+import numpy as np
+
+from hand_tracker.gestures import GESTURE_RULES
+from hand_tracker.protocol import DELTA_STEP, QUANT_SCALE, DeltaDecoder, DeltaEncoder, PacketEncoder
+
+G = len(GESTURE_RULES)
+
+
+def stream(frames, num_hands=2, seed=0):
+    """平滑运动的手，每帧产生 encode 的参数。"""
+    rng = np.random.default_rng(seed)
+    landmarks = rng.random((num_hands, 21, 3)).astype(np.float32) * 0.5 + 0.25
+    gestures = np.zeros((num_hands, G), bool)
+    for i in range(frames):
+        landmarks = landmarks + rng.normal(0, 0.002, landmarks.shape).astype(np.float32)
+        if i % 7 == 3:
+            gestures = gestures.copy()
+            gestures[i % num_hands, i % G] ^= True
+        yield (landmarks, ["Left", "Right"][:num_hands], gestures,
+               np.zeros(num_hands), landmarks.mean(axis=1)), i
+
+
+def test_delta_round_trip():
+    encoder = DeltaEncoder(keyframe_interval=30)
+    decoder = DeltaDecoder()
+    sizes = []
+    for args, i in stream(100):
+        packet = encoder.encode(*args, timestamp=float(i))
+        sizes.append(len(packet))
+        data = decoder.decode(packet)
+        assert data is not None and data["seq"] == i
+        assert data["keyframe"] == (i % 30 == 0)
+        # 编码端按接收端的重建结果更新参考帧，误差不随帧数累积
+        np.testing.assert_allclose(data["landmarks"], args[0], rtol=0, atol=(DELTA_STEP / 2 + 1) / QUANT_SCALE)
+        for g, name in enumerate(GESTURE_RULES):
+            np.testing.assert_array_equal(data["gestures"][name], args[2][:, g])
+    assert encoder.keyframes == 4
+    assert max(sizes[1:30]) < sizes[0] / 2
+
+
+def test_lost_packet_drops_until_keyframe():
+    encoder = DeltaEncoder(keyframe_interval=10)
+    decoder = DeltaDecoder()
+    results = []
+    for args, i in stream(25):
+        packet = encoder.encode(*args)
+        if i == 4:
+            continue
+        results.append((i, decoder.decode(packet)))
+    for i, data in results:
+        assert (data is None) == (4 < i < 10)
+    assert decoder.dropped == 5
+
+
+def test_keyframe_on_handedness_change_and_large_motion():
+    encoder = DeltaEncoder(keyframe_interval=100)
+    landmarks = np.full((1, 21, 3), 0.5, np.float32)
+    args = (np.zeros((1, G), bool), np.zeros(1), np.zeros((1, 3)))
+    encoder.encode(landmarks, ["Left"], *args)
+    encoder.encode(landmarks, ["Left"], *args)
+    assert encoder.keyframes == 1
+    encoder.encode(landmarks, ["Right"], *args)
+    assert encoder.keyframes == 2
+    encoder.encode(landmarks + 0.2, ["Right"], *args)
+    assert encoder.keyframes == 3
+    encoder.force_keyframe()
+    encoder.encode(landmarks, ["Right"], *args)
+    assert encoder.keyframes == 4
+
+
+def test_decoder_accepts_plain_packets():
+    encoder = PacketEncoder()
+    decoder = DeltaDecoder()
+    (args, _), = stream(1)
+    data = decoder.decode(encoder.encode(*args))
+    assert data["keyframe"] and not data["quantized"]
+    np.testing.assert_array_equal(data["landmarks"], args[0])
@@ -0,0 +1,110 @@
+import numpy as np
+
+from hand_tracker.core import HandFrame
+from hand_tracker.events import GestureEventTracker
+
+NAMES = ["fist", "open_hand"]
+DT = 0.125
+
+
+def make_tracker(**kwargs):
+    options = dict(min_on=0.25, min_off=0.5, hold_time=None, swipe_speed=None, heartbeat=None)
+    options.update(kwargs)
+    return GestureEventTracker(NAMES, **options)
+
+
+def frame(num_hands=1, ids=(0, 1), handedness=("Right", "Left"), palm=(0.5, 0.5)):
+    landmarks = np.zeros((num_hands, 21, 3), np.float32)
+    landmarks[:, :, :2] = palm
+    return HandFrame(landmarks, list(handedness[:num_hands]), np.ones(num_hands), (640, 480),
+                     list(ids[:num_hands]) if ids is not None else None)
+
+
+def run(tracker, raw, **kwargs):
+    """逐帧输入第一个手势的原始判断，返回 (帧号, 事件类型) 列表。"""
+    out = []
+    for i, value in enumerate(raw):
+        gestures = np.array([[value, False]])
+        for event in tracker.update(frame(**kwargs), gestures, i * DT):
+            out.append((i, event["type"]))
+    return out
+
+
+def test_hysteresis():
+    tracker = make_tracker()
+    # 单帧的误判和单帧的漏判都不产生事件
+    raw = [0, 1, 0, 0, 1, 1, 1, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0]
+    assert run(tracker, raw) == [(6, "gesture_start"), (15, "gesture_end")]
+    assert tracker.active_gestures() == {0: []}
+
+
+def test_end_event_duration():
+    tracker = make_tracker(min_on=0, min_off=0)
+    events = []
+    for i, value in enumerate([1, 1, 1, 0]):
+        events += tracker.update(frame(), np.array([[value, value]]), i * DT)
+    assert [(e["type"], e["gesture"]) for e in events] == [
+        ("gesture_start", "fist"), ("gesture_start", "open_hand"),
+        ("gesture_end", "fist"), ("gesture_end", "open_hand")]
+    assert events[-1]["duration"] == 3 * DT and events[-1]["hand_id"] == 0
+    assert events[-1]["handedness"] == "Right"
+
+
+def test_hold_fires_once():
+    tracker = make_tracker(min_on=0, hold_time=0.5)
+    assert run(tracker, [1] * 10) == [(0, "gesture_start"), (4, "hold")]
+
+
+def test_short_dropout_keeps_gesture():
+    tracker = make_tracker(min_on=0)
+    tracker.update(frame(), np.array([[True, False]]), 0.0)
+    empty = HandFrame(np.zeros((0, 21, 3)), [], np.zeros(0), (640, 480), [])
+    for i in range(1, 4):
+        assert tracker.update(empty, np.zeros((0, 2), bool), i * DT) == []
+    assert tracker.active_gestures() == {0: ["fist"]}
+    assert tracker.update(frame(), np.array([[True, False]]), 4 * DT) == []
+
+    # 长时间没有出现: 持续 min_off 后结束，之后不再保留状态
+    events = [tracker.update(empty, np.zeros((0, 2), bool), (5 + i) * DT) for i in range(6)]
+    assert [len(e) for e in events] == [0, 0, 0, 0, 1, 0]
+    assert events[4][0]["type"] == "gesture_end"
+    assert tracker.hands == {}
+
+
+def test_left_hand_ends_immediately():
+    tracker = make_tracker(min_on=0)
+    tracker.update(frame(2), np.array([[True, False], [False, True]]), 0.0)
+    events = tracker.update(frame(1), np.array([[True, False]]), DT, left=[1])
+    assert [(e["type"], e["hand_id"], e["gesture"]) for e in events] == [("gesture_end", 1, "open_hand")]
+    assert list(tracker.hands) == [0]
+
+
+def test_label_keys_without_ids():
+    tracker = make_tracker(min_on=0)
+    events = tracker.update(frame(2, ids=None, handedness=("Left", "Left")),
+                            np.array([[True, False], [False, True]]), 0.0)
+    assert [e["hand_id"] for e in events] == ["Left", "Left_2"]
+
+
+def test_heartbeat_reports_active_gestures():
+    tracker = make_tracker(min_on=0, heartbeat=0.5)
+    out = run(tracker, [1] * 10)
+    assert out == [(0, "gesture_start"), (4, "heartbeat"), (8, "heartbeat")]
+    heartbeat = tracker.update(frame(), np.array([[True, False]]), 12 * DT)[0]
+    assert heartbeat["hands"] == [{"hand_id": 0, "handedness": "Right", "gestures": ["fist"]}]
+
+
+def test_swipe_direction_and_rearm():
+    tracker = make_tracker(swipe_speed=1.0, swipe_release=0.5)
+    positions = [0.1, 0.3, 0.5, 0.55, 0.56, 0.3]
+    events = []
+    for i, x in enumerate(positions):
+        events += [(i, e["direction"]) for e in
+                   tracker.update(frame(palm=(x, 0.5)), np.zeros((1, 2), bool), i * DT)]
+    assert events == [(1, "right"), (5, "left")]
+    velocity = np.array([[0.0, -2.0, 0.0]])
+    swipe = tracker.update(frame(), np.zeros((1, 2), bool), 10.0, palm_velocity=velocity)
+    assert swipe == []      # 上一次 swipe 后速度还没降到释放阈值以下
+    tracker.update(frame(), np.zeros((1, 2), bool), 10.1, palm_velocity=velocity * 0)
+    swipe = tracker.update(frame(), np.zeros((1, 2), bool), 10.2, palm_velocity=velocity)
+    assert swipe[0]["direction"] == "up" and swipe[0]["speed"] == 2.0
@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+import pytest
+
+from hand_tracker.core import HandFrame
+from hand_tracker.filters import ExponentialFilter, FilteredTracker, KalmanFilter, OneEuroFilter, make_filter
+
+DT = 1 / 30
+
+
+def signal(frames, seed=0):
+    """一只手的含噪运动轨迹: (frames, 1, 21, 3)。"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames)[:, None, None, None] * DT
+    base = rng.random((1, 1, 21, 3))
+    return (base + 0.1 * np.sin(2 * np.pi * t) + rng.normal(0, 0.01, (frames, 1, 21, 3))).astype(np.float32)
+
+
+def run(landmark_filter, xs):
+    return np.array([landmark_filter(x, ["Left"], i * DT).copy() for i, x in enumerate(xs)])
+
+
+def one_euro_reference(xs, min_cutoff, beta, d_cutoff):
+    """逐个标量的 One-Euro 参照实现。"""
+    def alpha(cutoff):
+        tau = 1 / (2 * math.pi * cutoff)
+        return 1 / (1 + tau / DT)
+
+    out = np.empty_like(xs, np.float64)
+    for idx in np.ndindex(xs.shape[1:]):
+        x_hat, dx_hat = float(xs[(0,) + idx]), 0.0
+        out[(0,) + idx] = x_hat
+        for i in range(1, len(xs)):
+            x = float(xs[(i,) + idx])
+            dx_hat += alpha(d_cutoff) * ((x - x_hat) / DT - dx_hat)
+            x_hat += alpha(min_cutoff + beta * abs(dx_hat)) * (x - x_hat)
+            out[(i,) + idx] = x_hat
+    return out
+
+
+def kalman_reference(xs, q, r):
+    """用 2x2 矩阵逐个标量计算的匀速卡尔曼滤波参照实现。"""
+    F = np.array([[1, DT], [0, 1]])
+    Q = q * np.array([[DT ** 3 / 3, DT ** 2 / 2], [DT ** 2 / 2, DT]])
+    H = np.array([[1.0, 0.0]])
+    out = np.empty_like(xs, np.float64)
+    for idx in np.ndindex(xs.shape[1:]):
+        state = np.array([float(xs[(0,) + idx]), 0.0])
+        P = np.diag([r, q])
+        out[(0,) + idx] = state[0]
+        for i in range(1, len(xs)):
+            state = F @ state
+            P = F @ P @ F.T + Q
+            K = P @ H.T / (H @ P @ H.T + r)
+            state = state + (K * (xs[(i,) + idx] - state[0])).ravel()
+            P = (np.eye(2) - K @ H) @ P
+            out[(i,) + idx] = state[0]
+    return out
+
+
+def test_exponential_matches_formula():
+    xs = signal(20)
+    out = run(ExponentialFilter(alpha=0.3), xs)
+    expected = xs[0].astype(np.float64)
+    for i in range(1, len(xs)):
+        expected = 0.3 * xs[i] + 0.7 * expected
+        np.testing.assert_allclose(out[i], expected, atol=1e-6)
+
+
+def test_one_euro_matches_reference():
+    xs = signal(30)[:, :, :3]
+    out = run(OneEuroFilter(min_cutoff=1.0, beta=10.0, d_cutoff=1.0), xs)
+    np.testing.assert_allclose(out, one_euro_reference(xs, 1.0, 10.0, 1.0), atol=1e-5)
+
+
+def test_kalman_matches_reference():
+    xs = signal(30)[:, :, :3]
+    out = run(KalmanFilter(process_noise=0.1, measurement_noise=1e-4), xs)
+    np.testing.assert_allclose(out, kalman_reference(xs, 0.1, 1e-4), atol=1e-5)
+
+
+@pytest.mark.parametrize("name", ["ema", "one_euro", "kalman"])
+def test_filters_reduce_noise(name):
+    rng = np.random.default_rng(1)
+    truth = np.full((60, 1, 21, 3), 0.5, np.float32)
+    noisy = truth + rng.normal(0, 0.01, truth.shape).astype(np.float32)
+    out = run(make_filter(name), noisy)
+    assert np.abs(out[20:] - truth[20:]).mean() < 0.8 * np.abs(noisy[20:] - truth[20:]).mean()
+
+
+def test_state_follows_hand_keys():
+    landmark_filter = ExponentialFilter(alpha=0.5)
+    a = np.zeros((1, 21, 3), np.float32)
+    b = np.ones((1, 21, 3), np.float32)
+    landmark_filter(np.concatenate([a, b]), [1, 2], 0.0)
+    # 两只手顺序交换: 状态跟着编号走
+    out = landmark_filter(np.concatenate([b, a]) + 0.2, [2, 1], DT)
+    np.testing.assert_allclose(out[0], 1.1)
+    np.testing.assert_allclose(out[1], 0.1)
+    # 新出现的手直接采用测量值，消失的手的状态被丢弃
+    out = landmark_filter(np.concatenate([a, b]) + 0.4, [3, 1], 2 * DT)
+    np.testing.assert_allclose(out[0], 0.4)
+    np.testing.assert_allclose(out[1], 0.75)
+    assert landmark_filter(np.zeros((0, 21, 3)), [], 3 * DT).shape == (0, 21, 3)
+
+
+def test_make_filter():
+    assert make_filter(None) is None and make_filter("none") is None
+    assert isinstance(make_filter("kalman", process_noise=1.0), KalmanFilter)
+    with pytest.raises(ValueError):
+        make_filter("median")
+
+
+class StubTracker:
+    results = None
+    identities = None
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def process(self, img_rgb, index=0):
+        return self.frames[index]
+
+
+def test_filtered_tracker_forwards_arguments():
+    xs = signal(3)
+    frames = [HandFrame(x, ["Right"], np.ones(1), (640, 480), ids=[7]) for x in xs]
+    tracker = FilteredTracker(StubTracker(frames), ExponentialFilter(alpha=0.5))
+    tracker.process(None, timestamp=0.0, index=0)
+    frame = tracker.process(None, timestamp=DT, index=2)
+    assert frame.ids == [7] and frame.handedness == ["Right"]
+    np.testing.assert_allclose(frame.landmarks, (xs[0] + xs[2]) / 2, atol=1e-6)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from hand_tracker.gestures import GESTURE_RULES, GestureClassifier, hand_center, hand_rotation
+
+
+# 表驱动分类器之前 HandGestureToUE5 中逐个判断的 is_* 方法，作为参照实现
+def is_thumb_up(landmarks):
+    thumb_up = landmarks[4][1] < landmarks[3][1] < landmarks[2][1]
+    fingers_down = sum(landmarks[tip][1] > landmarks[pip][1] for tip, pip in zip([8, 12, 16, 20], [6, 10, 14, 18]))
+    return thumb_up and fingers_down >= 3
+
+
+def is_fist(landmarks):
+    return sum(landmarks[tip][1] > landmarks[pip][1]
+               for tip, pip in zip([4, 8, 12, 16, 20], [3, 6, 10, 14, 18])) >= 4
+
+
+def is_open_hand(landmarks):
+    return sum(landmarks[tip][1] < landmarks[pip][1]
+               for tip, pip in zip([4, 8, 12, 16, 20], [3, 6, 10, 14, 18])) >= 4
+
+
+def is_pointing(landmarks):
+    index_up = landmarks[8][1] < landmarks[6][1]
+    others_down = sum(landmarks[tip][1] > landmarks[pip][1] for tip, pip in zip([4, 12, 16, 20], [3, 10, 14, 18]))
+    return index_up and others_down >= 3
+
+
+def is_peace_sign(landmarks):
+    index_up = landmarks[8][1] < landmarks[6][1]
+    middle_up = landmarks[12][1] < landmarks[10][1]
+    others_down = sum(landmarks[tip][1] > landmarks[pip][1] for tip, pip in zip([4, 16, 20], [3, 14, 18]))
+    return index_up and middle_up and others_down >= 2
+
+
+REFERENCE = {
+    "thumb_up": is_thumb_up,
+    "fist": is_fist,
+    "open_hand": is_open_hand,
+    "pointing": is_pointing,
+    "peace": is_peace_sign,
+}
+
+
+@pytest.fixture
+def hands():
+    # y 只取少数几个值，使关节之间经常相等 (边界情况) 且每种手势都会出现
+    rng = np.random.default_rng(0)
+    landmarks = rng.random((4000, 21, 3)).astype(np.float32)
+    landmarks[..., 1] = rng.integers(0, 4, (4000, 21)) / 4
+    return landmarks
+
+
+def test_rules_match_reference(hands):
+    classifier = GestureClassifier()
+    result = classifier.classify(hands)
+    assert result.shape == (len(hands), len(GESTURE_RULES))
+    for i, name in enumerate(classifier.names):
+        expected = np.array([REFERENCE[name](hand.tolist()) for hand in hands])
+        assert expected.any() and not expected.all(), name
+        np.testing.assert_array_equal(result[:, i], expected, err_msg=name)
+
+
+def test_batch_shapes_agree(hands):
+    classifier = GestureClassifier()
+    frames = hands[:60].reshape(30, 2, 21, 3)
+    np.testing.assert_array_equal(classifier.classify(frames).reshape(60, -1), classifier.classify(hands[:60]))
+    assert classifier.classify(hands[0]).shape == (len(GESTURE_RULES),)
+    assert classifier.classify_dict(hands[0]) == {name: REFERENCE[name](hands[0].tolist()) for name in GESTURE_RULES}
+    assert classifier.classify(np.zeros((0, 21, 3))).shape == (0, len(GESTURE_RULES))
+
+
+def test_add_rule(hands):
+    classifier = GestureClassifier()
+    classifier.add_rule("index_only", [(["index_up"], 1), (["middle_down", "ring_down", "pinky_down"], 3)])
+    assert classifier.names[-1] == "index_only"
+    expected = ((hands[:, 8, 1] < hands[:, 6, 1]) & (hands[:, 12, 1] > hands[:, 10, 1])
+                & (hands[:, 16, 1] > hands[:, 14, 1]) & (hands[:, 20, 1] > hands[:, 18, 1]))
+    np.testing.assert_array_equal(classifier.classify(hands)[:, -1], expected)
+    with pytest.raises(ValueError):
+        classifier.add_rule("bad", [(["elbow_up"], 1)])
+
+
+def test_rotation_and_center():
+    landmarks = np.zeros((2, 21, 3), np.float32)
+    landmarks[0, 9, :2] = (1, 0)
+    landmarks[1, 9, :2] = (0, 1)
+    np.testing.assert_allclose(hand_rotation(landmarks), [0, 90])
+    landmarks[:, :, 2] = np.arange(21)
+    np.testing.assert_allclose(hand_center(landmarks)[:, 2], [10, 10])
@@ -0,0 +1,71 @@
+import numpy as np
+
+from hand_tracker.identity import PALM_IDS, HandIdentityTracker
+
+DT = 1 / 30
+
+
+def hands_at(*centers):
+    """手掌中心位于给定位置的 (hands, 21, 3) 关键点。"""
+    landmarks = np.zeros((len(centers), 21, 3), np.float32)
+    for i, (x, y) in enumerate(centers):
+        landmarks[i, :, :2] = (x, y)
+    return landmarks
+
+
+def test_ids_follow_hands_when_order_swaps():
+    tracker = HandIdentityTracker()
+    ids = tracker.update(hands_at((0.2, 0.5), (0.8, 0.5)), ["Left", "Right"], 0.0)
+    assert ids == [0, 1]
+    assert tracker.update(hands_at((0.81, 0.5), (0.21, 0.5)), ["Right", "Left"], DT) == [1, 0]
+    assert tracker.pop_events() == [("enter", 0, "Left"), ("enter", 1, "Right")]
+    assert tracker.pop_events() == []
+
+
+def test_constant_velocity_prediction():
+    tracker = HandIdentityTracker(max_distance=0.05)
+    # 两只手快速交叉: 只按距离匹配会在交叉时换编号，外推预测位置后不会
+    for i in range(10):
+        a, b = 0.3 + 0.04 * i, 0.7 - 0.04 * i
+        ids = tracker.update(hands_at((a, 0.5), (b, 0.5)), ["Left", "Left"], i * DT)
+        assert ids == [0, 1]
+
+
+def test_handedness_breaks_ties():
+    tracker = HandIdentityTracker(handedness_penalty=0.1)
+    assert tracker.update(hands_at((0.5, 0.5), (0.52, 0.5)), ["Left", "Right"], 0.0) == [0, 1]
+    # 两只手位置几乎相同时按左右手标签配对
+    assert tracker.update(hands_at((0.51, 0.5), (0.51, 0.5)), ["Right", "Left"], DT) == [1, 0]
+
+
+def test_short_dropout_keeps_id_and_long_absence_leaves():
+    tracker = HandIdentityTracker(max_missing=3)
+    tracker.update(hands_at((0.5, 0.5)), ["Right"], 0.0)
+    tracker.pop_events()
+    empty = np.zeros((0, 21, 3))
+    for i in range(3):
+        assert tracker.update(empty, [], (i + 1) * DT) == []
+    assert tracker.pop_events() == []
+    assert tracker.update(hands_at((0.5, 0.5)), ["Right"], 4 * DT) == [0]
+
+    for i in range(4):
+        tracker.update(empty, [], (i + 5) * DT)
+    assert tracker.pop_events() == [("leave", 0, "Right")]
+    assert tracker.update(hands_at((0.5, 0.5)), ["Right"], 10 * DT) == [1]
+    assert tracker.pop_events() == [("enter", 1, "Right")]
+
+
+def test_far_hand_gets_new_id():
+    tracker = HandIdentityTracker(max_distance=0.2)
+    tracker.update(hands_at((0.1, 0.1)), ["Left"], 0.0)
+    assert tracker.update(hands_at((0.9, 0.9)), ["Left"], DT) == [1]
+    assert len(tracker.tracks) == 2
+
+
+def test_palm_center_uses_palm_landmarks():
+    landmarks = hands_at((0.5, 0.5))
+    landmarks[0, 8, :2] = (0.9, 0.1)        # 食指尖的位置不影响匹配
+    tracker = HandIdentityTracker()
+    tracker.update(hands_at((0.5, 0.5)), ["Left"], 0.0)
+    assert tracker.update(landmarks, ["Left"], DT) == [0]
+    np.testing.assert_allclose(tracker.tracks[0].center, landmarks[0, PALM_IDS, :2].mean(axis=0))
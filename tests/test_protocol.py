@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from hand_tracker.gestures import GESTURE_RULES
+from hand_tracker.protocol import (
+    MAX_GESTURES, QUANT_SCALE, SEQ_MASK, DeltaDecoder, DeltaEncoder, PacketEncoder, decode, is_binary_packet,
+    pack_gestures, seq_gap, unpack_gestures,
+)
+
+
+def make_hands(num_hands, seed=0):
+    rng = np.random.default_rng(seed)
+    landmarks = rng.random((num_hands, 21, 3)).astype(np.float32)
+    landmarks[..., 2] -= 0.5
+    gestures = rng.random((num_hands, len(GESTURE_RULES))) < 0.5
+    handedness = ["Left", "Right"][:num_hands]
+    rotation = rng.uniform(-180, 180, num_hands).astype(np.float32)
+    center = landmarks.mean(axis=1)
+    scores = rng.random(num_hands).astype(np.float32)
+    return landmarks, handedness, gestures, rotation, center, scores
+
+
+def test_pack_gestures_round_trip():
+    gestures = np.random.default_rng(1).random((50, 16)) < 0.5
+    bits = pack_gestures(gestures)
+    assert bits.dtype == np.uint16
+    np.testing.assert_array_equal(unpack_gestures(bits, 16), gestures)
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_encode_decode_round_trip(quantize):
+    landmarks, handedness, gestures, rotation, center, scores = make_hands(2)
+    encoder = PacketEncoder(quantize=quantize)
+    packet = encoder.encode(landmarks, handedness, gestures, rotation, center, scores, timestamp=12.5)
+    assert is_binary_packet(packet)
+
+    data = decode(packet)
+    assert data["seq"] == 0 and encoder.seq == 1
+    assert data["timestamp"] == 12.5
+    assert data["quantized"] is quantize
+    assert data["handedness"] == handedness
+    tolerance = 0.5 / QUANT_SCALE if quantize else 0
+    np.testing.assert_allclose(data["landmarks"], landmarks, rtol=0, atol=tolerance)
+    np.testing.assert_allclose(data["scores"], scores, rtol=1e-3)
+    np.testing.assert_allclose(data["rotation"], rotation, rtol=1e-3)
+    np.testing.assert_allclose(data["center"], center, rtol=1e-3, atol=1e-3)
+    for i, name in enumerate(GESTURE_RULES):
+        np.testing.assert_array_equal(data["gestures"][name], gestures[:, i])
+
+
+def test_empty_frame_and_errors():
+    encoder = PacketEncoder()
+    packet = encoder.encode(np.zeros((0, 21, 3)), [], np.zeros((0, len(GESTURE_RULES)), bool),
+                            np.zeros(0), np.zeros((0, 3)))
+    data = decode(packet)
+    assert data["landmarks"].shape == (0, 21, 3) and data["handedness"] == []
+    assert not is_binary_packet(b'{"hands": []}')
+    with pytest.raises(ValueError):
+        decode(packet[:5])
+    with pytest.raises(ValueError):
+        decode(b'{"hands": []}' * 2)
+    with pytest.raises(ValueError):
+        decode(encoder.encode(*make_hands(1)) + b"\0")
+
+
+def test_seq_wraps_at_u32():
+    encoder = PacketEncoder()
+    encoder.seq = SEQ_MASK
+    assert decode(encoder.encode(*make_hands(1)))["seq"] == SEQ_MASK
+    assert decode(encoder.encode(*make_hands(1)))["seq"] == 0
+
+
+def test_seq_gap():
+    assert seq_gap(1, 0) == 0
+    assert seq_gap(5, 1) == 3
+    assert seq_gap(0, SEQ_MASK) == 0
+    assert seq_gap(2, SEQ_MASK - 1) == 3
+    assert seq_gap(3, 3) is None                # 重复
+    assert seq_gap(2, 3) is None                # 乱序
+    assert seq_gap(SEQ_MASK, 0) is None         # 回绕前的旧包
+
+
+def test_gesture_bitfield_limit():
+    gestures = np.zeros((1, MAX_GESTURES + 1), bool)
+    gestures[0, MAX_GESTURES] = True
+    # 超出位域的手势不能被静默丢弃
+    with pytest.raises(ValueError):
+        pack_gestures(gestures)
+    with pytest.raises(ValueError):
+        unpack_gestures(np.zeros(1, np.uint16), MAX_GESTURES + 1)
+    with pytest.raises(ValueError):
+        DeltaDecoder([f"g{i}" for i in range(MAX_GESTURES + 1)])
+    landmarks, handedness, _, rotation, center, scores = make_hands(1)
+    with pytest.raises(ValueError):
+        PacketEncoder().encode(landmarks, handedness, gestures, rotation, center)
+    with pytest.raises(ValueError):
+        DeltaEncoder().encode(landmarks, handedness, gestures, rotation, center)
+
+    gestures = np.ones((1, MAX_GESTURES), bool)
+    names = [f"g{i}" for i in range(MAX_GESTURES)]
+    data = decode(PacketEncoder().encode(landmarks, handedness, gestures, rotation, center), names)
+    assert all(data["gestures"][name][0] for name in names)
@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from hand_tracker.core import HandFrame
+from hand_tracker.sharedmem import SharedLandmarkReader, SharedLandmarkWriter
+
+NAMES = ["thumb_up", "fist", "open_hand"]
+
+
+@pytest.fixture
+def writer(request):
+    name = f"hand_tracker_test_{os.getpid()}_{request.node.name}"[:30]
+    with SharedLandmarkWriter(name, max_hands=2, capacity=4, gesture_names=NAMES) as writer:
+        yield writer
+
+
+def frame(value, num_hands=2, ids=(3, 5)):
+    landmarks = np.full((num_hands, 21, 3), value, np.float32)
+    return HandFrame(landmarks, ["Left", "Right"][:num_hands], np.full(num_hands, 0.9, np.float32),
+                     (640, 480), list(ids[:num_hands]) if ids is not None else None)
+
+
+def test_round_trip(writer):
+    with SharedLandmarkReader(writer.name) as reader:
+        assert reader.gesture_names == NAMES and reader.image_size == (640, 480)
+        assert reader.read_latest() is None
+        gestures = np.array([[True, False, True], [False, True, False]])
+        seq = writer.write(frame(0.25), gestures, timestamp=7.0)
+        timestamp, result, bits = reader.read_latest()
+        assert seq == 1 and timestamp == 7.0
+        np.testing.assert_array_equal(result.landmarks, frame(0.25).landmarks)
+        assert result.handedness == ["Left", "Right"] and result.ids == [3, 5]
+        np.testing.assert_array_equal(bits, gestures)
+
+        writer.write(frame(0.5, num_hands=1, ids=None))
+        _, result, bits = reader.read_next(timeout=0)
+        assert result.num_hands == 1 and result.ids is None and bits.shape == (1, 3)
+        assert reader.read_next(timeout=0) is None
+
+
+def test_read_next_drops_when_lapped(writer):
+    with SharedLandmarkReader(writer.name) as reader:
+        for i in range(10):
+            writer.write(frame(i))
+        seqs = []
+        while (item := reader.read_next(timeout=0)) is not None:
+            seqs.append(int(item[1].landmarks[0, 0, 0]) + 1)
+        # 最旧的槽位可能正在被覆盖，只读最近 capacity - 1 帧
+        assert seqs == [8, 9, 10]
+        assert reader.dropped == 7
+
+
+def test_views_are_invalidated_by_overwrite(writer):
+    with SharedLandmarkReader(writer.name) as reader:
+        writer.write(frame(1.0))
+        _, view, _ = reader.read(1, copy=False)
+        assert reader.valid(1) and view.landmarks[0, 0, 0] == 1.0
+        for i in range(4):
+            writer.write(frame(2.0))
+        assert not reader.valid(1) and reader.read(1) is None
+        del view
+
+
+def test_torn_write_is_rejected(writer):
+    with SharedLandmarkReader(writer.name) as reader:
+        writer.write(frame(1.0))
+        # 写入端刚开始覆盖该槽位 (seq_begin 已更新，seq_end 还是旧值)
+        writer.slots["seq_begin"][1] = 5
+        assert reader.read(1) is None and not reader.valid(1)
+
+
+def test_close_and_reader_exit(writer):
+    code = ("import sys; from hand_tracker.sharedmem import SharedLandmarkReader;"
+            f"r = SharedLandmarkReader({writer.name!r}); print(r.read_latest()[1].landmarks[0, 0, 0]); r.close()")
+    writer.write(frame(0.5))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root] + sys.path))
+    for _ in range(2):
+        # 读取进程退出时不能删除共享内存
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        assert output.stdout.strip() == "0.5" and "leaked" not in output.stderr
+
+    reader = SharedLandmarkReader(writer.name)
+    assert not reader.closed
+    writer.close()
+    assert reader.closed and reader.read_next() is None
+    reader.close()
+
+
+def test_writer_rejects_gesture_names_that_do_not_fit():
+    name = f"hand_tracker_test_{os.getpid()}_names"
+    with pytest.raises(ValueError):
+        SharedLandmarkWriter(name, gesture_names=[f"g{i}" for i in range(17)])
+    # 头部只有 128 字节，截断后读取端会得到错误的手势数
+    with pytest.raises(ValueError):
+        SharedLandmarkWriter(name, gesture_names=["gesture_%02d" % i for i in range(12)])
+    with pytest.raises(FileNotFoundError):
+        SharedLandmarkReader(name)
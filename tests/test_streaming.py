@@ -0,0 +1,210 @@
+import asyncio
+import json
+import socket
+import struct
+import time
+
+import pytest
+
+from hand_tracker.streaming import (
+    StreamServer, Subscriber, WebSocketClient, gesture_command, project, ws_accept_key, ws_frame,
+)
+
+FRAME = {
+    "timestamp": 1.5,
+    "hands": [{"hand_id": 0, "fist": True, "open_hand": False, "landmarks": [[0.1, 0.2, 0.3]] * 21,
+               "velocity": [[0, 0, 0]] * 21, "hand_rotation": 12.0}],
+}
+
+
+@pytest.fixture
+def server():
+    server = StreamServer(udp_port=0, ws_port=0, subscriber_timeout=0.3, heartbeat=None).start()
+    yield server
+    server.stop()
+
+
+def flush(server):
+    """等待事件循环处理完之前 publish() 的帧 (publish 安排的 _dispatch 先于这里的协程运行)。"""
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), server._loop).result(timeout=2)
+
+
+def udp_socket():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.5)
+    return sock
+
+
+def receive_all(sock):
+    messages = []
+    try:
+        while True:
+            messages.append(json.loads(sock.recv(65536)))
+    except socket.timeout:
+        return messages
+
+
+def frame_client(data=b""):
+    """只有接收缓冲区的客户端，用来单独测试帧解析。"""
+    client = WebSocketClient.__new__(WebSocketClient)
+    client._buffer = bytearray(data)
+    return client
+
+
+@pytest.mark.parametrize("n", [0, 125, 126, 65535, 65536])
+def test_ws_frame_round_trip(n):
+    payload = bytes(range(256)) * (n // 256) + bytes(n % 256)
+    frame = ws_frame(payload, 0x2)
+    header = {125: 2, 126: 4, 65535: 4, 65536: 10}.get(n, 2)
+    assert len(frame) == header + n
+
+    # 逐字节到达: 帧不完整时不取出任何数据
+    client = frame_client()
+    for i, byte in enumerate(frame + ws_frame(b"next")):
+        client._buffer.append(byte)
+        if i < len(frame) - 1:
+            assert client._next_frame() is None
+        elif i == len(frame) - 1:
+            assert client._next_frame() == (0x2, payload)
+    assert client._next_frame() == (0x1, b"next")
+    assert client._buffer == bytearray()
+
+
+def test_handshake_accept_key(server):
+    # RFC 6455 第 1.3 节的示例
+    assert ws_accept_key("dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+    sock = socket.create_connection(("127.0.0.1", server.ws_port), timeout=2)
+    sock.sendall(b"GET /?payload=commands HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += sock.recv(4096)
+    sock.close()
+    assert response.startswith(b"HTTP/1.1 101 ")
+    assert b"Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=\r\n" in response
+
+    sock = socket.create_connection(("127.0.0.1", server.ws_port), timeout=2)
+    sock.sendall(b"GET / HTTP/1.1\r\nHost: x\r\n\r\n")
+    assert sock.recv(4096).startswith(b"HTTP/1.1 400 ")
+    sock.close()
+
+
+def test_websocket_payload_projection_and_control(server):
+    client = WebSocketClient(f"ws://127.0.0.1:{server.ws_port}/?payload=gestures")
+    server.publish(FRAME)
+    message = json.loads(client.recv(timeout=2))
+    assert message["hands"] == [{"hand_id": 0, "fist": True, "open_hand": False, "hand_rotation": 12.0}]
+    assert message["timestamp"] == 1.5
+
+    # 超过 125 字节的控制消息 (16 位长度、带掩码) 修改订阅
+    client.send(json.dumps({"subscribe": "commands", "padding": "x" * 200}))
+    deadline = time.perf_counter() + 2
+    while next(iter(server.clients)).payload != "commands" and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    server.publish(FRAME)
+    assert json.loads(client.recv(timeout=2)) == {"command": "stop", "timestamp": 1.5}
+
+    client.send(json.dumps({"subscribe": "nothing"}))
+    assert "error" in json.loads(client.recv(timeout=2))
+    assert client.recv(timeout=0.05) is None
+
+    # ping 回复 pong
+    mask = b"\x01\x02\x03\x04"
+    client.sock.sendall(bytes([0x89, 0x80 | 4]) + mask + bytes(b ^ m for b, m in zip(b"ping", mask)))
+    while (frame := client._next_frame()) is None:
+        client._fill(time.perf_counter() + 2)
+    assert frame == (0xA, b"ping")
+
+    # close 帧被回显后连接结束
+    client.sock.sendall(bytes([0x88, 0x80 | 2]) + mask + bytes(b ^ m for b, m in zip(struct.pack("!H", 1000), mask)))
+    with pytest.raises(ConnectionError):
+        client.recv(timeout=2)
+    client.close()
+
+
+def test_binary_payload_channels(server):
+    client = WebSocketClient(f"ws://127.0.0.1:{server.ws_port}/?payload=binary")
+    server.publish(None, b"\x00" * 200, channel=1)
+    flush(server)
+    server.publish(FRAME, b"packet", channel=0)
+    assert client.recv(timeout=2) == b"packet"
+    assert client.recv(timeout=0.05) is None
+    client.close()
+
+
+def test_rate_throttling():
+    subscriber = Subscriber("udp", ("127.0.0.1", 0), rate=10)
+    assert [subscriber.due(t) for t in (0.0, 0.05, 0.1, 0.15, 0.2)] == [True, False, True, False, True]
+    # 落后太多时不补发
+    assert subscriber.due(1.0) and not subscriber.due(1.05) and subscriber.due(1.1)
+    assert all(Subscriber("udp", ("127.0.0.1", 0)).due(t) for t in (0.0, 0.0, 0.0))
+
+
+def test_rate_limited_udp_target(server):
+    sock = udp_socket()
+    server.add_udp_target(sock.getsockname(), "commands", rate=5)
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.5:
+        server.publish(FRAME)
+        flush(server)
+        time.sleep(0.01)
+    assert 2 <= len(receive_all(sock)) <= 4
+    sock.close()
+
+
+def test_on_change_commands(server):
+    every, changes = udp_socket(), udp_socket()
+    server.add_udp_target(every.getsockname(), "commands")
+    server.add_udp_target(changes.getsockname(), "commands", on_change=True)
+    client = WebSocketClient(f"ws://127.0.0.1:{server.ws_port}/?payload=commands&on_change=1")
+    sequence = ["stop", "stop", "stop", "jump", "jump", "stop"]
+    for i, command in enumerate(sequence):
+        server.publish({"timestamp": i, "command": command})
+        flush(server)
+    assert [m["command"] for m in receive_all(every)] == sequence
+    assert [m["command"] for m in receive_all(changes)] == ["stop", "jump", "stop"]
+    assert [json.loads(client.recv(timeout=2))["timestamp"] for _ in range(3)] == [0, 3, 5]
+    every.close()
+    changes.close()
+    client.close()
+
+
+def test_udp_subscription_expires(server):
+    sock = udp_socket()
+    address = ("127.0.0.1", server.udp_port)
+    sock.sendto(json.dumps({"subscribe": "events"}).encode(), address)
+    assert json.loads(sock.recv(65536)) == {"subscribed": "events", "timeout": 0.3}
+    server.publish(FRAME)
+    server.publish(dict(FRAME, events=[{"type": "enter", "hand_id": 0}]))
+    assert receive_all(sock) == [{"timestamp": 1.5, "events": [{"type": "enter", "hand_id": 0}]}]
+
+    # 续期前过期: 不再发送，订阅者被移除
+    time.sleep(0.35)
+    server.publish(dict(FRAME, events=[{"type": "leave", "hand_id": 0}]))
+    flush(server)
+    assert receive_all(sock) == [] and server.subscribers == {}
+
+    sock.sendto(b"not json", address)
+    assert "error" in json.loads(sock.recv(65536))
+    sock.sendto(json.dumps({"subscribe": "full"}).encode(), address)
+    sock.recv(65536)
+    sock.sendto(json.dumps({"unsubscribe": True}).encode(), address)
+    flush(server)
+    assert server.subscribers == {}
+    sock.close()
+
+
+def test_project_and_gesture_command():
+    assert project(FRAME, "full") is FRAME
+    assert gesture_command(FRAME) == "stop"
+    assert gesture_command({"hands": []}) == "idle"
+    cameras = {"cameras": [{"hands": [{"thumb_up": True, "landmarks": []}]}], "hands_3d": []}
+    assert gesture_command(cameras) == "move_forward"
+    assert project(cameras, "gestures") == {"cameras": [{"hands": [{"thumb_up": True}]}]}
+    assert project({"timestamp": 2}, "events") == {"timestamp": 2, "events": []}
+
+
+def test_client_handshake_failure(server):
+    with pytest.raises(ConnectionError):
+        WebSocketClient(f"ws://127.0.0.1:{server.ws_port}/?payload=unknown")
@@ -0,0 +1,182 @@
+import socket
+import json
+import time
+import argparse
+
+from hand_tracker.protocol import DeltaDecoder, is_binary_packet, seq_gap
+from hand_tracker.sharedmem import SharedLandmarkReader
+from hand_tracker.streaming import WebSocketClient
+
+# 参考接收端: 接收 hand_tracking_ue5.py 发出的数据 (自动识别 JSON / 二进制协议)，
+# 打印收包速率、平均包大小、解码耗时、端到端延迟和丢包数，可用于替代 UE5 进行调试和对比。
+# 也可以作为数据流服务的本机测试客户端:
+#   python udp_receiver.py --port 0 --subscribe gestures --server 127.0.0.1:12350 --rate 30
+#   python udp_receiver.py --websocket "ws://127.0.0.1:8765/?payload=commands&on_change=1"
+#   python udp_receiver.py --shm hand_tracker
+
+def summarize_json(data):
+    """从JSON数据中取出每只手的 (左右手, 成立的手势列表)"""
+    if "command" in data:
+        return [("command", [data["command"]])]
+    if "events" in data and "hands" not in data:
+        return [(event["type"], [event.get("gesture") or event.get("direction") or event.get("handedness")])
+                for event in data["events"]]
+    gesture_keys = ["thumb_up", "fist", "open_hand", "pointing", "peace"]
+    return [(hand.get("handedness"), [k for k in gesture_keys if hand.get(k)]) for hand in data.get("hands", [])]
+
+def summarize_binary(data):
+    """从二进制数据包解码结果中取出每只手的 (左右手, 成立的手势列表)"""
+    hands = []
+    for i, handedness in enumerate(data["handedness"]):
+        hands.append((handedness, [name for name, flags in data["gestures"].items() if flags[i]]))
+    return hands
+
+def receive_shared(name, interval):
+    """从共享内存环形缓冲区读取 (hand_tracking_ue5.py --shm)，打印帧率、读取耗时、延迟和丢帧数。"""
+    reader = SharedLandmarkReader(name)
+    print(f"已打开共享内存 {name} ({reader.capacity} 帧)，按 Ctrl+C 退出")
+    frames, read_time, latency = 0, 0.0, 0.0
+    last_report = time.time()
+    latest = []
+    try:
+        while not reader.closed:
+            t0 = time.perf_counter()
+            item = reader.read_next(timeout=0.5, copy=False)
+            if item is not None:
+                timestamp, frame, gestures = item
+                latest = [(label, [n for n, on in zip(reader.gesture_names, row) if on])
+                          for label, row in zip(frame.handedness, gestures.tolist())]
+                read_time += time.perf_counter() - t0
+                frames += 1
+                latency += time.time() - timestamp
+
+            now = time.time()
+            if now - last_report >= interval:
+                elapsed = now - last_report
+                if frames:
+                    print(f"[shm] {frames / elapsed:.1f} 帧/秒, 读取 {read_time / frames * 1e6:.1f} us/帧 (含等待), "
+                          f"延迟 {latency / frames * 1000:.2f} ms, 丢帧 {reader.dropped} | {latest}")
+                else:
+                    print("未收到数据")
+                frames, read_time, latency = 0, 0.0, 0.0
+                last_report = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+        print("接收端已退出")
+
+def main():
+    parser = argparse.ArgumentParser(description="手势数据参考接收端")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=12345, help="监听端口")
+    parser.add_argument("--interval", type=float, default=1.0, help="统计输出间隔 (秒)")
+    parser.add_argument("--subscribe", choices=["full", "gestures", "commands", "binary"],
+                        help="向数据流服务发送 UDP 订阅消息 (配合 --server)")
+    parser.add_argument("--server", default="127.0.0.1:12350", help="数据流服务的 UDP 订阅地址 HOST:PORT")
+    parser.add_argument("--rate", type=float, default=0, help="订阅的最高频率 (条/秒)，0 表示每帧")
+    parser.add_argument("--on-change", action="store_true", help="commands 订阅只在命令变化时发送 (另加心跳)")
+    parser.add_argument("--websocket", metavar="URL", help="改为通过 WebSocket 接收，例如 ws://127.0.0.1:8765/?payload=full")
+    parser.add_argument("--shm", metavar="NAME", help="改为从本机的共享内存环形缓冲区读取")
+    args = parser.parse_args()
+    if args.subscribe and args.websocket:
+        parser.error("--subscribe 是 UDP 订阅，WebSocket 的订阅写在 URL 中 (?payload=...&rate=...)")
+
+    if args.shm:
+        receive_shared(args.shm, args.interval)
+        return
+
+    sock = ws = None
+    if args.websocket:
+        ws = WebSocketClient(args.websocket)
+        print(f"已连接 {args.websocket}，按 Ctrl+C 退出")
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((args.host, args.port))
+        sock.settimeout(0.5)
+        print(f"正在监听 {args.host}:{sock.getsockname()[1]}，按 Ctrl+C 退出")
+    server_host, server_port = args.server.rsplit(":", 1)
+    server = (server_host, int(server_port))
+    last_subscribe = 0.0
+
+    decoder = DeltaDecoder()
+    packets, total_bytes, decode_time, lost, keyframes, latency = 0, 0, 0.0, 0, 0, 0.0
+    last_seq = None
+    last_report = time.time()
+    latest = []
+    fmt = "-"
+
+    try:
+        while True:
+            if args.subscribe and time.time() - last_subscribe >= 2.0:
+                # 订阅需要定期续期 (服务端默认 5 秒没有续期就移除)
+                sock.sendto(json.dumps({"subscribe": args.subscribe, "rate": args.rate,
+                                        "on_change": args.on_change}).encode(), server)
+                last_subscribe = time.time()
+            if ws is not None:
+                packet = ws.recv(timeout=0.5)
+                packet = packet.encode() if isinstance(packet, str) else packet
+            else:
+                try:
+                    packet, _ = sock.recvfrom(65536)
+                except socket.timeout:
+                    packet = None
+
+            if packet:
+                t0 = time.perf_counter()
+                if is_binary_packet(packet):
+                    # DeltaDecoder 同时支持普通二进制包和关键帧+增量流
+                    data = decoder.decode(packet)
+                    if data is not None:
+                        if not data["keyframe"]:
+                            fmt = "delta"
+                        elif fmt != "delta":
+                            fmt = "binary16" if data["quantized"] else "binary"
+                        keyframes += data["keyframe"]
+                        gap = seq_gap(data["seq"], last_seq) if last_seq is not None else 0
+                        if gap is not None:
+                            # 乱序到达的旧包不计入丢包，也不回退 last_seq
+                            lost += gap
+                            last_seq = data["seq"]
+                        latest = summarize_binary(data)
+                else:
+                    data = json.loads(packet.decode())
+                    if "subscribed" in data or "error" in data:
+                        print(f"数据流服务: {data}")
+                        continue
+                    fmt = "json"
+                    latest = summarize_json(data)
+                decode_time += time.perf_counter() - t0
+                packets += 1
+                total_bytes += len(packet)
+                if data is not None and data.get("timestamp"):
+                    # 发送端与接收端在同一台机器上时为端到端延迟
+                    latency += time.time() - data["timestamp"]
+
+            now = time.time()
+            if now - last_report >= args.interval:
+                elapsed = now - last_report
+                if packets:
+                    print(f"[{fmt}] {packets / elapsed:.1f} 包/秒, 平均 {total_bytes / packets:.0f} 字节/包, "
+                          f"{total_bytes / elapsed / 1024:.1f} KB/秒, 解码 {decode_time / packets * 1e6:.1f} us/包, "
+                          f"延迟 {latency / packets * 1000:.2f} ms, "
+                          f"丢包 {lost}, 关键帧 {keyframes}, 待恢复丢弃 {decoder.dropped} | {latest}")
+                else:
+                    print("未收到数据")
+                packets, total_bytes, decode_time, keyframes, latency = 0, 0, 0.0, 0, 0.0
+                last_report = now
+    except KeyboardInterrupt:
+        pass
+    except ConnectionError as e:
+        print(f"连接已断开: {e}")
+    finally:
+        if args.subscribe and sock is not None:
+            sock.sendto(json.dumps({"unsubscribe": True}).encode(), server)
+        if ws is not None:
+            ws.close()
+        else:
+            sock.close()
+        print("接收端已退出")
+
+if __name__ == "__main__":
+    main()